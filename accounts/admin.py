@@ -1,5 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.db.models import Sum
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 from .models import User
@@ -106,7 +107,7 @@ class UserAdmin(BaseUserAdmin):
     
     def total_likes_received(self, obj):
         """Total likes received on all reviews"""
-        return sum(review.likes.count() for review in obj.album_reviews.all())
+        return obj.album_reviews.aggregate(total=Sum('likes_count'))['total'] or 0
     total_likes_received.short_description = 'Total Likes'
     
     # Custom actions
@@ -1,6 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from music.models import Review
+from music.models import COVER_CARD, Review
 from django.db.models import Count
 
 User = get_user_model()
@@ -88,9 +88,15 @@ class UserProfileSerializer(serializers.ModelSerializer):
     
     def get_pinned_reviews(self, obj):
         try:
+            from music.personalization import liked_review_ids
             from music.serializers import ReviewSerializer
-            pinned_reviews = Review.objects.filter(user=obj, is_pinned=True).order_by('-created_at')[:2]
-            return ReviewSerializer(pinned_reviews, many=True, context=self.context).data
+            pinned_reviews = list(
+                Review.objects.filter(user=obj, is_pinned=True).select_related('album', 'user')
+                .prefetch_related('user_genres').order_by('-created_at')[:2]
+            )
+            request = self.context.get('request')
+            liked = liked_review_ids(request.user if request else None, [review.id for review in pinned_reviews])
+            return ReviewSerializer(pinned_reviews, many=True, context={**self.context, 'liked_review_ids': liked}).data
         except Exception as e:
             # Return empty list if there's any issue to prevent profile page from breaking
             return []
@@ -109,6 +115,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
                     'artist': album.artist,
                     'year': album.year,
                     'cover_url': album.cover_url,
+                    'cover_thumb': album.cover_url_for(COVER_CARD),
                     'discogs_id': album.discogs_id
                 }
                 
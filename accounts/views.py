@@ -14,6 +14,7 @@ from rest_framework_simplejwt.tokens import RefreshToken
 
 from .serializers import UserProfileSerializer, UserFollowSerializer, UserSerializer
 from music.models import Review
+from music.personalization import personalize_activities, personalize_profile, personalize_reviews, personalize_users
 from music.serializers import ReviewSerializer
 
 User = get_user_model()
@@ -120,21 +121,21 @@ def user_reviews(request, username):
     cached_reviews = cache.get(cache_key)
     
     if cached_reviews:
-        return Response(cached_reviews)
+        return Response(personalize_reviews(cached_reviews, request.user))
     
     # Optimized query with all necessary prefetching
     reviews = Review.objects.filter(user=user).select_related(
         'album', 'user'
     ).prefetch_related(
-        'user_genres', 'likes__user', 'comments__user'
+        'user_genres'
     ).order_by('-created_at')[offset:offset + limit]
     
-    serializer = ReviewSerializer(reviews, many=True, context={'request': request})
+    serializer = ReviewSerializer(reviews, many=True, context={'request': None})
     
     # Cache for 3 minutes (balanced freshness vs performance)
     cache.set(cache_key, serializer.data, 180)
     
-    return Response(serializer.data)
+    return Response(personalize_reviews(serializer.data, request.user))
 
 
 @api_view(['GET'])
@@ -148,15 +149,16 @@ def user_profile(request, username):
     cached_profile = cache.get(cache_key)
     
     if cached_profile:
-        return Response({**cached_profile, 'cached': True})
+        return Response({**personalize_profile(cached_profile, request.user), 'cached': True})
     
+    # The request only builds media URLs here; viewer flags come from the overlay
     serializer = UserProfileSerializer(user, context={'request': request})
     profile_data = serializer.data
     
     # Cache for 10 minutes
     cache.set(cache_key, profile_data, 600)
     
-    return Response({**profile_data, 'cached': False})
+    return Response({**personalize_profile(profile_data, request.user), 'cached': False})
 
 
 @api_view(['POST', 'DELETE'])
@@ -216,20 +218,21 @@ def user_followers(request, username):
     cached_followers = cache.get(cache_key)
     
     if cached_followers:
-        return Response(cached_followers)
+        return Response(personalize_users(cached_followers, request.user))
     
     # Optimized query with prefetching (avatar is an ImageField, not relational)
     followers = user.followers.prefetch_related(
         'followers', 'following'
     )[offset:offset + limit]
     
+    # The request only builds avatar URLs here; is_following comes from the overlay
     serializer = UserFollowSerializer(followers, many=True, context={'request': request})
     
     # Cache for 5 minutes
     cache.set(cache_key, serializer.data, 300)
     
     # Return array directly as expected by frontend
-    return Response(serializer.data)
+    return Response(personalize_users(serializer.data, request.user))
 
 
 @api_view(['GET'])
@@ -246,20 +249,21 @@ def user_following(request, username):
     cached_following = cache.get(cache_key)
     
     if cached_following:
-        return Response(cached_following)
+        return Response(personalize_users(cached_following, request.user))
     
     # Optimized query with prefetching (avatar is an ImageField, not relational)
     following = user.following.prefetch_related(
         'followers', 'following'
     )[offset:offset + limit]
     
+    # The request only builds avatar URLs here; is_following comes from the overlay
     serializer = UserFollowSerializer(following, many=True, context={'request': request})
     
     # Cache for 5 minutes
     cache.set(cache_key, serializer.data, 300)
     
     # Return array directly as expected by frontend
-    return Response(serializer.data)
+    return Response(personalize_users(serializer.data, request.user))
 
 
 # ============================================================================
@@ -320,7 +324,8 @@ def favorite_albums(request):
             return Response({'error': 'discogs_id required'}, status=400)
         
         from music.models import Album
-        album = get_object_or_404(Album, discogs_id=discogs_id)
+        from music.services import get_known_album_id
+        album = get_object_or_404(Album, discogs_id=get_known_album_id(discogs_id))
         request.user.favorite_albums.add(album)
         
         return Response({'message': 'Album added to favorites'})
@@ -332,7 +337,8 @@ def favorite_albums(request):
             return Response({'error': 'discogs_id required'}, status=400)
         
         from music.models import Album
-        album = get_object_or_404(Album, discogs_id=discogs_id)
+        from music.services import get_known_album_id
+        album = get_object_or_404(Album, discogs_id=get_known_album_id(discogs_id))
         request.user.favorite_albums.remove(album)
         
         return Response({'message': 'Album removed from favorites'})
@@ -349,7 +355,7 @@ def user_activity(request, username):
     cached_activity = cache.get(cache_key)
     
     if cached_activity:
-        return Response(cached_activity)
+        return Response(personalize_activities(cached_activity, request.user))
     
     from music.models import Activity
     from music.serializers import ActivitySerializer
@@ -358,12 +364,12 @@ def user_activity(request, username):
     activities = Activity.objects.filter(user=user).select_related(
         'user', 'target_user', 'review__user', 'review__album', 'comment__user'
     ).prefetch_related(
-        'review__user_genres', 'review__likes', 'review__comments'
+        'review__user_genres'
     ).order_by('-created_at')[:20]
     
-    serializer = ActivitySerializer(activities, many=True, context={'request': request})
+    serializer = ActivitySerializer(activities, many=True, context={'request': None})
     
     # Cache for 2 minutes
     cache.set(cache_key, serializer.data, 120)
     
-    return Response(serializer.data)
\ No newline at end of file
+    return Response(personalize_activities(serializer.data, request.user))
\ No newline at end of file
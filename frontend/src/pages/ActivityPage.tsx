@@ -277,6 +277,7 @@ interface Activity {
       artist: string;
       year?: number;
       cover_url?: string;
+      cover_thumb?: string;
       discogs_id?: string;
     };
     rating: number;
@@ -296,6 +297,9 @@ interface Activity {
     content: string;
     created_at: string;
   };
+  metadata?: {
+    count?: number;
+  };
 }
 
 const ActivityPage: React.FC = () => {
@@ -353,7 +357,7 @@ const ActivityPage: React.FC = () => {
     setLikingReviews(prev => new Set(prev).add(reviewId));
     
     try {
-      await musicAPI.likeReview(reviewId);
+      await musicAPI.likeReview(reviewId, !currentlyLiked);
       
       // Update the activity's review details
       setActivities(prev => prev.map(activity => {
@@ -522,6 +526,19 @@ const ActivityPage: React.FC = () => {
               </ActivityAlbum>
             </>
           );
+        case 'reviews_imported':
+          return (
+            <>
+              {isCurrentUser ? (
+                <span style={{ fontWeight: 600, color: '#111827' }}>You</span>
+              ) : (
+                <ActivityUser onClick={() => navigate(`/users/${activity.user.username}`)}>
+                  {activity.user.username}
+                </ActivityUser>
+              )}
+              {` imported ${activity.metadata?.count ?? 'their'} ${activity.metadata?.count === 1 ? 'rating' : 'ratings'}`}
+            </>
+          );
         default:
           return (
             <>
@@ -660,7 +677,7 @@ const ActivityPage: React.FC = () => {
               {/* Show album cover for review-related activities */}
               {activity.review_details?.album?.cover_url && (
                 <AlbumCover 
-                  src={activity.review_details.album.cover_url}
+                  src={activity.review_details.album.cover_thumb || activity.review_details.album.cover_url}
                   alt={activity.review_details.album.title}
                   onClick={() => {
                     // Navigate to album detail page if available, otherwise to review
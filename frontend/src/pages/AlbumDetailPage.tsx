@@ -159,6 +159,38 @@ const StatLabel = styled.div`
   font-size: 14px;
 `;
 
+const RatingDistribution = styled.div`
+  display: flex;
+  align-items: flex-end;
+  gap: 4px;
+  height: 60px;
+  margin-top: 16px;
+  max-width: 260px;
+`;
+
+const RatingBarColumn = styled.div`
+  flex: 1;
+  display: flex;
+  flex-direction: column;
+  align-items: center;
+  justify-content: flex-end;
+  height: 100%;
+`;
+
+const RatingBar = styled.div<{ $height: number }>`
+  width: 100%;
+  height: ${props => props.$height}%;
+  min-height: 2px;
+  background: #667eea;
+  border-radius: 2px 2px 0 0;
+`;
+
+const RatingBarLabel = styled.div`
+  font-size: 11px;
+  color: #6b7280;
+  margin-top: 2px;
+`;
+
 const ActionButtons = styled.div`
   display: flex;
   gap: 15px;
@@ -512,8 +544,10 @@ interface Review {
 interface AlbumDetailData {
   album: AlbumData;
   reviews: Review[];
+  reviews_next_cursor?: string | null;
   review_count: number;
   average_rating: number | null;
+  rating_histogram?: number[];
   exists_in_db: boolean;
   cached: boolean;
 }
@@ -530,6 +564,7 @@ const AlbumDetailPage: React.FC = () => {
   const [showReviewModal, setShowReviewModal] = useState(false);
   const [userReview, setUserReview] = useState<Review | null>(null);
   const [likingReviews, setLikingReviews] = useState<Set<number>>(new Set());
+  const [loadingMoreReviews, setLoadingMoreReviews] = useState(false);
 
   const loadAlbumData = useCallback(async () => {
     if (!discogsId) return;
@@ -537,8 +572,22 @@ const AlbumDetailPage: React.FC = () => {
     try {
       setLoading(true);
       setError('');
-      const data = await musicAPI.getAlbumDetails(discogsId);
-      setAlbumData(data);
+      let data: any = { album: null, reviews: [], review_count: 0, average_rating: null, exists_in_db: false, cached: false };
+      
+      // Render as soon as the core album arrives; tracklist, credits and photo fill in afterwards
+      await musicAPI.streamAlbumDetails(discogsId, (event, eventData) => {
+        if (event === 'reviews') {
+          data = { ...data, ...eventData };
+        } else if (event === 'album' || event === 'tracks' || event === 'artist_photo') {
+          data = { ...data, album: { ...(data.album || {}), ...eventData } };
+        } else if (event === 'done') {
+          data = { ...data, ...eventData };
+        }
+        if (data.album) {
+          setAlbumData(data);
+          setLoading(false);
+        }
+      });
       
       // Find current user's review if they have one
       if (user && data.reviews) {
@@ -553,6 +602,24 @@ const AlbumDetailPage: React.FC = () => {
     }
   }, [discogsId, user]);
 
+  const handleLoadMoreReviews = async () => {
+    if (!discogsId || !albumData?.reviews_next_cursor) return;
+
+    try {
+      setLoadingMoreReviews(true);
+      const page = await musicAPI.getAlbumReviews(discogsId, 'newest', albumData.reviews_next_cursor);
+      setAlbumData(prev => prev ? {
+        ...prev,
+        reviews: [...prev.reviews, ...page.reviews],
+        reviews_next_cursor: page.next_cursor,
+      } : prev);
+    } catch (err) {
+      console.error('Failed to load more reviews:', err);
+    } finally {
+      setLoadingMoreReviews(false);
+    }
+  };
+
   const handleWriteReview = () => {
     if (!user) {
       navigate('/login');
@@ -572,7 +639,8 @@ const AlbumDetailPage: React.FC = () => {
     setLikingReviews(prev => new Set(prev).add(reviewId));
     
     try {
-      await musicAPI.likeReview(reviewId);
+      const currentlyLiked = albumData?.reviews.find(review => review.id === reviewId)?.is_liked_by_user ?? false;
+      await musicAPI.likeReview(reviewId, !currentlyLiked);
       
       // Update local state
       if (albumData) {
@@ -630,10 +698,9 @@ const AlbumDetailPage: React.FC = () => {
       .sort((a, b) => b.likes_count - a.likes_count)
       .slice(0, 3); // Show top 3
     
-    // Get recent reviews (sorted by creation date)
+    // Get recent reviews (sorted by creation date); more pages load on demand
     const recentReviews = [...reviews]
-      .sort((a, b) => new Date(b.created_at).getTime() - new Date(a.created_at).getTime())
-      .slice(0, 5); // Show latest 5
+      .sort((a, b) => new Date(b.created_at).getTime() - new Date(a.created_at).getTime());
 
     const renderReviewCard = (review: Review) => (
       <ReviewItem key={review.id}>
@@ -736,9 +803,9 @@ const AlbumDetailPage: React.FC = () => {
           </ReviewsSection>
         </ReviewSection>
         
-        {reviews.length > 5 && (
-          <ShowMoreReviews onClick={() => navigate(`/albums/${albumData.album.discogs_id}/reviews`)}>
-            View all {reviews.length} reviews →
+        {albumData.reviews_next_cursor && (
+          <ShowMoreReviews onClick={handleLoadMoreReviews} disabled={loadingMoreReviews}>
+            {loadingMoreReviews ? 'Loading...' : `Show more of ${albumData.review_count} reviews →`}
           </ShowMoreReviews>
         )}
       </ReviewsContainer>
@@ -904,6 +971,17 @@ const AlbumDetailPage: React.FC = () => {
             </Stat>
           </Stats>
           
+          {albumData.review_count > 0 && albumData.rating_histogram && (
+            <RatingDistribution title="Rating distribution">
+              {albumData.rating_histogram.map((count, index) => (
+                <RatingBarColumn key={index} title={`${index + 1}/10: ${count} review${count === 1 ? '' : 's'}`}>
+                  <RatingBar $height={(count / Math.max(...albumData.rating_histogram!)) * 100} />
+                  <RatingBarLabel>{index + 1}</RatingBarLabel>
+                </RatingBarColumn>
+              ))}
+            </RatingDistribution>
+          )}
+          
           <ActionButtons>
             <PrimaryButton onClick={handleWriteReview}>
               {userReview ? 'Edit Review' : 'Write Review'}
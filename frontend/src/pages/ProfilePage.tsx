@@ -1194,6 +1194,7 @@ interface User {
     artist: string;
     year?: number;
     cover_url?: string;
+    cover_thumb?: string;
     discogs_id: string;
     user_review_id?: number;
     user_rating?: number;
@@ -1212,6 +1213,7 @@ interface Review {
   album_title: string;
   album_artist: string;
   album_cover?: string;
+  album_cover_thumb?: string;
   album_artist_photo?: string;
   album_year?: number;
   album_discogs_id?: string;
@@ -1246,6 +1248,7 @@ interface Activity {
       artist: string;
       year?: number;
       cover_url?: string;
+      cover_thumb?: string;
     };
     rating: number;
     content: string;
@@ -1264,6 +1267,9 @@ interface Activity {
     content: string;
     created_at: string;
   };
+  metadata?: {
+    count?: number;
+  };
 }
 
 const ProfilePage: React.FC = () => {
@@ -1718,7 +1724,7 @@ const ProfilePage: React.FC = () => {
     
     setLikingReviews(prev => new Set(prev).add(reviewId));
     try {
-      await musicAPI.likeReview(reviewId);
+      await musicAPI.likeReview(reviewId, !currentlyLiked);
       
       // Update the review in both pinned and regular reviews
       const updateReview = (review: Review) => {
@@ -1982,6 +1988,34 @@ const ProfilePage: React.FC = () => {
               </ActivityAlbum>
             </>
           );
+        case 'reviews_imported':
+          return (
+            <>
+              {isCurrentUser ? (
+                <span style={{ fontWeight: 600, color: '#111827' }}>You</span>
+              ) : (
+                <>
+                  <ActivityUser onClick={() => navigate(`/users/${activity.user.username}`)}>
+                    {activity.user.username}
+                  </ActivityUser>
+                  {activity.user.is_staff && (
+                    <span 
+                      style={{ 
+                        marginLeft: '4px', 
+                        fontSize: '14px',
+                        color: '#3b82f6',
+                        fontWeight: 'bold'
+                      }}
+                      title="Verified Staff"
+                    >
+                      ✓
+                    </span>
+                  )}
+                </>
+              )}
+              {` imported ${activity.metadata?.count ?? 'their'} ${activity.metadata?.count === 1 ? 'rating' : 'ratings'}`}
+            </>
+          );
         default:
           return (
             <>
@@ -2019,7 +2053,7 @@ const ProfilePage: React.FC = () => {
   const renderReview = (review: Review) => (
     <ReviewItem key={review.id}>
       <ReviewAlbumCover 
-        src={review.album_cover || '/static/music/default-album.svg'} 
+        src={review.album_cover_thumb || review.album_cover || '/static/music/default-album.svg'} 
         alt={review.album_title}
         onClick={() => review.album_discogs_id ? navigate(`/albums/${review.album_discogs_id}/`) : navigate(`/review/${review.id}/`)}
         title={review.album_discogs_id ? 'View album details' : 'View review'}
@@ -2320,7 +2354,7 @@ const ProfilePage: React.FC = () => {
                     {profileUser.favorite_albums.map(album => (
                       <FavoriteAlbumItem key={album.id}>
                         <FavoriteAlbumCover 
-                          src={album.cover_url || '/static/music/default-album.svg'} 
+                          src={album.cover_thumb || album.cover_url || '/static/music/default-album.svg'} 
                           alt={album.title}
                           onClick={() => {
                             if (album.user_review_id) {
@@ -2428,7 +2462,7 @@ const ProfilePage: React.FC = () => {
                     {/* Show album cover for review-related activities */}
                     {activity.review_details?.album?.cover_url && (
                       <ActivityAlbumCover 
-                        src={activity.review_details.album.cover_url}
+                        src={activity.review_details.album.cover_thumb || activity.review_details.album.cover_url}
                         alt={activity.review_details.album.title}
                         onClick={() => navigate(`/review/${activity.review_details?.id}/`)}
                         onError={(e) => {
@@ -2523,7 +2557,7 @@ const ProfilePage: React.FC = () => {
                             album.cover_url && (
                               <img
                                 key={album.id}
-                                src={album.cover_url}
+                                src={album.cover_thumb || album.cover_url}
                                 alt={album.title}
                                 style={{
                                   width: '40px',
@@ -638,7 +638,7 @@ const ReviewDetailPage: React.FC = () => {
     
     setLikingReview(true);
     try {
-      await musicAPI.likeReview(review.id);
+      await musicAPI.likeReview(review.id, !review.is_liked_by_user);
       setReview(prev => prev ? {
         ...prev,
         is_liked_by_user: !prev.is_liked_by_user,
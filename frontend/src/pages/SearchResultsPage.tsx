@@ -392,6 +392,8 @@ const SearchResultsPage: React.FC = () => {
   const query = searchParams.get('q') || '';
   
   const [albums, setAlbums] = useState<SearchResult[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [users, setUsers] = useState<UserResult[]>([]);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string>('');
@@ -439,6 +441,7 @@ const SearchResultsPage: React.FC = () => {
       // Search for albums
       const albumResults = await musicAPI.search(query);
       setAlbums(albumResults.results || []);
+      setNextCursor(albumResults.next_cursor || null);
 
       // Search for users
       try {
@@ -456,6 +459,21 @@ const SearchResultsPage: React.FC = () => {
     }
   };
 
+  const loadMoreAlbums = async () => {
+    if (!nextCursor || loadingMore) return;
+
+    setLoadingMore(true);
+    try {
+      const albumResults = await musicAPI.search(query, nextCursor);
+      setAlbums(prev => [...prev, ...(albumResults.results || [])]);
+      setNextCursor(albumResults.next_cursor || null);
+    } catch (error: any) {
+      setError(error.message || 'Failed to load more results');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   // Load available genres from backend
   const loadGenres = async () => {
     try {
@@ -699,6 +717,11 @@ const SearchResultsPage: React.FC = () => {
               </ResultActions>
             </ResultItem>
           ))}
+          {nextCursor && (
+            <BtnSecondary onClick={loadMoreAlbums} disabled={loadingMore}>
+              {loadingMore ? 'Loading...' : 'Load more albums'}
+            </BtnSecondary>
+          )}
         </ResultsSection>
       )}
 
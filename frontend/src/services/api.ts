@@ -63,6 +63,7 @@ export interface Album {
   artist: string;
   year?: number;
   cover_url?: string;
+  cover_images?: Record<string, { webp?: string; jpeg?: string }> | null;
   cover_image?: string;
   artist_photo_url?: string;
   genres?: string[];
@@ -79,6 +80,7 @@ export interface Review {
   album_title: string;
   album_artist: string;
   album_cover: string;
+  album_cover_thumb?: string;
   album_artist_photo?: string;
   album_year?: number;
   is_pinned: boolean;
@@ -168,10 +170,11 @@ export const authAPI = {
 
 // Music API
 export const musicAPI = {
-  search: async (query: string) => {
+  search: async (query: string, cursor?: string | null) => {
     try {
-      const response = await api.get(`/api/music/search/?q=${encodeURIComponent(query)}`);
-      return response.data; // Backend returns {results: [...]}
+      const cursorParam = cursor ? `&cursor=${encodeURIComponent(cursor)}` : '';
+      const response = await api.get(`/api/music/search/?q=${encodeURIComponent(query)}${cursorParam}`);
+      return response.data; // Backend returns {results: [...], next_cursor: string | null}
     } catch (error: any) {
       throw new Error(error.response?.data?.error || 'Search failed');
     }
@@ -185,6 +188,51 @@ export const musicAPI = {
       throw new Error(error.response?.data?.error || 'Failed to get album details');
     }
   },
+
+  // One page of an album's reviews: {reviews, sort, next_cursor}
+  getAlbumReviews: async (
+    discogsId: string,
+    sort: 'newest' | 'most_liked' | 'highest' | 'lowest' | 'following' = 'newest',
+    cursor?: string | null
+  ) => {
+    try {
+      const cursorParam = cursor ? `&cursor=${encodeURIComponent(cursor)}` : '';
+      const response = await api.get(`/api/music/albums/${discogsId}/reviews/?sort=${sort}${cursorParam}`);
+      return response.data;
+    } catch (error: any) {
+      throw new Error(error.response?.data?.error || 'Failed to get album reviews');
+    }
+  },
+
+  // Progressive album details: onEvent is called for each NDJSON line as it arrives
+  streamAlbumDetails: async (discogsId: string, onEvent: (event: string, data: any) => void) => {
+    const token = localStorage.getItem('access_token');
+    const response = await fetch(`${API_BASE_URL}/api/music/albums/${discogsId}/?stream=1`, {
+      headers: token ? { Authorization: `Bearer ${token}` } : {},
+    });
+    if (!response.ok || !response.body) {
+      throw new Error('Failed to get album details');
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffered = '';
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffered += decoder.decode(value, { stream: true });
+      const lines = buffered.split('\n');
+      buffered = lines.pop() || '';
+      for (const line of lines) {
+        if (!line.trim()) continue;
+        const { event, data } = JSON.parse(line);
+        if (event === 'error') {
+          throw new Error(data.error || 'Failed to get album details');
+        }
+        onEvent(event, data);
+      }
+    }
+  },
   
   createReview: async (discogsId: string, rating: number, content: string, genres: string[]) => {
     try {
@@ -230,9 +278,11 @@ export const musicAPI = {
     }
   },
   
-  likeReview: async (reviewId: number) => {
+  likeReview: async (reviewId: number, liked = true) => {
     try {
-      const response = await api.post(`/api/music/reviews/${reviewId}/like/`);
+      // PUT and DELETE are idempotent, so a double tap can't undo itself
+      const url = `/api/music/reviews/${reviewId}/like/`;
+      const response = liked ? await api.put(url) : await api.delete(url);
       return response.data;
     } catch (error: any) {
       throw new Error(error.response?.data?.error || 'Failed to like review');
@@ -25,6 +25,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     # Third party
     'rest_framework',
@@ -174,4 +175,64 @@ SECURE_SSL_REDIRECT = False
 DISCOGS_API_URL = "https://api.discogs.com"
 DISCOGS_CONSUMER_KEY = os.getenv('DISCOGS_CONSUMER_KEY')
 DISCOGS_CONSUMER_SECRET = os.getenv('DISCOGS_CONSUMER_SECRET')
-DISCOGS_TOKEN = os.getenv('DISCOGS_TOKEN', DISCOGS_CONSUMER_KEY)
\ No newline at end of file
+DISCOGS_TOKEN = os.getenv('DISCOGS_TOKEN', DISCOGS_CONSUMER_KEY)
+
+# Discogs client tuning (one pooled, keep-alive session per worker)
+DISCOGS_POOL_MAXSIZE = int(os.getenv('DISCOGS_POOL_MAXSIZE', '10'))
+DISCOGS_MAX_RETRIES = int(os.getenv('DISCOGS_MAX_RETRIES', '2'))
+DISCOGS_CONNECT_TIMEOUT = float(os.getenv('DISCOGS_CONNECT_TIMEOUT', '2'))
+DISCOGS_READ_TIMEOUT = float(os.getenv('DISCOGS_READ_TIMEOUT', '10'))
+DISCOGS_RATE_LIMIT = int(os.getenv('DISCOGS_RATE_LIMIT', '60'))  # Requests per minute (authenticated)
+DISCOGS_RATE_LIMIT_RESERVE = int(os.getenv('DISCOGS_RATE_LIMIT_RESERVE', '5'))
+# Stored search responses older than this are deleted by `manage.py prune_discogs_responses`
+DISCOGS_RESPONSE_MAX_AGE_DAYS = int(os.getenv('DISCOGS_RESPONSE_MAX_AGE_DAYS', '30'))
+
+# Discogs circuit breaker (state is shared through the cache)
+DISCOGS_BREAKER_FAILURE_RATIO = float(os.getenv('DISCOGS_BREAKER_FAILURE_RATIO', '0.5'))
+DISCOGS_BREAKER_MIN_CALLS = int(os.getenv('DISCOGS_BREAKER_MIN_CALLS', '10'))
+DISCOGS_BREAKER_SLOW_CALL_SECONDS = float(os.getenv('DISCOGS_BREAKER_SLOW_CALL_SECONDS', '5'))
+DISCOGS_BREAKER_WINDOW = int(os.getenv('DISCOGS_BREAKER_WINDOW', '60'))  # Seconds
+DISCOGS_BREAKER_COOLDOWN = int(os.getenv('DISCOGS_BREAKER_COOLDOWN', '30'))  # Seconds before probing again
+
+
+# Search artist photo enrichment
+ARTIST_PHOTO_WORKERS = int(os.getenv('ARTIST_PHOTO_WORKERS', '4'))
+ARTIST_PHOTO_DEADLINE = float(os.getenv('ARTIST_PHOTO_DEADLINE', '2.0'))  # Seconds per search request
+
+# Background warming of album pages for the top search hits
+ALBUM_PREFETCH_TOP_K = int(os.getenv('ALBUM_PREFETCH_TOP_K', '3'))  # 0 disables prefetching
+ALBUM_PREFETCH_WORKERS = int(os.getenv('ALBUM_PREFETCH_WORKERS', '2'))
+ALBUM_PREFETCH_MAX_PENDING = int(os.getenv('ALBUM_PREFETCH_MAX_PENDING', '20'))
+
+# Local-first search over the imported catalog
+LOCAL_SEARCH_MIN_RESULTS = int(os.getenv('LOCAL_SEARCH_MIN_RESULTS', '5'))  # Fewer local hits than this also asks Discogs
+LOCAL_SEARCH_POPULARITY_WEIGHT = float(os.getenv('LOCAL_SEARCH_POPULARITY_WEIGHT', '0.05'))
+SEARCH_PAGE_SIZE = int(os.getenv('SEARCH_PAGE_SIZE', '10'))
+SEARCH_MAX_PAGE_SIZE = int(os.getenv('SEARCH_MAX_PAGE_SIZE', '25'))
+
+# Album review pages (the album payload embeds the first one)
+ALBUM_REVIEWS_PAGE_SIZE = int(os.getenv('ALBUM_REVIEWS_PAGE_SIZE', '10'))
+ALBUM_REVIEWS_MAX_PAGE_SIZE = int(os.getenv('ALBUM_REVIEWS_MAX_PAGE_SIZE', '50'))
+
+# Trending charts (scores kept by music/trending.py, rebuilt by `manage.py rebuild_trending_scores`)
+TRENDING_PAGE_SIZE = int(os.getenv('TRENDING_PAGE_SIZE', '20'))
+TRENDING_MAX_PAGE_SIZE = int(os.getenv('TRENDING_MAX_PAGE_SIZE', '50'))
+
+# Rating imports from other services (the import_ratings command takes its own limits)
+RATING_IMPORT_MAX_ROWS = int(os.getenv('RATING_IMPORT_MAX_ROWS', '10000'))
+RATING_IMPORT_MAX_DISCOGS_LOOKUPS = int(os.getenv('RATING_IMPORT_MAX_DISCOGS_LOOKUPS', '50'))  # Per import request
+
+# Review like counts: with LIKE_COUNT_WRITE_BEHIND and Redis, changes are queued and written in batches
+# (see music/likes.py), at most every LIKE_COUNT_FLUSH_INTERVAL seconds; otherwise each is written straight away
+LIKE_COUNT_WRITE_BEHIND = os.getenv('LIKE_COUNT_WRITE_BEHIND', 'False') == 'True'
+LIKE_COUNT_FLUSH_INTERVAL = int(os.getenv('LIKE_COUNT_FLUSH_INTERVAL', '10'))
+
+# Typeahead index (built by `manage.py build_suggest_index`, memory-mapped by each worker)
+SUGGEST_INDEX_PATH = os.getenv('SUGGEST_INDEX_PATH', os.path.join(BASE_DIR, 'suggest.idx'))
+
+# Cover art variants (content-addressed resized covers, stored with the media files by default).
+# Local filesystem URLs are only served with DEBUG on, so in production they fall back to cover_url.
+COVER_STORAGE_BACKEND = os.getenv('COVER_STORAGE_BACKEND', DEFAULT_FILE_STORAGE)
+COVER_STORAGE_LOCATION = os.getenv('COVER_STORAGE_LOCATION', os.path.join(MEDIA_ROOT, 'covers'))
+COVER_STORAGE_URL = os.getenv('COVER_STORAGE_URL', f'{MEDIA_URL}covers/')
+COVER_WORKERS = int(os.getenv('COVER_WORKERS', '2'))
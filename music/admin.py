@@ -1,8 +1,8 @@
 from django.contrib import admin
+from django.db.models import Sum
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
-from django.db.models import Count, Avg
-from .models import Album, Review, Genre, Comment, Activity, ReviewLike, List, ListItem, ListLike
+from .models import Album, Artist, ArtistPhotoJob, DiscogsAlias, Review, Genre, Comment, Activity, ReviewLike, List, ListItem, ListLike
 
 @admin.register(Genre)
 class GenreAdmin(admin.ModelAdmin):
@@ -19,6 +19,29 @@ class GenreAdmin(admin.ModelAdmin):
         return obj.reviews.count()
     review_count.short_description = 'Reviews'
 
+@admin.register(Artist)
+class ArtistAdmin(admin.ModelAdmin):
+    list_display = ('name', 'discogs_id', 'has_photo', 'has_no_photo', 'photo_fetched_at')
+    list_filter = ('has_no_photo', 'photo_fetched_at')
+    search_fields = ('name', 'normalized_name', 'discogs_id')
+    readonly_fields = ('created_at', 'updated_at')
+    
+    def has_photo(self, obj):
+        return bool(obj.photo_url)
+    has_photo.boolean = True
+    has_photo.short_description = 'Photo'
+
+@admin.register(ArtistPhotoJob)
+class ArtistPhotoJobAdmin(admin.ModelAdmin):
+    list_display = ('artist_name', 'attempts', 'available_at', 'created_at')
+    search_fields = ('artist_name',)
+
+@admin.register(DiscogsAlias)
+class DiscogsAliasAdmin(admin.ModelAdmin):
+    list_display = ('discogs_id', 'canonical_id', 'kind', 'created_at')
+    list_filter = ('kind',)
+    search_fields = ('discogs_id', 'canonical_id')
+
 @admin.register(Album)
 class AlbumAdmin(admin.ModelAdmin):
     list_display = ('album_thumbnail', 'title', 'artist', 'year', 'genres_display', 'review_count', 'avg_rating', 'created_at')
@@ -27,6 +50,7 @@ class AlbumAdmin(admin.ModelAdmin):
     readonly_fields = ('id', 'created_at', 'updated_at', 'discogs_id', 'album_cover', 'review_count', 'avg_rating', 'total_likes')
     filter_horizontal = ('genres',)
     date_hierarchy = 'created_at'
+    list_select_related = ('stats',)
     
     fieldsets = (
         ('Basic Info', {
@@ -92,20 +116,23 @@ class AlbumAdmin(admin.ModelAdmin):
     
     def review_count(self, obj):
         """Show number of reviews for this album"""
-        return obj.reviews.count()
+        stats = getattr(obj, 'stats', None)
+        return stats.review_count if stats else 0
     review_count.short_description = 'Reviews'
+    review_count.admin_order_field = 'stats__review_count'
     
     def avg_rating(self, obj):
         """Show average rating for this album"""
-        avg = obj.reviews.aggregate(avg_rating=Avg('rating'))['avg_rating']
-        if avg:
-            return f"{avg:.1f}/10"
+        stats = getattr(obj, 'stats', None)
+        if stats and stats.average_rating:
+            return f"{stats.average_rating:.1f}/10"
         return "No ratings"
     avg_rating.short_description = 'Avg Rating'
+    avg_rating.admin_order_field = 'stats__average_rating'
     
     def total_likes(self, obj):
         """Total likes across all reviews for this album"""
-        return sum(review.likes.count() for review in obj.reviews.all())
+        return obj.reviews.aggregate(total=Sum('likes_count'))['total'] or 0
     total_likes.short_description = 'Total Likes'
     
     def export_album_data(self, request, queryset):
@@ -159,14 +186,6 @@ class ReviewAdmin(admin.ModelAdmin):
         return obj.album.artist
     album_artist.short_description = 'Artist'
     
-    def likes_count(self, obj):
-        return obj.likes.count()
-    likes_count.short_description = 'Likes'
-    
-    def comments_count(self, obj):
-        return obj.comments.count()
-    comments_count.short_description = 'Comments'
-    
     def pin_reviews(self, request, queryset):
         """Pin selected reviews"""
         updated = queryset.update(is_pinned=True)
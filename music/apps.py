@@ -2,4 +2,7 @@ from django.apps import AppConfig
 
 class MusicConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'music' 
\ No newline at end of file
+    name = 'music'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,110 @@
+"""
+Halfnote Artist Photo Queue
+Background backfill of missing album artist photos
+
+Album pages never wait on Discogs for a missing artist photo. They queue the
+artist as an ArtistPhotoJob and render without it; the drain_artist_photo_queue
+worker looks the artist up and writes the photo onto every album that lacks it.
+Jobs are claimed with a lease, so several workers can drain the same queue and
+a crashed worker's jobs become available again once the lease runs out.
+A job that keeps failing is parked rather than deleted, so the page views that
+queue its artist don't start it over; it gets one more try per GIVE_UP_FOR.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Album, ArtistPhotoJob
+from .services import get_artist_photo, get_known_artist_photos
+
+logger = logging.getLogger(__name__)
+
+# How long a claimed job stays invisible to other workers
+CLAIM_LEASE = timedelta(minutes=5)
+# Wait before retrying a failed lookup, multiplied by the attempts so far
+RETRY_BACKOFF = timedelta(minutes=10)
+# How long a job out of attempts waits before its next try
+GIVE_UP_FOR = timedelta(days=30)
+
+
+def queue_artist_photos(artist_names):
+    """Queue photo lookups for these artists; artists already queued are left alone"""
+    jobs = [
+        ArtistPhotoJob(artist_name=name[:255])
+        for name in set(artist_names) if name and name != 'Various Artists'
+    ]
+    if jobs:
+        ArtistPhotoJob.objects.bulk_create(jobs, ignore_conflicts=True)
+
+
+def apply_artist_photo(artist_name, photo_url):
+    """Write a photo onto every album by artist_name that has none; returns the albums updated"""
+    albums = Album.objects.filter(artist=artist_name).filter(
+        Q(artist_photo_url__isnull=True) | Q(artist_photo_url='')
+    )
+    discogs_ids = list(albums.values_list('discogs_id', flat=True))
+    if not discogs_ids:
+        return 0
+    updated = albums.update(artist_photo_url=photo_url)
+    # Cached album pages were built without the photo
+    cache.delete_many([f'album_{discogs_id}' for discogs_id in discogs_ids])
+    return updated
+
+
+def backfill_artist_photo(artist_name):
+    """
+    Look up one artist and fill in their albums' photos.
+    Returns (resolved, albums updated); an unresolved lookup failed and can be retried.
+    """
+    photo_url = get_artist_photo(artist_name)
+    # get_artist_photo records every answer, photo or not, but nothing for a failed call
+    if artist_name not in get_known_artist_photos([artist_name]):
+        return False, 0
+    return True, apply_artist_photo(artist_name, photo_url) if photo_url else 0
+
+
+def claim_artist_photo_jobs(limit):
+    """Lease up to limit due jobs to this worker"""
+    now = timezone.now()
+    with transaction.atomic():
+        jobs = list(
+            ArtistPhotoJob.objects.select_for_update(skip_locked=True)
+            .filter(available_at__lte=now).order_by('available_at')[:limit]
+        )
+        ArtistPhotoJob.objects.filter(pk__in=[job.pk for job in jobs]).update(
+            available_at=now + CLAIM_LEASE, attempts=F('attempts') + 1
+        )
+    return jobs
+
+
+def drain_artist_photo_queue(limit=50):
+    """Work through up to limit due jobs; returns (resolved, failed, albums updated)"""
+    resolved = failed = updated = 0
+    for job in claim_artist_photo_jobs(limit):
+        try:
+            done, count = backfill_artist_photo(job.artist_name)
+        except Exception as e:
+            logger.error(f"Artist photo backfill failed for {job.artist_name}: {e}")
+            done, count = False, 0
+
+        attempts = job.attempts + 1
+        if done:
+            resolved += 1
+            updated += count
+            ArtistPhotoJob.objects.filter(pk=job.pk).delete()
+        elif attempts >= ArtistPhotoJob.MAX_ATTEMPTS:
+            failed += 1
+            logger.warning(f"Giving up on artist photo for {job.artist_name} after {attempts} attempts")
+            # Kept so queue_artist_photos leaves the artist alone instead of queueing it afresh
+            ArtistPhotoJob.objects.filter(pk=job.pk).update(available_at=timezone.now() + GIVE_UP_FOR)
+        else:
+            failed += 1
+            ArtistPhotoJob.objects.filter(pk=job.pk).update(
+                available_at=timezone.now() + RETRY_BACKOFF * attempts
+            )
+    return resolved, failed, updated
@@ -3,8 +3,12 @@ Halfnote Cache Utils
 Simple caching utilities for improved performance
 """
 
+import time
+from django.conf import settings
 from django.core.cache import cache
 
+from .text_utils import normalize_text
+
 
 def cache_key_for_user_reviews(username):
     """Generate cache key for user reviews"""
@@ -21,14 +25,30 @@ def cache_key_for_activity_feed(user_id):
     return f"activity_feed_{user_id}"
 
 
-def cache_key_for_search_results(query):
-    """Generate cache key for search results"""
-    # Simple hash of query for cache key
+def cache_key_for_search_results(query, page_size, cursor=''):
+    """Generate cache key for one page of search results (query should already be normalized)"""
+    # Simple hash of query and page for cache key
     import hashlib
-    query_hash = hashlib.md5(query.encode()).hexdigest()[:8]
+    query_hash = hashlib.md5(f"{query}|{page_size}|{cursor}".encode()).hexdigest()[:16]
     return f"search_{query_hash}"
 
 
+def cache_key_for_artist_photo(artist_name):
+    """Generate cache key for an artist photo lookup"""
+    return f"artist_photo_{normalize_text(artist_name)}"
+
+
+def get_redis_client():
+    """Raw Redis connection when the cache is Redis-backed, otherwise None"""
+    if settings.CACHES.get('default', {}).get('BACKEND') != 'django_redis.cache.RedisCache':
+        return None
+    try:
+        from django_redis import get_redis_connection
+        return get_redis_connection("default")
+    except Exception:
+        return None
+
+
 def invalidate_user_cache(username):
     """Clear user-related caches"""
     cache.delete_many([
@@ -51,4 +71,66 @@ def cache_expensive_query(cache_key, query_func, timeout=300):
     
     result = query_func()
     cache.set(cache_key, result, timeout)
-    return result
\ No newline at end of file
+    return result
+
+
+def stale_cache_key(cache_key):
+    """Key holding the last good value of cache_key, kept well past its expiry"""
+    return f"stale_{cache_key}"
+
+
+def flight_lock_key(cache_key):
+    """Key of the lock single_flight holds while computing cache_key"""
+    return f"lock_{cache_key}"
+
+
+def single_flight(cache_key, compute, timeout=300, lock_timeout=15, wait_timeout=5,
+                  poll_interval=0.1, stale_timeout=86400):
+    """
+    Get cache_key, computing it at most once across workers on a miss.
+
+    The first caller takes a short lock and runs compute(); concurrent callers
+    poll for its result and fall back to the last stale copy if it doesn't
+    arrive within wait_timeout. Without a stale copy they keep waiting until the
+    lock is released or expires, and only then compute it themselves.
+    Returns (value, is_stale). None results are never cached.
+    """
+    value = cache.get(cache_key)
+    if value is not None:
+        return value, False
+
+    def compute_and_store():
+        result = compute()
+        if result is not None:
+            cache.set(cache_key, result, timeout)
+            cache.set(stale_cache_key(cache_key), result, stale_timeout)
+        return result
+
+    lock_key = flight_lock_key(cache_key)
+    if cache.add(lock_key, 1, lock_timeout):
+        try:
+            return compute_and_store(), False
+        finally:
+            cache.delete(lock_key)
+
+    # Someone else is computing: wait for their result, at most as long as their lock lasts
+    started = time.monotonic()
+    checked_stale = False
+    while time.monotonic() - started < lock_timeout:
+        time.sleep(poll_interval)
+        value = cache.get(cache_key)
+        if value is not None:
+            return value, False
+        if cache.get(lock_key) is None:
+            break
+        if not checked_stale and time.monotonic() - started >= wait_timeout:
+            checked_stale = True
+            value = cache.get(stale_cache_key(cache_key))
+            if value is not None:
+                return value, True
+
+    value = cache.get(stale_cache_key(cache_key))
+    if value is not None:
+        return value, True
+
+    return compute_and_store(), False
@@ -0,0 +1,163 @@
+"""
+Halfnote Cover Art Variants
+Fetches each album cover once and stores small, fixed-size copies of it
+
+Discogs covers are often 600px+ JPEGs weighing hundreds of kilobytes, while
+the profile grid, list previews and activity feed only show small tiles.
+Each cover is downloaded once, resized to every size in COVER_SIZES and
+encoded as WebP and JPEG. Files are named after the SHA-256 of the source
+image, so a cover shared by several albums (or re-fetched later) is only
+stored once, and a name never points at different content.
+"""
+
+import hashlib
+import io
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import requests
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.db import connections
+from django.utils.module_loading import import_string
+from PIL import Image, ImageOps
+
+from .models import Album
+from .services import get_discogs_client
+
+logger = logging.getLogger(__name__)
+
+# Longest edge in pixels; tiles are drawn at half these sizes on high-density screens
+COVER_SIZES = {
+    'thumb': 128,
+    'small': 300,
+    'medium': 600,
+}
+COVER_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+MAX_SOURCE_BYTES = 10 * 1024 * 1024
+FETCH_TIMEOUT = (3, 15)
+
+
+@lru_cache(maxsize=1)
+def get_cover_storage():
+    """Storage backend for cover variants (the media storage unless configured)"""
+    storage_class = import_string(settings.COVER_STORAGE_BACKEND)
+    if issubclass(storage_class, FileSystemStorage):
+        return storage_class(location=settings.COVER_STORAGE_LOCATION, base_url=settings.COVER_STORAGE_URL)
+    return storage_class()
+
+
+def fetch_cover(url):
+    """Download a cover image, refusing anything larger than MAX_SOURCE_BYTES"""
+    # Covers are served by Discogs too, so share its session's connection pool and retries
+    response = get_discogs_client().session.get(
+        url, stream=True, timeout=FETCH_TIMEOUT, headers={'Accept': 'image/*'}
+    )
+    response.raise_for_status()
+
+    data = bytearray()
+    for chunk in response.iter_content(64 * 1024):
+        data.extend(chunk)
+        if len(data) > MAX_SOURCE_BYTES:
+            response.close()
+            raise ValueError(f'Cover is larger than {MAX_SOURCE_BYTES} bytes')
+    return bytes(data)
+
+
+def render_variants(data):
+    """Encode the source image at every size and format, as {(size, format): bytes}"""
+    with Image.open(io.BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source).convert('RGB')
+
+    rendered = {}
+    for size, edge in COVER_SIZES.items():
+        resized = image.copy()
+        # thumbnail() keeps the aspect ratio and never enlarges small covers
+        resized.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+        for image_format, (pil_format, options) in COVER_FORMATS.items():
+            buffer = io.BytesIO()
+            resized.save(buffer, pil_format, **options)
+            rendered[(size, image_format)] = buffer.getvalue()
+    return rendered
+
+
+def variant_name(digest, size, image_format):
+    name = f'{digest[:2]}/{digest}/{size}.{image_format}'
+    # A local storage is already rooted at COVER_STORAGE_LOCATION; the shared media storage gets a folder
+    return name if isinstance(get_cover_storage(), FileSystemStorage) else f'covers/{name}'
+
+
+def build_cover_variants(album, force=False):
+    """
+    Build and store the resized covers for an album and record their URLs.
+    Returns the album's cover_variants, or None if the cover couldn't be processed.
+    """
+    if not album.cover_url:
+        return None
+    if not force and album.cover_images:
+        return album.cover_variants
+
+    try:
+        data = fetch_cover(album.cover_url)
+        digest = hashlib.sha256(data).hexdigest()
+        storage = get_cover_storage()
+
+        names = {
+            (size, image_format): variant_name(digest, size, image_format)
+            for size in COVER_SIZES for image_format in COVER_FORMATS
+        }
+        # Content-addressed: files already written for this image are reused as-is
+        missing = {key: name for key, name in names.items() if not storage.exists(name)}
+        if missing:
+            rendered = render_variants(data)
+            for key, name in missing.items():
+                names[key] = storage.save(name, ContentFile(rendered[key]))
+    except (requests.RequestException, OSError, ValueError, Image.DecompressionBombError) as e:
+        logger.warning(f"Could not build cover variants for {album.discogs_id}: {e}")
+        return None
+
+    sizes = {}
+    for (size, image_format), name in names.items():
+        sizes.setdefault(size, {})[image_format] = storage.url(name)
+    variants = {'source': album.cover_url, 'sha256': digest, 'sizes': sizes}
+
+    # update() so building covers doesn't bump updated_at or race other album writes
+    Album.objects.filter(pk=album.pk).update(cover_variants=variants)
+    album.cover_variants = variants
+    return variants
+
+
+# Small pool so newly imported albums get their variants without delaying the request
+_cover_executor = ThreadPoolExecutor(max_workers=settings.COVER_WORKERS, thread_name_prefix='cover-variants')
+_cover_jobs = set()
+_cover_jobs_lock = threading.Lock()
+
+
+def _build_cover_variants_task(album_id):
+    try:
+        album = Album.objects.filter(pk=album_id).first()
+        if album:
+            build_cover_variants(album)
+    except Exception as e:
+        logger.error(f"Cover variant job failed for {album_id}: {e}")
+    finally:
+        with _cover_jobs_lock:
+            _cover_jobs.discard(album_id)
+        connections.close_all()
+
+
+def schedule_cover_variants(album):
+    """Build an album's cover variants in the background if they're missing"""
+    if not album.cover_url or album.cover_images:
+        return
+    with _cover_jobs_lock:
+        if album.pk in _cover_jobs:
+            return
+        _cover_jobs.add(album.pk)
+    _cover_executor.submit(_build_cover_variants_task, album.pk)
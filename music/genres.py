@@ -0,0 +1,117 @@
+"""
+Halfnote Genre Registry
+In-process map of genre names to IDs
+
+Genres are a small, nearly static set seeded from Genre.PREDEFINED_GENRES, so
+each worker loads the whole table once and resolves review genres from memory.
+Unknown names are created in one bulk insert and only added to the map once
+that insert commits. The map is reloaded periodically and dropped whenever this
+process changes a genre, so renames and deletions made elsewhere are picked up
+within RELOAD_SECONDS, or straight away when a review is tagged with a genre
+that no longer exists.
+"""
+
+import threading
+import time
+
+from django.db import IntegrityError, connection, transaction
+
+from .models import Genre
+
+RELOAD_SECONDS = 300
+
+_genre_ids = None
+_loaded_at = 0.0
+_lock = threading.Lock()
+
+
+def _registry():
+    global _genre_ids, _loaded_at
+
+    now = time.monotonic()
+    with _lock:
+        if _genre_ids is None or now - _loaded_at >= RELOAD_SECONDS:
+            _genre_ids = dict(Genre.objects.values_list('name', 'id'))
+            _loaded_at = now
+        return _genre_ids
+
+
+def forget_genres():
+    """Drop the map so the next lookup reloads it"""
+    global _genre_ids
+    with _lock:
+        _genre_ids = None
+
+
+def clean_genre_names(names):
+    """Distinct, stripped genre names in submitted order, skipping anything that can't be a genre"""
+    if not isinstance(names, (list, tuple)):
+        return []
+    max_length = Genre._meta.get_field('name').max_length
+    cleaned = []
+    for name in names:
+        if isinstance(name, str):
+            name = name.strip()
+            if name and len(name) <= max_length and name not in cleaned:
+                cleaned.append(name)
+    return cleaned
+
+
+def get_genre_ids(names):
+    """IDs for genre names, creating the ones that don't exist yet; no queries once they're known"""
+    names = clean_genre_names(names)
+    registry = _registry()
+    missing = [name for name in names if name not in registry]
+    if missing:
+        Genre.objects.bulk_create([Genre(name=name) for name in missing], ignore_conflicts=True)
+        created = dict(Genre.objects.filter(name__in=missing).values_list('name', 'id'))
+        # A rolled back transaction takes the new genres with it, so don't map them before it commits
+        transaction.on_commit(lambda: _remember(created))
+        registry = {**registry, **created}
+    return [registry[name] for name in names if name in registry]
+
+
+def _remember(genre_ids):
+    with _lock:
+        if _genre_ids is not None:
+            _genre_ids.update(genre_ids)
+
+
+def existing_genre_ids(names):
+    """IDs for the genre names that already exist, matched case-insensitively; never creates any"""
+    by_name = {name.lower(): genre_id for name, genre_id in _registry().items()}
+    genre_ids = []
+    for name in clean_genre_names(names):
+        genre_id = by_name.get(name.lower())
+        if genre_id is not None and genre_id not in genre_ids:
+            genre_ids.append(genre_id)
+    return genre_ids
+
+
+def _write_review_genres(review, names, write):
+    """Run write(genre_ids), reloading the map and retrying once if it held a deleted genre"""
+    table = review.user_genres.through._meta.db_table
+    for attempt in range(2):
+        try:
+            with transaction.atomic():
+                write(get_genre_ids(names))
+                # Foreign keys are only checked at commit; check them here so a stale ID can be retried
+                connection.check_constraints(table_names=[table])
+            return
+        except IntegrityError:
+            if attempt:
+                raise
+            forget_genres()
+
+
+def add_review_genres(review, names):
+    """Tag a new review with genres in one through-table insert"""
+    through = review.user_genres.through
+    _write_review_genres(review, names, lambda genre_ids: through.objects.bulk_create(
+        [through(review_id=review.pk, genre_id=genre_id) for genre_id in genre_ids]
+    ))
+
+
+def set_review_genres(review, names):
+    """Replace an existing review's genres, writing only the rows that change"""
+    _write_review_genres(review, names, review.user_genres.set)
@@ -0,0 +1,189 @@
+"""
+Halfnote Review Likes
+Idempotent like/unlike with write-behind like counts
+
+Liking is one INSERT ... ON CONFLICT DO NOTHING and unliking one DELETE, each
+reporting whether a row actually changed, so double taps and replayed
+requests change nothing. Only real changes touch the count. By default the
+column is updated straight away. With LIKE_COUNT_WRITE_BEHIND and Redis they
+are added to a hash of pending deltas instead, which is moved onto
+Review.likes_count in a few UPDATEs, so a burst of likes on one review never
+queues up on its row. Like requests flush the hash themselves at most every
+LIKE_COUNT_FLUSH_INTERVAL seconds (there may be no worker to run the
+flush_like_counts command), so the column trails by about that long.
+
+These statements skip the ReviewLike signals, so the count and trending
+updates they would make are done here. An unlike withdraws its like from the
+trending charts, so unliking and liking again doesn't keep adding to them. Likes created or deleted any other
+way (admin, cascades) still go through the signals.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .cache_utils import get_redis_client
+from .models import Activity, Review, ReviewLike
+from .signals import adjust_review_counter
+from .trending import record_trending_event, withdraw_trending_event
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = 'review_like_deltas'
+FLUSHING_KEY = 'review_like_deltas_flushing'
+FLUSH_LOCK_KEY = 'review_like_deltas_lock'
+FLUSH_LOCK_TIMEOUT = 300
+FLUSH_THROTTLE_KEY = 'review_like_deltas_flushed'
+
+
+def _keys():
+    # make_key applies the cache prefix so the hashes sit alongside the rest of the cache
+    return cache.make_key(PENDING_KEY), cache.make_key(FLUSHING_KEY)
+
+
+def _unflushed(redis, review_id, delta=0):
+    """Pending change to a review's count, adding delta to it first"""
+    pending_key, flushing_key = _keys()
+    pipe = redis.pipeline()
+    if delta:
+        pipe.hincrby(pending_key, review_id, delta)
+    else:
+        pipe.hget(pending_key, review_id)
+    pipe.hget(flushing_key, review_id)
+    pending, flushing = pipe.execute()
+    return int(pending or 0) + int(flushing or 0)
+
+
+def _write_behind_client():
+    """Redis client holding pending count changes, or None when counts are written straight away"""
+    if not settings.LIKE_COUNT_WRITE_BEHIND:
+        return None
+    return get_redis_client()
+
+
+def like_count(review):
+    """Likes on a review, including changes not flushed to the database yet"""
+    redis = _write_behind_client()
+    if redis is not None:
+        try:
+            return max(review.likes_count + _unflushed(redis, review.pk), 0)
+        except Exception as e:
+            logger.warning(f"Could not read pending likes for review {review.pk}: {e}")
+    return review.likes_count
+
+
+def _count_like(review, delta):
+    """Record one like (1) or unlike (-1) in the review's count; returns the count to show"""
+    redis = _write_behind_client()
+    if redis is not None:
+        try:
+            count = max(review.likes_count + _unflushed(redis, review.pk, delta), 0)
+            _flush_if_due()
+            return count
+        except Exception as e:
+            # Count it in the database rather than lose it
+            logger.warning(f"Could not queue like count change for review {review.pk}: {e}")
+    adjust_review_counter(review.pk, 'likes_count', delta)
+    return max(review.likes_count + delta, 0)
+
+
+def _db_datetime(value):
+    # Backends without a native timestamp type return text; their stored times are UTC
+    value = ReviewLike._meta.get_field('created_at').to_python(value)
+    return value if timezone.is_aware(value) else timezone.make_aware(value, dt_timezone.utc)
+
+
+def _flush_if_due():
+    # The first like request after each interval writes everyone's pending changes
+    if not cache.add(FLUSH_THROTTLE_KEY, 1, settings.LIKE_COUNT_FLUSH_INTERVAL):
+        return
+    try:
+        flush_like_counts()
+    except Exception as e:
+        # Still pending; a later request or the command picks them up
+        logger.warning(f"Could not flush like counts: {e}")
+
+
+def like_review(user, review):
+    """Like a review as user; returns (created, like count). Liking it again changes nothing."""
+    table = connection.ops.quote_name(ReviewLike._meta.db_table)
+    liked_at = timezone.now()
+    created_at = ReviewLike._meta.get_field('created_at').get_db_prep_value(liked_at, connection)
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {table} (user_id, review_id, created_at) VALUES (%s, %s, %s) '
+                'ON CONFLICT (user_id, review_id) DO NOTHING RETURNING id',
+                [user.pk, review.pk, created_at],
+            )
+            created = cursor.fetchone() is not None
+        if created:
+            Activity.objects.create(user=user, activity_type='review_liked', review=review)
+
+    if not created:
+        return False, like_count(review)
+    # The like's own timestamp, so an unlike can take back exactly what it added
+    record_trending_event('like', review.pk, liked_at)
+    return True, _count_like(review, 1)
+
+
+def unlike_review(user, review):
+    """Remove user's like from a review; returns (deleted, like count). Unliking again changes nothing."""
+    table = connection.ops.quote_name(ReviewLike._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {table} WHERE user_id = %s AND review_id = %s RETURNING created_at',
+            [user.pk, review.pk],
+        )
+        row = cursor.fetchone()
+
+    if row is None:
+        return False, like_count(review)
+    withdraw_trending_event('like', review.pk, _db_datetime(row[0]))
+    return True, _count_like(review, -1)
+
+
+def flush_like_counts():
+    """
+    Move pending like count changes onto Review.likes_count; returns the number
+    of reviews updated. Also flushes what's left after write-behind is turned off. A flush that died part way is finished first, which can
+    apply its batch twice if it died after committing; reconcile_review_counters
+    repairs that.
+    """
+    redis = get_redis_client()
+    if redis is None:
+        return 0
+
+    lock = redis.lock(cache.make_key(FLUSH_LOCK_KEY), timeout=FLUSH_LOCK_TIMEOUT)
+    if not lock.acquire(blocking=False):
+        # Another worker is flushing
+        return 0
+    try:
+        pending_key, flushing_key = _keys()
+        if not redis.exists(flushing_key):
+            if not redis.exists(pending_key):
+                return 0
+            # New likes start a fresh hash while this batch is written
+            redis.rename(pending_key, flushing_key)
+
+        by_delta = defaultdict(list)
+        for review_id, delta in redis.hgetall(flushing_key).items():
+            if int(delta):
+                by_delta[int(delta)].append(int(review_id))
+        # Reviews with the same change share one UPDATE
+        with transaction.atomic():
+            for delta, review_ids in by_delta.items():
+                Review.objects.filter(pk__in=review_ids).update(
+                    likes_count=Greatest(F('likes_count') + delta, 0)
+                )
+        redis.delete(flushing_key)
+        return sum(len(review_ids) for review_ids in by_delta.values())
+    finally:
+        lock.release()
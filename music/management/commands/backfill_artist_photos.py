@@ -0,0 +1,77 @@
+"""
+Management command to backfill artist photos for every album missing one
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from music.artist_photos import backfill_artist_photo, queue_artist_photos
+from music.models import Album
+
+
+class Command(BaseCommand):
+    help = 'Look up artist photos for all albums without one, in rate-limited batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=25,
+            help='Artists looked up per batch',
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=5.0,
+            help='Seconds to wait between batches, leaving Discogs budget for live traffic',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            help='Stop after this many artists',
+        )
+        parser.add_argument(
+            '--queue',
+            action='store_true',
+            help='Only queue the artists for drain_artist_photo_queue instead of looking them up here',
+        )
+
+    def handle(self, *args, **options):
+        artists = Album.objects.filter(
+            Q(artist_photo_url__isnull=True) | Q(artist_photo_url='')
+        ).exclude(artist='Various Artists').values_list('artist', flat=True).distinct().order_by('artist')
+        if options.get('limit'):
+            artists = artists[:options['limit']]
+        artists = list(artists)
+
+        if options['queue']:
+            queue_artist_photos(artists)
+            self.stdout.write(self.style.SUCCESS(f'Queued {len(artists)} artists'))
+            return
+
+        batch_size = options['batch_size']
+        resolved = updated = 0
+        failed = []
+        for start in range(0, len(artists), batch_size):
+            if start:
+                time.sleep(options['pause'])
+            for artist_name in artists[start:start + batch_size]:
+                done, count = backfill_artist_photo(artist_name)
+                if done:
+                    resolved += 1
+                    updated += count
+                else:
+                    failed.append(artist_name)
+            self.stdout.write(
+                f'{min(start + batch_size, len(artists))}/{len(artists)} artists, '
+                f'{updated} albums updated, {len(failed)} failed'
+            )
+
+        if failed:
+            # The worker retries these with backoff
+            queue_artist_photos(failed)
+            self.stdout.write(f'Queued {len(failed)} failed lookups for drain_artist_photo_queue')
+        self.stdout.write(self.style.SUCCESS(
+            f'Backfill complete: {resolved} artists resolved, {updated} albums updated'
+        ))
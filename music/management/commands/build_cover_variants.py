@@ -0,0 +1,72 @@
+"""
+Management command to build resized cover art for albums
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from music.covers import build_cover_variants
+from music.models import Album
+
+
+class Command(BaseCommand):
+    help = 'Download album covers once and store their resized WebP/JPEG variants'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            help='Process at most this many albums',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Rebuild variants even for albums that already have them',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Covers downloaded and resized in parallel',
+        )
+
+    def handle(self, *args, **options):
+        force = options['force']
+        limit = options.get('limit')
+        albums = Album.objects.exclude(cover_url__isnull=True).exclude(cover_url='').only(
+            'id', 'discogs_id', 'cover_url', 'cover_variants'
+        ).order_by('created_at')
+
+        built = failed = 0
+        batch = []
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            for album in albums.iterator(chunk_size=500):
+                # Whether stored variants match the current cover is only known on the model
+                if not force and album.cover_images:
+                    continue
+                if limit and built + failed + len(batch) >= limit:
+                    break
+                batch.append(album)
+                if len(batch) >= 100:
+                    ok, bad = self._run(executor, batch, force)
+                    built, failed = built + ok, failed + bad
+                    self.stdout.write(f'{built} built, {failed} failed')
+                    batch = []
+            if batch:
+                ok, bad = self._run(executor, batch, force)
+                built, failed = built + ok, failed + bad
+
+        self.stdout.write(self.style.SUCCESS(f'Cover variants complete: {built} built, {failed} failed'))
+
+    def _run(self, executor, albums, force):
+        results = list(executor.map(lambda album: self._build(album, force), albums))
+        built = sum(1 for result in results if result)
+        return built, len(results) - built
+
+    def _build(self, album, force):
+        try:
+            return build_cover_variants(album, force=force)
+        finally:
+            # Pool threads open their own connections for the update
+            connections.close_all()
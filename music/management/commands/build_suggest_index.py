@@ -0,0 +1,58 @@
+"""
+Management command to build the memory-mapped typeahead index
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from music.models import Album
+from music.suggest import write_index
+
+
+class Command(BaseCommand):
+    help = 'Build the album/artist typeahead index used by /api/music/search/suggest/'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            type=str,
+            help='Index file to write (defaults to SUGGEST_INDEX_PATH)',
+        )
+
+    def handle(self, *args, **options):
+        output = options.get('output') or settings.SUGGEST_INDEX_PATH
+        started = time.monotonic()
+
+        entries = []
+        artist_weights = {}
+        albums = Album.objects.annotate(
+            review_total=Count('reviews')
+        ).values_list('discogs_id', 'title', 'artist', 'year', 'cover_url', 'review_total')
+
+        for discogs_id, title, artist, year, cover_url, review_total in albums.iterator(chunk_size=5000):
+            # Reviewed albums rank above the long tail of imported ones
+            weight = 1 + review_total * 10
+            payload = {
+                'type': 'album',
+                'title': title,
+                'artist': artist,
+                'year': year,
+                'cover_url': cover_url,
+                'discogs_id': discogs_id,
+            }
+            entries.append((title, weight, payload))
+            entries.append((f'{artist} {title}', weight, payload))
+
+            if artist and artist != 'Various Artists':
+                name, total = artist_weights.get(artist.casefold(), (artist, 0))
+                artist_weights[artist.casefold()] = (name, total + weight)
+
+        for name, weight in artist_weights.values():
+            entries.append((name, weight, {'type': 'artist', 'name': name}))
+
+        count = write_index(output, entries)
+        self.stdout.write(
+            self.style.SUCCESS(f'Wrote {count} suggest entries to {output} in {time.monotonic() - started:.1f}s')
+        )
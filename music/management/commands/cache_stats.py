@@ -30,6 +30,8 @@ class Command(BaseCommand):
             else:
                 stats = self._get_database_stats()
             
+            stats['discogs_circuit'] = self._get_circuit_stats()
+            
             if output_json:
                 self.stdout.write(json.dumps(stats, indent=2))
             else:
@@ -108,6 +110,14 @@ class Command(BaseCommand):
                     'error': str(cache_error)
                 }
     
+    def _get_circuit_stats(self):
+        """Get the Discogs circuit breaker state shared by all workers"""
+        try:
+            from music.services import DiscogsClient
+            return DiscogsClient.build_breaker().state()
+        except Exception as e:
+            return {'state': 'unknown', 'error': str(e)}
+    
     def _get_database_stats(self):
         """Get database cache statistics"""
         from django.db import connection
@@ -205,6 +215,17 @@ class Command(BaseCommand):
             self.stdout.write(f'❌ Expired Entries: {stats.get("expired_entries", 0)}')
             self.stdout.write(f'💾 Table Size: {stats.get("table_size", "Unknown")}')
         
+        circuit = stats.get('discogs_circuit')
+        if circuit:
+            self.stdout.write('')
+            state = circuit.get('state', 'unknown')
+            if state == 'closed':
+                self.stdout.write(self.style.SUCCESS(f'🔌 Discogs Circuit: {state}'))
+            else:
+                self.stdout.write(self.style.WARNING(f'🔌 Discogs Circuit: {state}'))
+            self.stdout.write(f'   • Calls this window: {circuit.get("window_calls", 0)}')
+            self.stdout.write(f'   • Failures this window: {circuit.get("window_failures", 0)}')
+        
         self.stdout.write('')
         self.stdout.write('💡 Tip: Use --json flag for machine-readable output')
         self.stdout.write('💡 Tip: Use --keys flag to see sample cache keys (Redis only)') 
\ No newline at end of file
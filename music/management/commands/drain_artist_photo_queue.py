@@ -0,0 +1,52 @@
+"""
+Management command to work through queued artist photo lookups
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from music.artist_photos import drain_artist_photo_queue
+
+
+class Command(BaseCommand):
+    help = 'Look up queued artist photos on Discogs and write them onto albums missing one'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50,
+            help='Jobs claimed per batch',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running as a worker, polling when the queue is empty',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=10.0,
+            help='Seconds to wait between polls of an empty queue (with --loop)',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        total_resolved = total_failed = total_updated = 0
+
+        while True:
+            resolved, failed, updated = drain_artist_photo_queue(batch_size)
+            total_resolved += resolved
+            total_failed += failed
+            total_updated += updated
+            if resolved or failed:
+                self.stdout.write(f'{resolved} artists resolved, {failed} failed, {updated} albums updated')
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['poll_interval'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Queue drained: {total_resolved} artists resolved, {total_failed} failed, '
+            f'{total_updated} albums updated'
+        ))
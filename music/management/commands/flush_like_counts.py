@@ -0,0 +1,38 @@
+"""
+Management command to write pending like counts to the database
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from music.likes import flush_like_counts
+
+
+class Command(BaseCommand):
+    help = 'Move like count changes queued in Redis onto Review.likes_count'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running as a worker, flushing every --interval seconds',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5.0,
+            help='Seconds between flushes (with --loop)',
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            updated = flush_like_counts()
+            total += updated
+            if updated:
+                self.stdout.write(f'{updated} reviews updated')
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f'Like counts flushed: {total} reviews updated'))
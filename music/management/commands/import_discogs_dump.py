@@ -0,0 +1,240 @@
+"""
+Management command to bootstrap the album catalog from a Discogs data dump
+"""
+import gzip
+import json
+import os
+import time
+import xml.etree.ElementTree as ET
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from music.models import Album
+from music.services import ExternalMusicService
+
+
+class Command(BaseCommand):
+    help = 'Import albums from a gzipped Discogs monthly masters or releases XML dump'
+
+    # Fields refreshed on albums that already exist, per dump type
+    UPDATE_FIELDS = {
+        'masters': ['title', 'artist', 'year', 'discogs_genres', 'discogs_styles', 'updated_at'],
+        'releases': ['title', 'artist', 'year', 'discogs_genres', 'discogs_styles',
+                     'tracklist', 'credits', 'updated_at'],
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument('dump_path', type=str, help='Path to discogs_*_masters.xml.gz or discogs_*_releases.xml.gz')
+        parser.add_argument(
+            '--type',
+            choices=['masters', 'releases'],
+            help='Dump type (detected from the file name if omitted)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Albums per bulk upsert',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            help='Stop after this many dump records (useful for sample runs)',
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Continue from the last committed batch recorded in the state file',
+        )
+        parser.add_argument(
+            '--state-file',
+            type=str,
+            help='Progress file used by --resume (defaults to <dump_path>.progress)',
+        )
+
+    def handle(self, *args, **options):
+        dump_path = options['dump_path']
+        if not os.path.exists(dump_path):
+            raise CommandError(f'Dump file not found: {dump_path}')
+
+        dump_type = options.get('type') or self._detect_type(dump_path)
+        batch_size = options['batch_size']
+        limit = options.get('limit')
+        state_file = options.get('state_file') or f'{dump_path}.progress'
+
+        skip = self._load_state(state_file, dump_path) if options.get('resume') else 0
+        if skip:
+            self.stdout.write(f'Resuming after {skip} records')
+
+        self.service = ExternalMusicService()
+        parse_record = self._parse_master if dump_type == 'masters' else self._parse_release
+        record_tag = 'master' if dump_type == 'masters' else 'release'
+
+        processed = skip
+        imported = 0
+        batch = {}
+        started = time.monotonic()
+
+        for index, elem in enumerate(self._iter_records(dump_path, record_tag)):
+            if index < skip:
+                continue
+            if limit and index >= limit:
+                break
+
+            album = parse_record(elem)
+            if album:
+                batch[album.discogs_id] = album
+            processed = index + 1
+
+            if len(batch) >= batch_size:
+                imported += self._flush(batch, dump_type)
+                self._save_state(state_file, dump_path, processed)
+                self._report(processed, imported, skip, started)
+
+        if batch:
+            imported += self._flush(batch, dump_type)
+            self._report(processed, imported, skip, started)
+        self._save_state(state_file, dump_path, processed)
+
+        self.stdout.write(self.style.SUCCESS(f'Import complete: {imported} albums upserted from {processed} records'))
+
+    def _detect_type(self, dump_path):
+        name = os.path.basename(dump_path)
+        if 'masters' in name:
+            return 'masters'
+        if 'releases' in name:
+            return 'releases'
+        raise CommandError('Could not detect dump type from the file name, pass --type')
+
+    def _iter_records(self, dump_path, record_tag):
+        """Yield top-level record elements, discarding each one once it's been used"""
+        opener = gzip.open if dump_path.endswith('.gz') else open
+        with opener(dump_path, 'rb') as dump:
+            depth = 0
+            root = None
+            for event, elem in ET.iterparse(dump, events=('start', 'end')):
+                if event == 'start':
+                    if root is None:
+                        root = elem
+                    depth += 1
+                    continue
+
+                depth -= 1
+                if depth == 1 and elem.tag == record_tag:
+                    yield elem
+                    # Drop parsed records so memory stays constant
+                    root.clear()
+
+    def _flush(self, batch, dump_type):
+        albums = list(batch.values())
+        batch.clear()
+        with transaction.atomic():
+            Album.objects.bulk_create(
+                albums,
+                update_conflicts=True,
+                unique_fields=['discogs_id'],
+                update_fields=self.UPDATE_FIELDS[dump_type],
+            )
+        return len(albums)
+
+    def _report(self, processed, imported, skip, started):
+        elapsed = max(time.monotonic() - started, 0.001)
+        rate = (processed - skip) / elapsed
+        self.stdout.write(f'{processed} records read, {imported} albums upserted ({rate:.0f} records/s)')
+
+    def _load_state(self, state_file, dump_path):
+        try:
+            with open(state_file) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        if state.get('dump_path') != os.path.abspath(dump_path):
+            raise CommandError(f'State file {state_file} belongs to a different dump')
+        return state.get('processed', 0)
+
+    def _save_state(self, state_file, dump_path, processed):
+        tmp_file = f'{state_file}.tmp'
+        with open(tmp_file, 'w') as f:
+            json.dump({'dump_path': os.path.abspath(dump_path), 'processed': processed}, f)
+        os.replace(tmp_file, state_file)
+
+    # ------------------------------------------------------------------
+    # Record parsing
+    # ------------------------------------------------------------------
+
+    def _text(self, elem, path):
+        return (elem.findtext(path) or '').strip()
+
+    def _main_artist(self, elem):
+        name = self._text(elem, 'artists/artist/name')
+        return self.service._clean_artist_name(name)[:255] if name else 'Unknown Artist'
+
+    def _year(self, value):
+        value = (value or '')[:4]
+        return int(value) if value.isdigit() and int(value) > 0 else None
+
+    def _cover_url(self, elem):
+        images = elem.findall('images/image')
+        primary = [img for img in images if img.get('type') == 'primary'] or images
+        uri = primary[0].get('uri') if primary else ''
+        return uri or None
+
+    def _artists(self, elem, path):
+        artists = []
+        for artist in elem.findall(path):
+            artists.append({
+                'id': self._text(artist, 'id'),
+                'name': self.service._clean_artist_name(self._text(artist, 'name')),
+                'role': self._text(artist, 'role'),
+            })
+        return artists
+
+    def _album(self, discogs_id, elem, year, **extra):
+        return Album(
+            discogs_id=discogs_id,
+            title=self._text(elem, 'title')[:255],
+            artist=self._main_artist(elem),
+            year=year,
+            cover_url=self._cover_url(elem),
+            discogs_genres=[g.text for g in elem.findall('genres/genre') if g.text],
+            discogs_styles=[s.text for s in elem.findall('styles/style') if s.text],
+            **extra
+        )
+
+    def _parse_master(self, elem):
+        discogs_id = elem.get('id')
+        if not discogs_id:
+            return None
+        return self._album(discogs_id, elem, self._year(self._text(elem, 'year')))
+
+    def _parse_release(self, elem):
+        if elem.get('status', 'Accepted') != 'Accepted':
+            return None
+
+        # Search and album pages use master ids, so only a master's main release represents it
+        master = elem.find('master_id')
+        if master is not None and master.text:
+            if master.get('is_main_release') != 'true':
+                return None
+            discogs_id = master.text.strip()
+        else:
+            discogs_id = elem.get('id')
+        if not discogs_id:
+            return None
+
+        tracklist = []
+        for track in elem.findall('tracklist/track'):
+            tracklist.append({
+                'position': self._text(track, 'position'),
+                'title': self._text(track, 'title'),
+                'duration': self._text(track, 'duration'),
+                'artists': self._artists(track, 'artists/artist'),
+                'extraartists': self._artists(track, 'extraartists/artist'),
+            })
+
+        return self._album(
+            discogs_id, elem, self._year(self._text(elem, 'released')),
+            tracklist=tracklist,
+            credits=self._artists(elem, 'extraartists/artist'),
+        )
@@ -0,0 +1,81 @@
+"""
+Management command to import a user's ratings exported from another service
+"""
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from music.rating_import import FORMATS, SCALES, detect_format, import_ratings
+
+
+class Command(BaseCommand):
+    help = 'Import ratings from a CSV, JSON or JSON Lines export as reviews by one user'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='User the reviews are imported for')
+        parser.add_argument('path', help='Export file')
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            default='',
+            help='File format (default: from the file extension)',
+        )
+        parser.add_argument(
+            '--scale',
+            type=int,
+            choices=SCALES,
+            default=10,
+            help='Rating scale of the export, converted to 1-10',
+        )
+        parser.add_argument(
+            '--max-discogs-lookups',
+            type=int,
+            default=500,
+            help='Discogs searches for rows not in the catalog (0 to match the catalog only)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would be imported without writing anything',
+        )
+        parser.add_argument(
+            '--report',
+            help='Write the per-row report to this JSON file',
+        )
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"No user named {options['username']}")
+
+        try:
+            with open(options['path'], 'rb') as f:
+                report = import_ratings(
+                    user,
+                    f,
+                    file_format=detect_format(options['path'], options['format']),
+                    scale=options['scale'],
+                    max_discogs_lookups=options['max_discogs_lookups'],
+                    dry_run=options['dry_run'],
+                )
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        if options['report']:
+            with open(options['report'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f"Row report written to {options['report']}")
+        else:
+            for row in report['rows']:
+                if row['status'] in ('unmatched', 'invalid'):
+                    self.stdout.write(f"Row {row['row']}: {row['status']} - {row.get('message', '')}")
+
+        summary = report['summary']
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Dry run' if options['dry_run'] else 'Import'} complete: {summary['rows']} rows, "
+            f"{summary['imported']} imported, {summary['matched']} matched, {summary['exists']} already reviewed, "
+            f"{summary['unmatched']} unmatched, {summary['invalid']} invalid"
+        ))
@@ -0,0 +1,76 @@
+"""
+Management command to keep the most popular searches cached
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+from music.query_log import prune_search_query_counts, top_search_queries
+from music.services import DiscogsUnavailable
+from music.views import refresh_search_cache, search_page_cache_key
+
+
+class Command(BaseCommand):
+    help = 'Refresh the cached first page of the most searched queries before it expires'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=50,
+            help='Number of popular queries to keep warm',
+        )
+        parser.add_argument(
+            '--window-hours',
+            type=int,
+            default=24,
+            help='How far back to count searches (at most 25 hours)',
+        )
+        parser.add_argument(
+            '--min-ttl',
+            type=int,
+            default=300,
+            help='Refresh entries with less than this many seconds left (Redis only, otherwise always refresh)',
+        )
+
+    def handle(self, *args, **options):
+        queries = top_search_queries(options['window_hours'], options['top'])
+        if not queries:
+            self.stdout.write('No searches recorded in the window')
+            prune_search_query_counts()
+            return
+
+        refreshed = skipped = failed = 0
+        for query, count in queries:
+            cache_key = search_page_cache_key(query, {'local': 0}, settings.SEARCH_PAGE_SIZE)
+            if self._has_time_left(cache_key, options['min_ttl']):
+                skipped += 1
+                continue
+
+            try:
+                page = refresh_search_cache(query)
+            except DiscogsUnavailable:
+                # Leave the remaining entries to their stale copies until Discogs recovers
+                self.stdout.write(self.style.WARNING('Discogs is unavailable, stopping early'))
+                break
+            except Exception as e:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f'  "{query}": {e}'))
+                continue
+
+            refreshed += 1
+            self.stdout.write(f'  "{query}" ({count} searches): {len(page["results"])} results')
+
+        pruned = prune_search_query_counts()
+        self.stdout.write(self.style.SUCCESS(
+            f'Prewarm complete: {refreshed} refreshed, {skipped} still fresh, {failed} failed'
+            + (f', {pruned} old counts pruned' if pruned else '')
+        ))
+
+    def _has_time_left(self, cache_key, min_ttl):
+        # Only django-redis exposes remaining TTLs; other backends are refreshed every run
+        ttl_for = getattr(cache, 'ttl', None)
+        if ttl_for is None:
+            return False
+        ttl = ttl_for(cache_key)
+        return bool(ttl) and ttl > min_ttl
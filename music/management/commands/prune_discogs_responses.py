@@ -0,0 +1,25 @@
+"""
+Management command to delete old Discogs search responses from the response store
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from music.services import DiscogsResponseStore
+
+
+class Command(BaseCommand):
+    help = 'Delete stored Discogs responses past their maximum age (run daily); master and release data is kept'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.DISCOGS_RESPONSE_MAX_AGE_DAYS,
+            help='Delete expired entries fetched more than this many days ago',
+        )
+
+    def handle(self, *args, **options):
+        deleted = DiscogsResponseStore.prune(timedelta(days=options['days']))
+        self.stdout.write(self.style.SUCCESS(f'Pruned {deleted} stored Discogs responses'))
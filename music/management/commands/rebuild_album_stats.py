@@ -0,0 +1,30 @@
+"""
+Management command to recompute album review stats from the reviews table
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from music.models import Album
+from music.signals import rebuild_album_stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuild AlbumStats (review count, rating sum, average and histogram) from reviews'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'discogs_ids',
+            nargs='*',
+            help='Only rebuild these albums (default: every album)',
+        )
+
+    def handle(self, *args, **options):
+        discogs_ids = options['discogs_ids']
+        album_ids = None
+        if discogs_ids:
+            album_ids = list(Album.objects.filter(discogs_id__in=discogs_ids).values_list('id', flat=True))
+
+        with transaction.atomic():
+            rebuilt = rebuild_album_stats(album_ids)
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt stats for {rebuilt} reviewed albums'))
@@ -0,0 +1,26 @@
+"""
+Management command to rebuild the trending charts from reviews, likes and comments
+"""
+from django.core.management.base import BaseCommand
+
+from music.trending import prune_trending_scores, rebuild_trending_scores
+
+
+class Command(BaseCommand):
+    help = 'Recompute the trending charts from recent activity (e.g. after switching cache backends)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--prune-only',
+            action='store_true',
+            help='Only delete expired chart generations from the database (run daily without Redis)',
+        )
+
+    def handle(self, *args, **options):
+        if options['prune_only']:
+            deleted = prune_trending_scores()
+            self.stdout.write(self.style.SUCCESS(f'Pruned {deleted} expired trending scores'))
+            return
+
+        charts = rebuild_trending_scores()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {charts} trending charts'))
@@ -0,0 +1,25 @@
+"""
+Management command to recount review likes and comments from their tables
+"""
+from django.core.management.base import BaseCommand
+
+from music.likes import flush_like_counts
+from music.signals import reconcile_review_counters
+
+
+class Command(BaseCommand):
+    help = 'Fix Review.likes_count and comments_count wherever they differ from the like and comment rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'review_ids',
+            nargs='*',
+            type=int,
+            help='Only check these reviews (default: every review)',
+        )
+
+    def handle(self, *args, **options):
+        # Likes still queued in Redis would look like drift and then be counted twice
+        flush_like_counts()
+        fixed = reconcile_review_counters(options['review_ids'] or None)
+        self.stdout.write(self.style.SUCCESS(f'Reconciled counters on {fixed} reviews'))
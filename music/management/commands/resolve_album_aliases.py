@@ -0,0 +1,70 @@
+"""
+Management command to resolve catalog album IDs against Discogs
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from music.models import Album, DiscogsAlias
+from music.services import DiscogsUnavailable, ExternalMusicService, record_album_alias
+
+
+class Command(BaseCommand):
+    help = 'Resolve albums imported before ID aliasing to their canonical Discogs ID, re-keying release IDs to masters'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            help='Resolve at most this many albums',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would change without writing anything',
+        )
+
+    def handle(self, *args, **options):
+        service = ExternalMusicService()
+        dry_run = options['dry_run']
+
+        # Albums only known by the ID they were imported with
+        unresolved = DiscogsAlias.objects.filter(kind='').values_list('discogs_id', flat=True)
+        albums = Album.objects.filter(discogs_id__in=unresolved).only('id', 'discogs_id', 'title').order_by('created_at')
+        if options.get('limit'):
+            albums = albums[:options['limit']]
+
+        resolved = rekeyed = conflicts = missing = 0
+        for album in albums:
+            try:
+                result = service.resolve_album_id(album.discogs_id)
+            except DiscogsUnavailable:
+                self.stdout.write(self.style.WARNING('Discogs is unavailable, stopping early'))
+                break
+
+            if result is None:
+                missing += 1
+                self.stdout.write(f'  {album.discogs_id} "{album.title}": not found on Discogs')
+                continue
+
+            canonical_id, kind = result
+            if canonical_id != album.discogs_id:
+                if Album.objects.filter(discogs_id=canonical_id).exists():
+                    # Merging reviews between two album rows is left to an admin
+                    conflicts += 1
+                    self.stdout.write(self.style.WARNING(
+                        f'  {album.discogs_id} "{album.title}": canonical album {canonical_id} already exists'
+                    ))
+                    continue
+                self.stdout.write(f'  {album.discogs_id} "{album.title}": re-keyed to {canonical_id}')
+                rekeyed += 1
+
+            if not dry_run:
+                with transaction.atomic():
+                    Album.objects.filter(pk=album.pk).update(discogs_id=canonical_id)
+                    record_album_alias(album.discogs_id, canonical_id, kind)
+            resolved += 1
+
+        prefix = 'Would resolve' if dry_run else 'Resolved'
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefix} {resolved} albums ({rekeyed} re-keyed), {conflicts} conflicts, {missing} not found'
+        ))
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:57
+
+import unicodedata
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def seed_artists_from_albums(apps, schema_editor):
+    """Remember photos we already looked up for imported albums"""
+    Album = apps.get_model('music', 'Album')
+    Artist = apps.get_model('music', 'Artist')
+
+    artists = {}
+    albums = Album.objects.exclude(artist_photo_url__isnull=True).exclude(artist_photo_url='')
+    for album in albums.only('artist', 'artist_photo_url', 'updated_at').iterator():
+        # Same normalization as music.text_utils.normalize_text
+        name = unicodedata.normalize('NFKD', album.artist or '')
+        name = ' '.join(''.join(ch for ch in name if not unicodedata.combining(ch)).casefold().split())
+        if name and name not in artists:
+            artists[name] = Artist(
+                name=album.artist,
+                normalized_name=name,
+                photo_url=album.artist_photo_url,
+                photo_fetched_at=album.updated_at,
+            )
+
+    Artist.objects.bulk_create(artists.values(), batch_size=500, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('music', '0019_add_artist_photo_url'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Artist',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('normalized_name', models.CharField(max_length=255, unique=True)),
+                ('discogs_id', models.CharField(blank=True, db_index=True, max_length=50, null=True)),
+                ('photo_url', models.URLField(blank=True, max_length=500, null=True)),
+                ('has_no_photo', models.BooleanField(default=False, help_text='Discogs had no photo for this artist at last lookup')),
+                ('photo_fetched_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(seed_artists_from_albums, migrations.RunPython.noop),
+    ]
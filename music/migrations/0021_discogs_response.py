@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:59
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('music', '0020_artist'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DiscogsResponse',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('endpoint', models.CharField(max_length=255)),
+                ('params_key', models.CharField(help_text='SHA-256 of the canonical request params', max_length=64)),
+                ('params', models.JSONField(blank=True, default=dict)),
+                ('payload', models.JSONField()),
+                ('etag', models.CharField(blank=True, max_length=255)),
+                ('last_modified', models.CharField(blank=True, max_length=64)),
+                ('fetched_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('expires_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['expires_at'], name='music_disco_expires_26ffe6_idx')],
+                'constraints': [models.UniqueConstraint(fields=('endpoint', 'params_key'), name='music_discogsresponse_unique_request')],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('music', '0022_album_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchQueryCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('query', models.CharField(max_length=255)),
+                ('hour', models.DateTimeField()),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['hour'], name='music_searc_hour_24911b_idx')],
+                'constraints': [models.UniqueConstraint(fields=('query', 'hour'), name='music_searchquerycount_unique_hour')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('music', '0023_search_query_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='album',
+            name='cover_variants',
+            field=models.JSONField(blank=True, default=dict, help_text='Resized cover images built from cover_url'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:11
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def seed_aliases_from_albums(apps, schema_editor):
+    """Existing albums are canonical under the ID they were imported with"""
+    Album = apps.get_model('music', 'Album')
+    DiscogsAlias = apps.get_model('music', 'DiscogsAlias')
+
+    aliases = (
+        DiscogsAlias(discogs_id=discogs_id, canonical_id=discogs_id)
+        for discogs_id in Album.objects.values_list('discogs_id', flat=True).iterator()
+    )
+    DiscogsAlias.objects.bulk_create(aliases, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('music', '0024_album_cover_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DiscogsAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('discogs_id', models.CharField(help_text='ID as used in album URLs', max_length=50, unique=True)),
+                ('canonical_id', models.CharField(db_index=True, max_length=50)),
+                ('kind', models.CharField(blank=True, choices=[('master', 'Master'), ('release', 'Release')], help_text='What canonical_id is on Discogs; blank if not resolved against Discogs yet', max_length=10)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name_plural': 'Discogs aliases',
+            },
+        ),
+        migrations.RunPython(seed_aliases_from_albums, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def build_album_stats(apps, schema_editor):
+    """Same aggregation as music.signals.rebuild_album_stats"""
+    Review = apps.get_model('music', 'Review')
+    AlbumStats = apps.get_model('music', 'AlbumStats')
+
+    aggregates = Review.objects.values('album_id').annotate(
+        review_count=Count('id'),
+        rating_sum=Sum('rating'),
+        **{f'rating_{rating}': Count('id', filter=Q(rating=rating)) for rating in range(1, 11)}
+    ).order_by()
+
+    rows = []
+    for row in aggregates:
+        album_id = row.pop('album_id')
+        rows.append(AlbumStats(album_id=album_id, average_rating=row['rating_sum'] / row['review_count'], **row))
+    AlbumStats.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('music', '0025_discogs_alias'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlbumStats',
+            fields=[
+                ('album', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='music.album')),
+                ('review_count', models.PositiveIntegerField(default=0)),
+                ('rating_sum', models.PositiveIntegerField(default=0)),
+                ('average_rating', models.FloatField(blank=True, null=True)),
+                ('rating_1', models.PositiveIntegerField(default=0)),
+                ('rating_2', models.PositiveIntegerField(default=0)),
+                ('rating_3', models.PositiveIntegerField(default=0)),
+                ('rating_4', models.PositiveIntegerField(default=0)),
+                ('rating_5', models.PositiveIntegerField(default=0)),
+                ('rating_6', models.PositiveIntegerField(default=0)),
+                ('rating_7', models.PositiveIntegerField(default=0)),
+                ('rating_8', models.PositiveIntegerField(default=0)),
+                ('rating_9', models.PositiveIntegerField(default=0)),
+                ('rating_10', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'Album stats',
+            },
+        ),
+        migrations.RunPython(build_album_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('music', '0026_album_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['album', '-created_at', '-id'], name='music_review_album_newest'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['album', '-rating', '-created_at', '-id'], name='music_review_album_highest'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['album', 'rating', '-created_at', '-id'], name='music_review_album_lowest'),
+        ),
+    ]
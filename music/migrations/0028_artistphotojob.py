@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:21
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('music', '0027_review_sort_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArtistPhotoJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('artist_name', models.CharField(help_text='Album.artist value to look up', max_length=255, unique=True)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Earliest time a worker may claim this job')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['available_at'], name='music_artis_availab_e485ac_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:23
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_review_rows(apps, schema_editor):
+    """Same counts as music.signals.reconcile_review_counters"""
+    Review = apps.get_model('music', 'Review')
+    ReviewLike = apps.get_model('music', 'ReviewLike')
+    Comment = apps.get_model('music', 'Comment')
+
+    def rows_per_review(model):
+        counts = model.objects.filter(review=OuterRef('pk')).order_by().values('review').annotate(n=Count('id'))
+        return Coalesce(Subquery(counts.values('n')), 0)
+
+    Review.objects.update(likes_count=rows_per_review(ReviewLike), comments_count=rows_per_review(Comment))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('music', '0028_artistphotojob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_review_rows, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['album', '-likes_count', '-created_at', '-id'], name='music_review_album_most_liked'),
+        ),
+    ]
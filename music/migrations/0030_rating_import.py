@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:26
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('music', '0029_review_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activity',
+            name='metadata',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AlterField(
+            model_name='activity',
+            name='activity_type',
+            field=models.CharField(choices=[('review_created', 'Review Created'), ('review_liked', 'Review Liked'), ('review_pinned', 'Review Pinned'), ('user_followed', 'User Followed'), ('comment_created', 'Comment Created'), ('reviews_imported', 'Reviews Imported')], max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='album',
+            index=models.Index(django.db.models.functions.text.Lower('title'), name='music_album_title_lower'),
+        ),
+    ]
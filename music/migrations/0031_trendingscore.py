@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('music', '0030_rating_import'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('window', models.CharField(max_length=3)),
+                ('scope', models.CharField(max_length=20)),
+                ('generation', models.PositiveIntegerField()),
+                ('score', models.FloatField(default=0)),
+                ('album', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='music.album')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['window', 'scope', 'generation', '-score', '-album'], name='music_trending_rank')],
+                'constraints': [models.UniqueConstraint(fields=('window', 'scope', 'generation', 'album'), name='music_trendingscore_unique_album')],
+            },
+        ),
+    ]
@@ -1,8 +1,15 @@
 from django.db import models
+from django.db.models.functions import Lower
+from django.contrib.postgres.indexes import GinIndex
 from django.conf import settings
 from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 import uuid
+from datetime import timedelta
+
+# Cover variant per surface, by the size it's drawn at (variants cover high-density screens)
+COVER_TILE = 'thumb'  # Feed and list previews, drawn at 64px or less
+COVER_CARD = 'small'  # Profile grids, favorites, search and trending cards, drawn at up to 150px
 
 class Genre(models.Model):
     # Simple predefined genres list
@@ -41,19 +48,187 @@ class Album(models.Model):
     
     tracklist = models.JSONField(default=list, blank=True)
     credits = models.JSONField(default=list, blank=True)
+    cover_variants = models.JSONField(default=dict, blank=True, help_text="Resized cover images built from cover_url")
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.artist} - {self.title}"
 
+    def _current_cover_variants(self):
+        # Variants built from an older cover_url no longer match the album
+        variants = self.cover_variants or {}
+        if not self.cover_url or variants.get('source') != self.cover_url:
+            return {}
+        sizes = variants.get('sizes', {})
+        if not settings.DEBUG and any(
+            not url.startswith(('https://', 'http://')) for formats in sizes.values() for url in formats.values()
+        ):
+            # Stored on this server's filesystem, which only serves media with DEBUG on
+            return {}
+        return sizes
+
+    def cover_url_for(self, size, image_format='webp'):
+        """URL of a resized cover, falling back to the full-size cover"""
+        return self._current_cover_variants().get(size, {}).get(image_format) or self.cover_url
+
+    @property
+    def cover_images(self):
+        """Every resized cover by size and format, or None if they haven't been built"""
+        return self._current_cover_variants() or None
+
     class Meta:
         indexes = [
             models.Index(fields=['title']),
             models.Index(fields=['artist']),
             models.Index(fields=['discogs_id']),
+            # Trigram indexes for local-first search
+            GinIndex(fields=['title'], name='music_album_title_trgm', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['artist'], name='music_album_artist_trgm', opclasses=['gin_trgm_ops']),
+            # Case-insensitive exact title lookups for rating imports
+            models.Index(Lower('title'), name='music_album_title_lower'),
+        ]
+
+class Artist(models.Model):
+    """Artists resolved against Discogs, including ones Discogs has no photo for"""
+    # How long a lookup result is trusted before asking Discogs again
+    PHOTO_TTL = timedelta(days=30)
+    NO_PHOTO_TTL = timedelta(days=7)
+
+    name = models.CharField(max_length=255)
+    normalized_name = models.CharField(max_length=255, unique=True)
+    discogs_id = models.CharField(max_length=50, null=True, blank=True, db_index=True)
+    photo_url = models.URLField(max_length=500, null=True, blank=True)
+    has_no_photo = models.BooleanField(default=False, help_text="Discogs had no photo for this artist at last lookup")
+    photo_fetched_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.name
+
+    @property
+    def is_photo_fresh(self):
+        """Whether the stored photo (or no-photo marker) can be used without asking Discogs"""
+        if not self.photo_fetched_at:
+            return False
+        ttl = self.NO_PHOTO_TTL if self.has_no_photo else self.PHOTO_TTL
+        return timezone.now() - self.photo_fetched_at < ttl
+
+
+class ArtistPhotoJob(models.Model):
+    """An artist whose albums are missing a photo, waiting for the backfill worker"""
+    # Lookups that keep failing are parked after this many tries (see music/artist_photos.py)
+    MAX_ATTEMPTS = 5
+
+    artist_name = models.CharField(max_length=255, unique=True, help_text="Album.artist value to look up")
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now, help_text="Earliest time a worker may claim this job")
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['available_at']),
+        ]
+
+    def __str__(self):
+        return self.artist_name
+
+
+class DiscogsResponse(models.Model):
+    """Raw Discogs API payloads, shared by every caller and kept across cache flushes"""
+    endpoint = models.CharField(max_length=255)
+    params_key = models.CharField(max_length=64, help_text="SHA-256 of the canonical request params")
+    params = models.JSONField(default=dict, blank=True)
+    payload = models.JSONField()
+    etag = models.CharField(max_length=255, blank=True)
+    last_modified = models.CharField(max_length=64, blank=True)
+    fetched_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['endpoint', 'params_key'], name='music_discogsresponse_unique_request'),
+        ]
+        indexes = [
+            models.Index(fields=['expires_at']),
         ]
 
+    def __str__(self):
+        return f"{self.endpoint} ({self.params_key[:8]})"
+
+    @property
+    def is_expired(self):
+        return timezone.now() >= self.expires_at
+
+
+class DiscogsAlias(models.Model):
+    """
+    Maps every Discogs ID an album has been requested by to its canonical ID.
+    The canonical ID is the master ID, or the release ID for releases without a master.
+    """
+    KIND_CHOICES = [
+        ('master', 'Master'),
+        ('release', 'Release'),
+    ]
+
+    discogs_id = models.CharField(max_length=50, unique=True, help_text="ID as used in album URLs")
+    canonical_id = models.CharField(max_length=50, db_index=True)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, blank=True,
+                            help_text="What canonical_id is on Discogs; blank if not resolved against Discogs yet")
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name_plural = 'Discogs aliases'
+
+    def __str__(self):
+        return f"{self.discogs_id} -> {self.canonical_id}"
+
+
+class SearchQueryCount(models.Model):
+    """Hourly counts of normalized search queries, used when Redis isn't available"""
+    query = models.CharField(max_length=255)
+    hour = models.DateTimeField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['query', 'hour'], name='music_searchquerycount_unique_hour'),
+        ]
+        indexes = [
+            models.Index(fields=['hour']),
+        ]
+
+    def __str__(self):
+        return f"{self.query} ({self.count} at {self.hour:%Y-%m-%d %H}:00)"
+
+
+class TrendingScore(models.Model):
+    """Decayed trending score of an album per window, scope and generation, used when Redis isn't available"""
+    window = models.CharField(max_length=3)
+    # 'all', or 'genre_<id>' for a genre's chart
+    scope = models.CharField(max_length=20)
+    generation = models.PositiveIntegerField()
+    album = models.ForeignKey(Album, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['window', 'scope', 'generation', 'album'], name='music_trendingscore_unique_album'
+            ),
+        ]
+        indexes = [
+            # Trending pages, ranked
+            models.Index(
+                fields=['window', 'scope', 'generation', '-score', '-album'], name='music_trending_rank'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.album_id} {self.window}/{self.scope}/{self.generation}: {self.score:.2f}"
+
+
 class Review(models.Model):
     album = models.ForeignKey(Album, on_delete=models.CASCADE, related_name='reviews')
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='album_reviews')
@@ -67,15 +242,76 @@ class Review(models.Model):
     user_genres = models.ManyToManyField(Genre, blank=True, related_name='reviews', 
                                         help_text="User-selected genres for this album")
     
+    # Kept current by the like and comment signals (see music/signals.py)
+    likes_count = models.PositiveIntegerField(default=0)
+    comments_count = models.PositiveIntegerField(default=0)
+    
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Only ever changed by F() updates, never written back from an instance
+    COUNTER_FIELDS = ('likes_count', 'comments_count')
+
     class Meta:
         unique_together = ('album', 'user')  # One review per album per user
+        indexes = [
+            # One per album review sort order, matching its keyset columns
+            models.Index(fields=['album', '-created_at', '-id'], name='music_review_album_newest'),
+            models.Index(fields=['album', '-rating', '-created_at', '-id'], name='music_review_album_highest'),
+            models.Index(fields=['album', 'rating', '-created_at', '-id'], name='music_review_album_lowest'),
+            models.Index(fields=['album', '-likes_count', '-created_at', '-id'], name='music_review_album_most_liked'),
+        ]
 
     def __str__(self):
         return f"{self.user.username}'s review of {self.album.title}"
 
+    def save(self, **kwargs):
+        # Editing a review must not overwrite counters that changed since it was loaded
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(**kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored rating so an edit can move it between histogram buckets
+        instance._loaded_rating = instance.__dict__.get('rating')
+        return instance
+
+
+class AlbumStats(models.Model):
+    """Review aggregates for an album, kept current by the review signals (see music/signals.py)"""
+    album = models.OneToOneField(Album, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    review_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    average_rating = models.FloatField(null=True, blank=True)
+
+    # Rating histogram, one counter per possible rating
+    rating_1 = models.PositiveIntegerField(default=0)
+    rating_2 = models.PositiveIntegerField(default=0)
+    rating_3 = models.PositiveIntegerField(default=0)
+    rating_4 = models.PositiveIntegerField(default=0)
+    rating_5 = models.PositiveIntegerField(default=0)
+    rating_6 = models.PositiveIntegerField(default=0)
+    rating_7 = models.PositiveIntegerField(default=0)
+    rating_8 = models.PositiveIntegerField(default=0)
+    rating_9 = models.PositiveIntegerField(default=0)
+    rating_10 = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = 'Album stats'
+
+    def __str__(self):
+        return f"Stats for {self.album_id}"
+
+    @property
+    def histogram(self):
+        """Review counts for ratings 1 through 10"""
+        return [getattr(self, f'rating_{rating}') for rating in range(1, 11)]
+
 
 class ReviewLike(models.Model):
     """Track likes on reviews"""
@@ -98,6 +334,7 @@ class Activity(models.Model):
         ('review_pinned', 'Review Pinned'),
         ('user_followed', 'User Followed'),
         ('comment_created', 'Comment Created'),
+        ('reviews_imported', 'Reviews Imported'),
     ]
     
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='activities')
@@ -109,6 +346,9 @@ class Activity(models.Model):
     review = models.ForeignKey(Review, on_delete=models.CASCADE, null=True, blank=True)
     comment = models.ForeignKey('Comment', on_delete=models.CASCADE, null=True, blank=True)
     
+    # Extra details for aggregated activities, e.g. {'count': 120} for reviews_imported
+    metadata = models.JSONField(default=dict, blank=True)
+    
     created_at = models.DateTimeField(default=timezone.now)
     
     class Meta:
@@ -0,0 +1,86 @@
+"""
+Halfnote Cursor Pagination
+Opaque cursors shared by the paginated endpoints
+
+A cursor is URL-safe base64 of a small JSON object describing where the next
+page starts. Clients pass it back unchanged, so its contents can change
+without breaking them; anything that doesn't decode is rejected.
+"""
+
+import base64
+import binascii
+import datetime
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+def encode_cursor(position):
+    """Opaque token for a position dict"""
+    data = json.dumps(position, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """Position dict for a token from encode_cursor; raises ValueError if it isn't one"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValueError('Invalid cursor')
+    if not isinstance(position, dict):
+        raise ValueError('Invalid cursor')
+    return position
+
+
+def get_page_size(request, default, maximum):
+    """page_size query param clamped to 1..maximum; raises ValueError if it isn't a number"""
+    value = request.GET.get('page_size')
+    if value in (None, ''):
+        return default
+    return max(1, min(int(value), maximum))
+
+
+def keyset_filter(ordering, values):
+    """
+    Q for the rows after values in an order_by() list such as ['-rating', '-id'].
+    The last field must be unique so ties never repeat or drop a row.
+    """
+    condition = Q()
+    equal = Q()
+    for field, value in zip(ordering, values):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        condition |= equal & Q(**{f'{name}__{lookup}': value})
+        equal &= Q(**{name: value})
+    return condition
+
+
+def clean_keyset_values(model, ordering, values):
+    """
+    Values from a cursor converted to the types of model's ordering fields.
+    Raises ValueError for values that don't fit, so they never reach a query.
+    """
+    if not isinstance(values, list) or len(values) != len(ordering):
+        raise ValueError('Invalid cursor')
+    cleaned = []
+    for field, value in zip(ordering, values):
+        if value is None or isinstance(value, (dict, list)):
+            raise ValueError('Invalid cursor')
+        try:
+            cleaned.append(model._meta.get_field(field.lstrip('-')).to_python(value))
+        except (ValidationError, TypeError, ValueError):
+            raise ValueError('Invalid cursor')
+    return cleaned
+
+
+def keyset_values(obj, ordering):
+    """JSON-safe values of the ordering fields for the last row of a page"""
+    values = []
+    for field in ordering:
+        value = getattr(obj, field.lstrip('-'))
+        if isinstance(value, (datetime.date, datetime.datetime)):
+            value = value.isoformat()
+        values.append(value)
+    return values
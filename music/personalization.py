@@ -0,0 +1,104 @@
+"""
+Halfnote Viewer Personalization
+Per-viewer flags laid over cached, viewer-independent payloads
+
+Album pages, profiles, activity and likes pages are cached once for everyone.
+Before responding, a view fills in the fields that depend on who is asking
+(is_liked_by_user, is_following, the viewer's own rating) with one batched
+query per kind of flag. The overlay always overwrites those fields, so a
+cached value is never shown to the wrong viewer, and it returns copies so the
+shared payload itself is never modified.
+"""
+
+from .models import ListLike, Review, ReviewLike
+
+
+def _viewer(user):
+    return user if user is not None and user.is_authenticated else None
+
+
+def liked_review_ids(user, review_ids):
+    """IDs among review_ids that user has liked, in one query"""
+    viewer = _viewer(user)
+    if viewer is None or not review_ids:
+        return set()
+    return set(
+        ReviewLike.objects.filter(user=viewer, review_id__in=set(review_ids)).values_list('review_id', flat=True)
+    )
+
+
+def personalize_reviews(reviews, user):
+    """Serialized reviews with is_liked_by_user set for user"""
+    liked = liked_review_ids(user, [review['id'] for review in reviews])
+    return [{**review, 'is_liked_by_user': review['id'] in liked} for review in reviews]
+
+
+def personalize_review(review, user):
+    return personalize_reviews([review], user)[0]
+
+
+def personalize_activities(activities, user):
+    """Serialized activities with is_liked_by_user set on their review details"""
+    liked = liked_review_ids(
+        user, [activity['review_details']['id'] for activity in activities if activity.get('review_details')]
+    )
+    personalized = []
+    for activity in activities:
+        details = activity.get('review_details')
+        if details:
+            activity = {**activity, 'review_details': {**details, 'is_liked_by_user': details['id'] in liked}}
+        personalized.append(activity)
+    return personalized
+
+
+def followed_user_ids(user, user_ids):
+    """IDs among user_ids that user follows, in one query"""
+    viewer = _viewer(user)
+    if viewer is None or not user_ids:
+        return set()
+    return set(viewer.following.filter(id__in=set(user_ids)).values_list('id', flat=True))
+
+
+def personalize_users(users, user):
+    """Serialized users with is_following set for user"""
+    followed = followed_user_ids(user, [entry['id'] for entry in users])
+    return [{**entry, 'is_following': entry['id'] in followed} for entry in users]
+
+
+def personalize_profile(profile, user):
+    """A serialized profile with is_following and its pinned reviews' likes set for user"""
+    return {
+        **profile,
+        'is_following': profile['id'] in followed_user_ids(user, [profile['id']]),
+        'pinned_reviews': personalize_reviews(profile.get('pinned_reviews') or [], user),
+    }
+
+
+def personalize_list(list_data, user):
+    """A serialized list with is_liked_by_user and the viewer's rating of each album set"""
+    viewer = _viewer(user)
+    items = list_data.get('items') or []
+    is_liked = False
+    ratings = {}
+    if viewer is not None:
+        is_liked = ListLike.objects.filter(list_id=list_data['id'], user=viewer).exists()
+        album_ids = [item['album']['id'] for item in items if item.get('album', {}).get('id')]
+        if album_ids:
+            ratings = {
+                str(album_id): (review_id, rating)
+                for album_id, review_id, rating in Review.objects.filter(
+                    user=viewer, album_id__in=album_ids
+                ).values_list('album_id', 'id', 'rating')
+            }
+
+    personalized_items = []
+    for item in items:
+        album = {
+            key: value for key, value in item.get('album', {}).items()
+            if key not in ('user_review_id', 'user_rating')
+        }
+        if album.get('id') in ratings:
+            album['user_review_id'], album['user_rating'] = ratings[album['id']]
+        personalized_items.append({**item, 'album': album})
+
+    return {**list_data, 'is_liked_by_user': is_liked, 'items': personalized_items}
@@ -0,0 +1,97 @@
+"""
+Halfnote Search Query Log
+Rolling per-hour counts of normalized search queries
+
+Counts feed the prewarm_search_cache command, which keeps the most popular
+queries in the cache. With Redis each hour is a sorted set that expires on
+its own; otherwise hourly rows in SearchQueryCount are incremented in place.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .cache_utils import get_redis_client
+from .models import SearchQueryCount
+
+logger = logging.getLogger(__name__)
+
+# Hourly buckets outlive the longest window so it's never missing its oldest hour
+BUCKET_RETENTION_HOURS = 25
+MAX_QUERY_LENGTH = 255
+
+
+def _current_hour():
+    return timezone.now().replace(minute=0, second=0, microsecond=0)
+
+
+def _bucket_key(hour):
+    # make_key applies the cache prefix so buckets sit alongside the rest of the cache
+    return cache.make_key(f'search_queries_{hour:%Y%m%d%H}')
+
+
+def record_search_query(query):
+    """Count one search for a normalized query; never fails the caller"""
+    query = query[:MAX_QUERY_LENGTH]
+    if not query:
+        return
+
+    hour = _current_hour()
+    redis = get_redis_client()
+    try:
+        if redis is not None:
+            key = _bucket_key(hour)
+            pipe = redis.pipeline()
+            pipe.zincrby(key, 1, query)
+            pipe.expire(key, BUCKET_RETENTION_HOURS * 3600)
+            pipe.execute()
+            return
+
+        updated = SearchQueryCount.objects.filter(query=query, hour=hour).update(count=F('count') + 1)
+        if not updated:
+            _, created = SearchQueryCount.objects.get_or_create(query=query, hour=hour, defaults={'count': 1})
+            if not created:
+                # Lost the race to create this hour's row
+                SearchQueryCount.objects.filter(query=query, hour=hour).update(count=F('count') + 1)
+    except Exception as e:
+        logger.warning(f"Could not record search query: {e}")
+
+
+def top_search_queries(window_hours=24, limit=50):
+    """Most searched normalized queries over the last window_hours, as (query, count) pairs"""
+    window_hours = max(1, min(window_hours, BUCKET_RETENTION_HOURS))
+    current = _current_hour()
+    hours = [current - timedelta(hours=offset) for offset in range(window_hours)]
+
+    redis = get_redis_client()
+    if redis is not None:
+        union_key = cache.make_key(f'search_queries_top_{current:%Y%m%d%H}_{window_hours}')
+        pipe = redis.pipeline()
+        pipe.zunionstore(union_key, [_bucket_key(hour) for hour in hours])
+        pipe.expire(union_key, 60)
+        pipe.zrevrange(union_key, 0, limit - 1, withscores=True)
+        ranked = pipe.execute()[-1]
+        return [
+            (query.decode('utf-8') if isinstance(query, bytes) else query, int(score))
+            for query, score in ranked
+        ]
+
+    rows = SearchQueryCount.objects.filter(hour__gte=hours[-1]).values('query').annotate(
+        total=Sum('count')
+    ).order_by('-total')[:limit]
+    return [(row['query'], row['total']) for row in rows]
+
+
+def prune_search_query_counts():
+    """Delete hourly rows that have fallen out of every window"""
+    cutoff = _current_hour() - timedelta(hours=BUCKET_RETENTION_HOURS)
+    try:
+        deleted, _ = SearchQueryCount.objects.filter(hour__lt=cutoff).delete()
+    except DatabaseError as e:
+        logger.warning(f"Could not prune search query counts: {e}")
+        return 0
+    return deleted
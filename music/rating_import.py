@@ -0,0 +1,391 @@
+"""
+Halfnote Rating Import
+Bulk import of ratings exported from other services
+
+The file is parsed as it streams in (CSV, JSON Lines or a JSON array of row
+objects) and handled BATCH_SIZE rows at a time. Each batch is matched to albums
+with a few catalog queries; only rows the catalog can't place are searched on
+Discogs, capped per import and paced by the shared Discogs client. Reviews and
+their genres (existing genres only) are then written with bulk_create. Bulk writes skip the model
+signals, so album stats are rebuilt for the albums touched, and the import is
+announced by a single reviews_imported activity instead of one per review.
+"""
+
+import codecs
+import csv
+import itertools
+import json
+import logging
+import re
+
+import requests
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+
+from .artist_photos import queue_artist_photos
+from .genres import existing_genre_ids
+from .models import Activity, Album, DiscogsAlias, Review
+from .services import DiscogsUnavailable, ExternalMusicService, get_discogs_client
+from .signals import rebuild_album_stats
+from .text_utils import normalize_text
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+FORMATS = ('csv', 'json', 'jsonl')
+# Rating scales of common exports, converted to our 1-10
+SCALES = (5, 10, 100)
+
+# Lowercased header spellings used by common exports
+COLUMN_ALIASES = {
+    'discogs_id': ('discogs_id', 'discogs id', 'master_id', 'release_id'),
+    'artist': ('artist', 'artist name', 'artists'),
+    'title': ('title', 'album', 'album title', 'release', 'release title'),
+    'rating': ('rating', 'my rating', 'score'),
+    'content': ('review', 'content', 'notes', 'comment'),
+    'genres': ('genres', 'genre', 'tags'),
+}
+
+
+def detect_format(filename, requested=''):
+    """Import format from an explicit choice or the file extension (CSV by default)"""
+    if requested:
+        if requested not in FORMATS:
+            raise ValueError(f"Unknown format, use one of: {', '.join(FORMATS)}")
+        return requested
+    name = (filename or '').lower()
+    if name.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    if name.endswith('.json'):
+        return 'json'
+    return 'csv'
+
+
+def _iter_json_array(reader):
+    """Objects of a top-level JSON array, decoded chunk by chunk"""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    started = False
+    for chunk in iter(lambda: reader.read(65536), ''):
+        buffer += chunk
+        while True:
+            buffer = buffer.lstrip()
+            if not buffer:
+                break
+            if not started:
+                if buffer[0] != '[':
+                    raise ValueError('Expected a JSON array of rows')
+                buffer, started = buffer[1:], True
+            elif buffer[0] == ',':
+                buffer = buffer[1:]
+            elif buffer[0] == ']':
+                return
+            else:
+                try:
+                    item, end = decoder.raw_decode(buffer)
+                except ValueError:
+                    # The rest of this item is in the next chunk
+                    break
+                buffer = buffer[end:]
+                yield item
+    raise ValueError('Unexpected end of JSON file')
+
+
+def iter_import_rows(stream, file_format):
+    """Raw row objects from a binary stream, without reading it all into memory"""
+    reader = codecs.getreader('utf-8-sig')(stream, errors='replace')
+    if file_format == 'csv':
+        yield from csv.DictReader(reader)
+    elif file_format == 'jsonl':
+        for line in reader:
+            if line.strip():
+                yield json.loads(line)
+    else:
+        yield from _iter_json_array(reader)
+
+
+def _first_value(row, aliases):
+    for alias in aliases:
+        value = row.get(alias)
+        if value not in (None, ''):
+            return value
+    return None
+
+
+def convert_rating(value, scale):
+    """A rating on the export's scale as our 1-10; ValueError if there isn't one"""
+    rating = float(value)
+    if rating <= 0 or rating > scale:
+        raise ValueError(f'Rating must be above 0 and at most {scale}')
+    return max(1, min(10, round(rating * 10 / scale)))
+
+
+def clean_row(raw, scale):
+    """Fields we use from one export row; raises ValueError for rows that can't be imported"""
+    if not isinstance(raw, dict):
+        raise ValueError('Row is not an object')
+    row = {str(key).strip().lower(): value for key, value in raw.items() if key is not None}
+
+    artist = _first_value(row, COLUMN_ALIASES['artist'])
+    if artist is None and (row.get('first name') or row.get('last name')):
+        # RateYourMusic splits artist names
+        artist = f"{row.get('first name') or ''} {row.get('last name') or ''}"
+    genres = _first_value(row, COLUMN_ALIASES['genres']) or []
+    if isinstance(genres, str):
+        genres = re.split(r'\s*[,;|]\s*', genres)
+    discogs_id = _first_value(row, COLUMN_ALIASES['discogs_id'])
+
+    cleaned = {
+        'discogs_id': str(discogs_id).strip() if discogs_id is not None else '',
+        'artist': str(artist or '').strip(),
+        'title': str(_first_value(row, COLUMN_ALIASES['title']) or '').strip(),
+        'content': str(_first_value(row, COLUMN_ALIASES['content']) or ''),
+        'genres': genres,
+    }
+    if not cleaned['discogs_id'] and not (cleaned['artist'] and cleaned['title']):
+        raise ValueError('Row needs a Discogs ID or an artist and title')
+
+    rating = _first_value(row, COLUMN_ALIASES['rating'])
+    if rating is None:
+        raise ValueError('Row has no rating')
+    try:
+        cleaned['rating'] = convert_rating(rating, scale)
+    except (TypeError, ValueError):
+        raise ValueError(f'Invalid rating {rating!r} for a {scale}-point scale')
+    return cleaned
+
+
+class RatingImport:
+    """One user's import; feed() rows, then finish() for the report"""
+
+    def __init__(self, user, scale=10, max_discogs_lookups=0, dry_run=False):
+        if scale not in SCALES:
+            raise ValueError(f"Unknown rating scale, use one of: {', '.join(map(str, SCALES))}")
+        self.user = user
+        self.scale = scale
+        self.discogs_budget = max_discogs_lookups
+        self.dry_run = dry_run
+        self.service = ExternalMusicService()
+
+        self.results = []
+        self.imported = 0
+        self.album_ids = set()
+        self.album_discogs_ids = set()
+        self.new_artists = set()
+        self.seen_album_ids = set()
+        self.discogs_available = True
+
+    def run(self, rows, max_rows=None):
+        """Import every row, then finish(); a file that can't be read past some row is imported up to it"""
+        try:
+            self._run(rows, max_rows)
+        except Exception:
+            if self.imported:
+                # Earlier batches are committed; they still need their stats, activity and cache clears
+                self.finish()
+            raise
+        return self.finish()
+
+    def _run(self, rows, max_rows):
+        batch = []
+        rows = iter(rows)
+        for number in itertools.count(1):
+            try:
+                raw = next(rows)
+            except StopIteration:
+                break
+            except (csv.Error, ValueError) as e:
+                # Earlier batches are already written, so report them rather than fail the whole import
+                self.results.append({'row': number, 'status': 'invalid', 'message': f'Could not read the file from here on: {e}'})
+                break
+            if max_rows and number > max_rows:
+                self.results.append({'row': number, 'status': 'invalid', 'message': f'Only {max_rows} rows are imported per file'})
+                break
+            try:
+                batch.append((number, clean_row(raw, self.scale)))
+            except ValueError as e:
+                self.results.append({'row': number, 'status': 'invalid', 'message': str(e)})
+            if len(batch) >= BATCH_SIZE:
+                self._import_batch(batch)
+                batch = []
+        if batch:
+            self._import_batch(batch)
+
+    # ------------------------------------------------------------------
+    # Matching
+    # ------------------------------------------------------------------
+
+    def _match_by_discogs_id(self, rows):
+        discogs_ids = {row['discogs_id'] for _, row in rows if row['discogs_id']}
+        if not discogs_ids:
+            return {}
+        canonical = dict(DiscogsAlias.objects.filter(discogs_id__in=discogs_ids).values_list('discogs_id', 'canonical_id'))
+        wanted = {discogs_id: canonical.get(discogs_id, discogs_id) for discogs_id in discogs_ids}
+        albums = {album.discogs_id: album for album in Album.objects.filter(discogs_id__in=set(wanted.values()))}
+        return {discogs_id: albums[canonical_id] for discogs_id, canonical_id in wanted.items() if canonical_id in albums}
+
+    def _match_by_name(self, rows):
+        titles = {row['title'].lower() for _, row in rows if row['title']}
+        if not titles:
+            return {}
+        albums = {}
+        for album in Album.objects.annotate(title_lower=Lower('title')).filter(title_lower__in=titles):
+            albums.setdefault((normalize_text(album.artist), normalize_text(album.title)), album)
+        return albums
+
+    def _search_discogs(self, row):
+        """Album for a row from a Discogs search, created if it's new; None if nothing matched"""
+        self.discogs_budget -= 1
+        data = get_discogs_client().get(
+            'database/search',
+            params={'type': 'master', 'artist': row['artist'], 'release_title': row['title'], 'per_page': 1},
+        )
+        results = data.get('results') or []
+        if not results or not results[0].get('id'):
+            return None
+
+        result = results[0]
+        discogs_id = str(result['id'])
+        artist, _, title = (result.get('title') or '').partition(' - ')
+        year = str(result.get('year') or '')[:4]
+        album = Album(
+            discogs_id=discogs_id,
+            title=(title or row['title'])[:255],
+            artist=(self.service._clean_artist_name(artist) if title else row['artist'])[:255],
+            year=int(year) if year.isdigit() else None,
+            cover_url=result.get('cover_image') or None,
+        )
+        if self.dry_run:
+            return album
+        Album.objects.bulk_create([album], ignore_conflicts=True)
+        album = Album.objects.get(discogs_id=discogs_id)
+        if not album.artist_photo_url:
+            self.new_artists.add(album.artist)
+        return album
+
+    def _match(self, rows):
+        """(number, row, album or None, message) for each row, catalog first and Discogs second"""
+        by_id = self._match_by_discogs_id(rows)
+        by_name = self._match_by_name(rows)
+
+        matched = []
+        for number, row in rows:
+            album = by_id.get(row['discogs_id'])
+            if album is None and row['artist'] and row['title']:
+                album = by_name.get((normalize_text(row['artist']), normalize_text(row['title'])))
+            message = ''
+            if album is None and row['artist'] and row['title']:
+                if not self.discogs_available:
+                    message = 'Music catalog is unavailable, try this row again later'
+                elif self.discogs_budget <= 0:
+                    message = 'Not in the catalog; Discogs lookups for this import are used up'
+                else:
+                    try:
+                        album = self._search_discogs(row)
+                    except (DiscogsUnavailable, requests.RequestException) as e:
+                        logger.warning(f'Rating import Discogs lookup failed: {e}')
+                        self.discogs_available = False
+                        message = 'Music catalog is unavailable, try this row again later'
+            if album is None and not message:
+                message = 'No matching album found'
+            matched.append((number, row, album, message))
+        return matched
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def _import_batch(self, rows):
+        matched = self._match(rows)
+        album_pks = {album.pk for _, _, album, _ in matched if album is not None and album.pk}
+        reviewed = set(
+            Review.objects.filter(user=self.user, album_id__in=album_pks).values_list('album_id', flat=True)
+        ) if album_pks else set()
+
+        pending = []
+        for number, row, album, message in matched:
+            result = {'row': number, 'artist': row['artist'], 'title': row['title']}
+            if album is None:
+                result.update(status='unmatched', message=message)
+            else:
+                result.update(discogs_id=album.discogs_id, album_title=album.title, album_artist=album.artist)
+                if album.pk in reviewed:
+                    result.update(status='exists', message='You have already reviewed this album')
+                elif album.pk in self.seen_album_ids:
+                    result.update(status='exists', message='Album appears earlier in this file')
+                else:
+                    if album.pk:
+                        self.seen_album_ids.add(album.pk)
+                    result['status'] = 'matched' if self.dry_run else 'imported'
+                    pending.append((row, album, result))
+            self.results.append(result)
+
+        if self.dry_run or not pending:
+            return
+
+        try:
+            self._write_reviews(pending)
+        except IntegrityError:
+            # The user reviewed one of these albums since we checked; find it a row at a time
+            for row, album, result in pending:
+                try:
+                    self._write_reviews([(row, album, result)])
+                except IntegrityError:
+                    if not Review.objects.filter(user=self.user, album=album).exists():
+                        raise
+                    result.update(status='exists', message='You have already reviewed this album')
+
+    def _write_reviews(self, pending):
+        with transaction.atomic():
+            reviews = Review.objects.bulk_create([
+                Review(user=self.user, album=album, rating=row['rating'], content=row['content'])
+                for row, album, _ in pending
+            ])
+            through = Review.user_genres.through
+            through.objects.bulk_create([
+                through(review_id=review.pk, genre_id=genre_id)
+                for review, (row, _, _) in zip(reviews, pending)
+                for genre_id in existing_genre_ids(row['genres'])
+            ])
+        self.imported += len(reviews)
+        for _, album, _ in pending:
+            self.album_ids.add(album.pk)
+            self.album_discogs_ids.add(album.discogs_id)
+
+    def finish(self):
+        if self.imported:
+            rebuild_album_stats(list(self.album_ids))
+            Activity.objects.create(
+                user=self.user,
+                activity_type='reviews_imported',
+                metadata={'count': self.imported},
+            )
+            queue_artist_photos(self.new_artists)
+
+            username = self.user.username
+            cache.delete_many([
+                f'user_profile_{username}',
+                f'user_activity_{username}',
+                f'activity_feed_{self.user.id}_you',
+                f'activity_feed_{self.user.id}_friends',
+                *[f'album_{discogs_id}' for discogs_id in self.album_discogs_ids],
+            ])
+
+        summary = {'rows': len(self.results), 'imported': self.imported}
+        for status in ('matched', 'exists', 'unmatched', 'invalid'):
+            summary[status] = sum(1 for result in self.results if result['status'] == status)
+        return {'summary': summary, 'rows': sorted(self.results, key=lambda result: result['row'])}
+
+
+def import_ratings(user, stream, file_format='csv', scale=10, max_discogs_lookups=0, dry_run=False, max_rows=None):
+    """
+    Import a ratings export for user. Returns {'summary', 'rows'} with a status per
+    row: imported (or matched on a dry run), exists, unmatched or invalid.
+    Raises ValueError for an option that can't be used; a file that can't be
+    parsed past some row is reported as an invalid row there.
+    """
+    if file_format not in FORMATS:
+        raise ValueError(f"Unknown format, use one of: {', '.join(FORMATS)}")
+    job = RatingImport(user, scale=scale, max_discogs_lookups=max_discogs_lookups, dry_run=dry_run)
+    return job.run(iter_import_rows(stream, file_format), max_rows=max_rows)
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Album, Review, Genre, ReviewLike, Activity, Comment, List, ListItem, ListLike
+from .models import COVER_CARD, COVER_TILE, Album, Review, Genre, ReviewLike, Activity, Comment, List, ListItem, ListLike
 
 class GenreSerializer(serializers.ModelSerializer):
     class Meta:
@@ -24,6 +24,20 @@ class CommentSerializer(serializers.ModelSerializer):
             return None
 
 
+def _is_liked_by_viewer(review, context):
+    """
+    Whether the requesting user likes review. Views serializing many reviews pass
+    'liked_review_ids', the viewer's likes among them from one query.
+    """
+    request = context.get('request')
+    if not (request and request.user.is_authenticated):
+        return False
+    liked_review_ids = context.get('liked_review_ids')
+    if liked_review_ids is not None:
+        return review.id in liked_review_ids
+    return review.likes.filter(user_id=request.user.id).exists()
+
+
 class ReviewSerializer(serializers.ModelSerializer):
     username = serializers.CharField(source='user.username', read_only=True)
     user_avatar = serializers.SerializerMethodField()
@@ -32,19 +46,18 @@ class ReviewSerializer(serializers.ModelSerializer):
     album_title = serializers.CharField(source='album.title', read_only=True)
     album_artist = serializers.CharField(source='album.artist', read_only=True)
     album_cover = serializers.CharField(source='album.cover_url', read_only=True)
+    album_cover_thumb = serializers.SerializerMethodField()
     album_artist_photo = serializers.CharField(source='album.artist_photo_url', read_only=True)
     album_year = serializers.IntegerField(source='album.year', read_only=True)
     album_discogs_id = serializers.CharField(source='album.discogs_id', read_only=True)
-    likes_count = serializers.SerializerMethodField()
     is_liked_by_user = serializers.SerializerMethodField()
-    comments_count = serializers.SerializerMethodField()
     
     class Meta:
         model = Review
         fields = ['id', 'username', 'user_avatar', 'user_is_staff', 'rating', 'content', 'user_genres', 'created_at', 
-                  'album_title', 'album_artist', 'album_cover', 'album_artist_photo', 'album_year', 'album_discogs_id', 'is_pinned',
+                  'album_title', 'album_artist', 'album_cover', 'album_cover_thumb', 'album_artist_photo', 'album_year', 'album_discogs_id', 'is_pinned',
                   'likes_count', 'is_liked_by_user', 'comments_count']
-        read_only_fields = ['id', 'created_at']
+        read_only_fields = ['id', 'created_at', 'likes_count', 'comments_count']
     
     def get_user_avatar(self, obj):
         try:
@@ -54,37 +67,24 @@ class ReviewSerializer(serializers.ModelSerializer):
         except Exception:
             return None
 
-    def get_likes_count(self, obj):
-        try:
-            # Use prefetched data to avoid N+1 queries
-            return len(obj.likes.all())
-        except Exception:
-            return 0
+    def get_album_cover_thumb(self, obj):
+        # Sized for the profile grid; falls back to the full cover until variants exist
+        return obj.album.cover_url_for(COVER_CARD)
 
     def get_is_liked_by_user(self, obj):
         try:
-            request = self.context.get('request')
-            if request and request.user.is_authenticated:
-                # Use prefetched data instead of filtering
-                return any(like.user_id == request.user.id for like in obj.likes.all())
-            return False
+            return _is_liked_by_viewer(obj, self.context)
         except Exception:
             return False
 
-    def get_comments_count(self, obj):
-        try:
-            # Use prefetched data to avoid N+1 queries
-            return len(obj.comments.all())
-        except Exception:
-            return 0
-
 class AlbumSerializer(serializers.ModelSerializer):
     genres = GenreSerializer(many=True, read_only=True)
+    cover_images = serializers.JSONField(read_only=True)
     
     class Meta:
         model = Album
         fields = [
-            'id', 'title', 'artist', 'year', 'cover_url', 'artist_photo_url',
+            'id', 'title', 'artist', 'year', 'cover_url', 'cover_images', 'artist_photo_url',
             'discogs_id', 'genres', 'discogs_genres', 'discogs_styles', 
             'tracklist', 'credits', 'created_at', 'updated_at'
         ]
@@ -111,7 +111,7 @@ class ActivitySerializer(serializers.ModelSerializer):
     class Meta:
         model = Activity
         fields = ['id', 'user', 'activity_type', 'target_user', 
-                  'review_details', 'comment_details', 'created_at']
+                  'review_details', 'comment_details', 'metadata', 'created_at']
     
     def get_user(self, obj):
         try:
@@ -142,11 +142,7 @@ class ActivitySerializer(serializers.ModelSerializer):
     def get_review_details(self, obj):
         try:
             if obj.review:
-                request = self.context.get('request')
-                is_liked_by_user = False
-                if request and request.user.is_authenticated:
-                    # Use prefetched data to avoid extra query
-                    is_liked_by_user = any(like.user_id == request.user.id for like in obj.review.likes.all())
+                is_liked_by_user = _is_liked_by_viewer(obj.review, self.context)
 
                 review_data = {
                     'id': obj.review.id,
@@ -159,6 +155,7 @@ class ActivitySerializer(serializers.ModelSerializer):
                         'artist': obj.review.album.artist,
                         'year': obj.review.album.year,
                         'cover_url': obj.review.album.cover_url,
+                        'cover_thumb': obj.review.album.cover_url_for(COVER_TILE),
                         'discogs_id': obj.review.album.discogs_id,
                     },
                     'user': {
@@ -168,9 +165,8 @@ class ActivitySerializer(serializers.ModelSerializer):
                     }
                 }
 
-                # Use prefetched data for counts - much faster than .count() queries
-                review_data['likes_count'] = len(obj.review.likes.all())
-                review_data['comments_count'] = len(obj.review.comments.all())
+                review_data['likes_count'] = obj.review.likes_count
+                review_data['comments_count'] = obj.review.comments_count
 
                 return review_data
             return None
@@ -319,7 +315,8 @@ class ListSummarySerializer(serializers.ModelSerializer):
                 'id': item.album.id,
                 'title': item.album.title,
                 'artist': item.album.artist,
-                'cover_url': item.album.cover_url
+                'cover_url': item.album.cover_url,
+                'cover_thumb': item.album.cover_url_for(COVER_TILE),
             } for item in first_items]
         except Exception:
             return [] 
\ No newline at end of file
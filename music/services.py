@@ -1,20 +1,570 @@
+import os
+import json
+import hashlib
 import requests
 import logging
+import threading
 import time
 from typing import List, Dict, Optional, Any
+from datetime import timedelta
 from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .models import Album, Artist, DiscogsAlias, DiscogsResponse
+from .text_utils import normalize_text
 
 logger = logging.getLogger(__name__)
 
-class ExternalMusicService:
+
+class DiscogsUnavailable(Exception):
+    """Discogs can't be reached right now and there is no stored payload to fall back on"""
+
+
+class StaleDiscogsPayload(dict):
+    """A last-known Discogs payload served while Discogs is unavailable"""
+    stale = True
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker whose state lives in the shared cache, so every worker
+    (and the cache_stats command) sees the same state.
+
+    Outcomes are counted in tumbling windows. Once enough calls in a window
+    have failed or run slow, the breaker opens for `cooldown` seconds and
+    calls are rejected immediately. After the cooldown a single probe is let
+    through (half-open); its outcome closes the breaker or opens it again.
+    """
+
+    def __init__(self, name: str, failure_ratio: float, min_calls: int, slow_call_seconds: float,
+                 window: int, cooldown: int):
+        self.name = name
+        self.failure_ratio = failure_ratio
+        self.min_calls = min_calls
+        self.slow_call_seconds = slow_call_seconds
+        self.window = window
+        self.cooldown = cooldown
+        self.open_key = f"circuit_{name}_open_until"
+        self.probe_key = f"circuit_{name}_probe"
+
+    def _bucket_keys(self):
+        bucket = int(time.time() // self.window)
+        return f"circuit_{self.name}_calls_{bucket}", f"circuit_{self.name}_failures_{bucket}"
+
+    def _incr(self, key: str) -> int:
+        cache.add(key, 0, self.window * 2)
+        try:
+            return cache.incr(key)
+        except ValueError:
+            # Expired between add and incr
+            cache.set(key, 1, self.window * 2)
+            return 1
+
+    def allow_request(self) -> bool:
+        open_until = cache.get(self.open_key)
+        if open_until is None:
+            return True
+        if time.time() < open_until:
+            return False
+        # Half-open: only one caller gets to probe
+        return cache.add(self.probe_key, 1, self.cooldown)
+
+    def record_success(self, duration: float):
+        if duration >= self.slow_call_seconds:
+            self.record_failure()
+            return
+
+        calls_key, _ = self._bucket_keys()
+        self._incr(calls_key)
+        if cache.get(self.open_key) is not None:
+            logger.info(f"Circuit breaker '{self.name}' closed")
+            cache.delete_many([self.open_key, self.probe_key])
+
+    def record_failure(self):
+        calls_key, failures_key = self._bucket_keys()
+        calls = self._incr(calls_key)
+        failures = self._incr(failures_key)
+
+        half_open = cache.get(self.open_key) is not None
+        if half_open or (calls >= self.min_calls and failures / calls >= self.failure_ratio):
+            self.trip()
+
+    def trip(self):
+        logger.warning(f"Circuit breaker '{self.name}' opened for {self.cooldown}s")
+        cache.set(self.open_key, time.time() + self.cooldown, self.cooldown * 10)
+        cache.delete(self.probe_key)
+
+    def is_closed(self) -> bool:
+        """Cheap check for optional work that shouldn't probe a struggling upstream"""
+        return cache.get(self.open_key) is None
+
+    def state(self) -> Dict[str, Any]:
+        open_until = cache.get(self.open_key)
+        if open_until is None:
+            state = 'closed'
+        elif time.time() < open_until:
+            state = 'open'
+        else:
+            state = 'half-open'
+
+        calls_key, failures_key = self._bucket_keys()
+        counts = cache.get_many([calls_key, failures_key])
+        return {
+            'name': self.name,
+            'state': state,
+            'open_until': open_until,
+            'window_calls': counts.get(calls_key, 0),
+            'window_failures': counts.get(failures_key, 0),
+        }
+
+
+class DiscogsRateLimiter:
+    """
+    Client-side limiter driven by Discogs' X-Discogs-Ratelimit-* headers.
+
+    Discogs grants a fixed number of requests per moving 60 second window and
+    reports the limit, used and remaining counts on every response. Those counts
+    are shared by every worker using the same credentials, so each response
+    resyncs this worker's view of the budget. While the budget is healthy calls
+    go straight through; once it drops to the reserve, calls are paced evenly
+    across the window instead of running into 429s.
+    """
+    WINDOW_SECONDS = 60.0
+
+    def __init__(self, default_limit: int = 60, reserve: int = 5, max_wait: float = 5.0):
+        self._lock = threading.Lock()
+        self.limit = default_limit
+        self.remaining = default_limit
+        self.reserve = reserve
+        self.max_wait = max_wait
+        self.updated_at = 0.0
+        self.next_slot = 0.0
+
+    def acquire(self):
+        """Block until a request may be sent (never longer than max_wait)"""
+        with self._lock:
+            now = time.monotonic()
+
+            # Assume the window has fully recovered if we haven't heard from Discogs in a while
+            if now - self.updated_at >= self.WINDOW_SECONDS:
+                self.remaining = self.limit
+
+            if self.remaining > self.reserve:
+                self.remaining -= 1
+                return
+
+            # Budget is nearly spent: space requests at the steady-state rate
+            interval = self.WINDOW_SECONDS / max(self.limit, 1)
+            wait = min(max(self.next_slot - now, 0.0), self.max_wait)
+            self.next_slot = max(self.next_slot, now) + interval
+            self.remaining = max(self.remaining - 1, 0)
+
+        if wait > 0:
+            logger.info(f"Discogs rate limit nearly exhausted, waiting {wait:.2f}s")
+            time.sleep(wait)
+
+    def update(self, headers):
+        """Resync the budget from a Discogs response"""
+        try:
+            limit = int(headers.get('X-Discogs-Ratelimit', self.limit))
+            remaining = int(headers['X-Discogs-Ratelimit-Remaining'])
+        except (KeyError, TypeError, ValueError):
+            return
+
+        with self._lock:
+            self.limit = limit
+            self.remaining = remaining
+            self.updated_at = time.monotonic()
+
+    @property
+    def available(self) -> int:
+        """Requests left in the current window above the reserve"""
+        with self._lock:
+            if time.monotonic() - self.updated_at >= self.WINDOW_SECONDS:
+                return self.limit - self.reserve
+            return max(self.remaining - self.reserve, 0)
+
+
+class DiscogsResponseStore:
+    """
+    Read-through store of raw Discogs payloads in the database.
+
+    Entries are keyed by endpoint and canonical params and expire per endpoint:
+    master and release data almost never changes, search results drift. Expired
+    entries are kept so they can be revalidated with the validators Discogs sent,
+    until prune() drops the ones past a maximum age; master and release entries
+    are kept indefinitely as fallbacks for when Discogs is down.
+    Store failures are logged and never fail the request itself.
+    """
+    ENDPOINT_TTLS = (
+        ('database/search', timedelta(days=1)),
+        ('masters/', timedelta(days=90)),
+        ('releases/', timedelta(days=90)),
+        ('artists/', timedelta(days=14)),
+    )
+    DEFAULT_TTL = timedelta(days=1)
+    # Kept however old they get; everything else is pruned once past the maximum age
+    KEEP_EXPIRED = ('masters/', 'releases/')
+    PRUNE_BATCH_SIZE = 5000
+
+    @classmethod
+    def ttl_for(cls, endpoint: str) -> timedelta:
+        for prefix, ttl in cls.ENDPOINT_TTLS:
+            if endpoint.startswith(prefix):
+                return ttl
+        return cls.DEFAULT_TTL
+
+    @staticmethod
+    def canonical_params(params: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """Params as sorted strings, so equivalent requests share an entry"""
+        return {str(k): str(v) for k, v in sorted((params or {}).items()) if v is not None}
+
+    @classmethod
+    def params_key(cls, params: Dict[str, str]) -> str:
+        return hashlib.sha256(json.dumps(params, separators=(',', ':')).encode()).hexdigest()
+
+    @classmethod
+    def lookup(cls, endpoint: str, params: Dict[str, str]) -> Optional[DiscogsResponse]:
+        try:
+            return DiscogsResponse.objects.filter(
+                endpoint=endpoint,
+                params_key=cls.params_key(params)
+            ).first()
+        except DatabaseError as e:
+            logger.error(f"Discogs response store lookup failed: {str(e)}")
+            return None
+
+    @classmethod
+    def save(cls, endpoint: str, params: Dict[str, str], payload: Dict[str, Any], headers) -> None:
+        now = timezone.now()
+        try:
+            DiscogsResponse.objects.update_or_create(
+                endpoint=endpoint,
+                params_key=cls.params_key(params),
+                defaults={
+                    'params': params,
+                    'payload': payload,
+                    'etag': headers.get('ETag', ''),
+                    'last_modified': headers.get('Last-Modified', ''),
+                    'fetched_at': now,
+                    'expires_at': now + cls.ttl_for(endpoint),
+                }
+            )
+        except DatabaseError as e:
+            logger.error(f"Discogs response store write failed: {str(e)}")
+
+    @classmethod
+    def touch(cls, entry: DiscogsResponse) -> None:
+        """Extend an entry Discogs confirmed as unchanged"""
+        now = timezone.now()
+        try:
+            DiscogsResponse.objects.filter(pk=entry.pk).update(
+                fetched_at=now,
+                expires_at=now + cls.ttl_for(entry.endpoint)
+            )
+        except DatabaseError as e:
+            logger.error(f"Discogs response store write failed: {str(e)}")
+
+    @classmethod
+    def prune(cls, max_age: timedelta) -> int:
+        """Delete search and other short-lived entries fetched longer than max_age ago; returns the number deleted"""
+        entries = DiscogsResponse.objects.filter(fetched_at__lt=timezone.now() - max_age, expires_at__lt=timezone.now())
+        for prefix in cls.KEEP_EXPIRED:
+            entries = entries.exclude(endpoint__startswith=prefix)
+
+        deleted = 0
+        # Batches keep each DELETE short on a table the request path writes to
+        while True:
+            batch = list(entries.values_list('pk', flat=True)[:cls.PRUNE_BATCH_SIZE])
+            if not batch:
+                return deleted
+            deleted += DiscogsResponse.objects.filter(pk__in=batch).delete()[0]
+
+    @staticmethod
+    def conditional_headers(entry: Optional[DiscogsResponse]) -> Dict[str, str]:
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+
+class DiscogsClient:
+    """
+    Keep-alive HTTP client for the Discogs API.
+
+    Holds a single requests.Session with a connection pool sized for the
+    worker's concurrency, so repeated calls reuse TCP+TLS connections instead
+    of opening a new one each time. Idempotent GETs are retried with jittered
+    exponential backoff on 429 and 5xx responses.
+    """
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    @staticmethod
+    def build_breaker() -> CircuitBreaker:
+        return CircuitBreaker(
+            'discogs',
+            failure_ratio=settings.DISCOGS_BREAKER_FAILURE_RATIO,
+            min_calls=settings.DISCOGS_BREAKER_MIN_CALLS,
+            slow_call_seconds=settings.DISCOGS_BREAKER_SLOW_CALL_SECONDS,
+            window=settings.DISCOGS_BREAKER_WINDOW,
+            cooldown=settings.DISCOGS_BREAKER_COOLDOWN,
+        )
+
     def __init__(self):
         self.base_url = settings.DISCOGS_API_URL
         self.consumer_key = settings.DISCOGS_CONSUMER_KEY
         self.consumer_secret = settings.DISCOGS_CONSUMER_SECRET
-        self.token = settings.DISCOGS_TOKEN
-        self.user_agent = "HalfnoteApp/1.0 +http://halfnote.com"
-        self.last_request_time = 0
-        self.min_request_interval = 1.0  # Minimum seconds between requests
+        self.timeout = (settings.DISCOGS_CONNECT_TIMEOUT, settings.DISCOGS_READ_TIMEOUT)
+        self.limiter = DiscogsRateLimiter(
+            default_limit=settings.DISCOGS_RATE_LIMIT,
+            reserve=settings.DISCOGS_RATE_LIMIT_RESERVE,
+        )
+        self.breaker = self.build_breaker()
+        self.session = self._build_session()
+
+    def _build_session(self) -> requests.Session:
+        retry = Retry(
+            total=settings.DISCOGS_MAX_RETRIES,
+            backoff_factor=0.5,
+            backoff_jitter=0.5,
+            backoff_max=4,
+            status_forcelist=self.RETRY_STATUSES,
+            allowed_methods=frozenset(['GET']),
+            # Retry-After can ask for up to a minute; the limiter paces us instead
+            respect_retry_after_header=False,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=settings.DISCOGS_POOL_MAXSIZE,
+            max_retries=retry,
+        )
+
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update({
+            'User-Agent': 'HalfnoteApp/1.0',
+            'Accept': 'application/json',
+        })
+        return session
+
+    def get(self, endpoint: str, params: Optional[Dict[str, Any]] = None, timeout=None) -> Dict[str, Any]:
+        """
+        GET a Discogs endpoint and return the decoded JSON body, reading through
+        the response store.
+
+        While the circuit breaker is open, or when the request fails outright,
+        the last stored payload is returned as a StaleDiscogsPayload. Without
+        one, an open breaker raises DiscogsUnavailable and a failed request
+        raises the requests exception (HTTPError for non-2xx responses).
+        """
+        canonical = DiscogsResponseStore.canonical_params(params)
+        entry = DiscogsResponseStore.lookup(endpoint, canonical)
+        if entry is not None and not entry.is_expired:
+            return entry.payload
+
+        if not self.breaker.allow_request():
+            if entry is not None:
+                return StaleDiscogsPayload(entry.payload)
+            raise DiscogsUnavailable(f"Discogs circuit is open, not requesting {endpoint}")
+
+        request_params = dict(canonical)
+        request_params.update({
+            'key': self.consumer_key,
+            'secret': self.consumer_secret
+        })
+
+        self.limiter.acquire()
+        started = time.monotonic()
+        try:
+            response = self.session.get(
+                f"{self.base_url}/{endpoint}",
+                params=request_params,
+                headers=DiscogsResponseStore.conditional_headers(entry),
+                timeout=timeout or self.timeout,
+            )
+        except requests.exceptions.RequestException:
+            self.breaker.record_failure()
+            if entry is not None:
+                return StaleDiscogsPayload(entry.payload)
+            raise
+
+        self.limiter.update(response.headers)
+        if response.status_code in self.RETRY_STATUSES:
+            self.breaker.record_failure()
+            if entry is not None:
+                return StaleDiscogsPayload(entry.payload)
+        else:
+            self.breaker.record_success(time.monotonic() - started)
+
+        if response.status_code == 304 and entry is not None:
+            DiscogsResponseStore.touch(entry)
+            return entry.payload
+
+        response.raise_for_status()
+        payload = response.json()
+        DiscogsResponseStore.save(endpoint, canonical, payload, response.headers)
+        return payload
+
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+def get_discogs_client() -> DiscogsClient:
+    """Return this worker's shared Discogs client, creating it on first use"""
+    global _client, _client_pid
+
+    # Rebuild after a fork so workers never share pooled sockets with their parent
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _client_lock:
+            if _client is None or _client_pid != pid:
+                _client = DiscogsClient()
+                _client_pid = pid
+    return _client
+
+
+def get_known_artist_photos(artist_names) -> Dict[str, Optional[str]]:
+    """
+    Photos for artists whose lookup is still fresh, keyed by the given name.
+    Known no-photo artists map to None; unknown or stale artists are omitted.
+    """
+    by_normalized = {normalize_text(name): name for name in artist_names}
+    known = {}
+    for artist in Artist.objects.filter(normalized_name__in=by_normalized.keys()):
+        if artist.is_photo_fresh:
+            known[by_normalized[artist.normalized_name]] = artist.photo_url
+    return known
+
+
+def get_artist_photo(artist_name: str) -> Optional[str]:
+    """
+    Resolve an artist photo through the Artist table.
+    Discogs is only asked about artists that are unknown or whose last lookup has expired.
+    """
+    normalized_name = normalize_text(artist_name)
+    if not normalized_name:
+        return None
+
+    artist = Artist.objects.filter(normalized_name=normalized_name).first()
+    if artist and artist.is_photo_fresh:
+        return artist.photo_url
+
+    client = get_discogs_client()
+    try:
+        data = client.get(
+            "database/search",
+            params={
+                "q": artist_name,
+                "type": "artist",
+                "per_page": 1,
+            },
+            timeout=(2, 5)
+        )
+        results = data.get('results', [])
+        discogs_id = str(results[0]['id']) if results and results[0].get('id') else None
+
+        photo_url = None
+        if discogs_id:
+            # Another spelling may already have resolved to the same Discogs artist
+            alias = Artist.objects.filter(discogs_id=discogs_id, photo_fetched_at__isnull=False).first()
+            if alias and alias.is_photo_fresh:
+                photo_url = alias.photo_url
+            else:
+                # Details of first artist result
+                artist_data = client.get(f"artists/{discogs_id}", timeout=(2, 5))
+                images = artist_data.get('images', [])
+                if images:
+                    photo_url = images[0].get('uri')
+    except Exception as e:
+        # Don't record a "no photo" marker for a failed lookup; fall back to whatever we had
+        logger.error(f"Error fetching artist photo for {artist_name}: {e}")
+        return artist.photo_url if artist else None
+
+    Artist.objects.update_or_create(
+        normalized_name=normalized_name,
+        defaults={
+            'name': artist_name,
+            'discogs_id': discogs_id,
+            'photo_url': photo_url,
+            'has_no_photo': not photo_url,
+            'photo_fetched_at': timezone.now(),
+        }
+    )
+    return photo_url
+
+
+def _alias_cache_key(discogs_id) -> str:
+    return f'discogs_alias_{discogs_id}'
+
+
+def get_known_album_id(discogs_id) -> str:
+    """Canonical ID for an album URL ID if it's already known, otherwise the ID itself (never calls Discogs)"""
+    discogs_id = str(discogs_id)
+    cached = cache.get(_alias_cache_key(discogs_id))
+    if cached:
+        return cached[0]
+    canonical_id = DiscogsAlias.objects.filter(discogs_id=discogs_id).values_list('canonical_id', flat=True).first()
+    return canonical_id or discogs_id
+
+
+def record_album_alias(discogs_id, canonical_id, kind='') -> None:
+    """Remember which canonical album an ID refers to"""
+    DiscogsAlias.objects.update_or_create(
+        discogs_id=str(discogs_id),
+        defaults={'canonical_id': str(canonical_id), 'kind': kind},
+    )
+    if kind and str(canonical_id) != str(discogs_id):
+        # The canonical ID always refers to itself
+        DiscogsAlias.objects.get_or_create(
+            discogs_id=str(canonical_id), defaults={'canonical_id': str(canonical_id), 'kind': kind}
+        )
+    cache.set(_alias_cache_key(discogs_id), [str(canonical_id), kind], 86400)
+
+
+def resolve_album_id(discogs_id):
+    """
+    Canonical (discogs_id, kind) for an album URL ID, or None if the album doesn't exist.
+    Known IDs and albums already in the catalog are answered without calling Discogs;
+    kind is blank for catalog albums that haven't been resolved against Discogs.
+    """
+    discogs_id = str(discogs_id)
+    cached = cache.get(_alias_cache_key(discogs_id))
+    if cached:
+        return tuple(cached)
+
+    alias = DiscogsAlias.objects.filter(discogs_id=discogs_id).values_list('canonical_id', 'kind').first()
+    if alias is None:
+        if Album.objects.filter(discogs_id=discogs_id).exists():
+            alias = (discogs_id, '')
+        else:
+            try:
+                alias = ExternalMusicService().resolve_album_id(discogs_id)
+            except requests.RequestException as e:
+                # Don't remember anything; the album fetch will report the error itself
+                logger.error(f"Could not resolve Discogs ID {discogs_id}: {e}")
+                return discogs_id, ''
+            if alias is None:
+                return None
+        record_album_alias(discogs_id, *alias)
+    else:
+        cache.set(_alias_cache_key(discogs_id), list(alias), 86400)
+    return tuple(alias)
+
+
+class ExternalMusicService:
+    def __init__(self):
+        self.client = get_discogs_client()
     
     def _clean_artist_name(self, artist_name: str) -> str:
         """
@@ -34,25 +584,10 @@ class ExternalMusicService:
         """
         Make a request to the Discogs API
         """
-        headers = {
-            'User-Agent': 'HalfnoteApp/1.0'
-        }
-
-        # Add authentication via query parameters (simpler approach)
-        if params is None:
-            params = {}
-        params.update({
-            'key': self.consumer_key,
-            'secret': self.consumer_secret
-        })
-
-        url = f"{self.base_url}/{endpoint}"
-        logger.info(f"Making Discogs API request to: {url}")
+        logger.info(f"Making Discogs API request to: {endpoint}")
 
         try:
-            response = requests.get(url, params=params, headers=headers, timeout=(2, 10))
-            response.raise_for_status()
-            return response.json()
+            return self.client.get(endpoint, params)
         except requests.exceptions.RequestException as e:
             logger.error(f"Error making request to Discogs API: {str(e)}")
             raise
@@ -104,113 +639,169 @@ class ExternalMusicService:
             
             return formatted_results
             
+        except DiscogsUnavailable:
+            raise
         except Exception as e:
             logger.error(f"Discogs API error: {str(e)}")
             return []
 
-    def get_album_details(self, discogs_id):
-        """Get detailed information about an album from Discogs"""
-        logger.info(f"Fetching album details for Discogs ID: {discogs_id}")
-        
+    def _get_or_none(self, endpoint: str) -> Optional[Dict[str, Any]]:
+        """Payload for an endpoint, or None if Discogs doesn't have it"""
         try:
-            # First try to get the master release
-            master_data = self._make_request(f"masters/{discogs_id}")
-            
-            if master_data:
-                # If we found a master release, get the main release
-                main_release_id = master_data.get('main_release')
-                if main_release_id:
-                    release_data = self._make_request(f"releases/{main_release_id}")
-                else:
-                    release_data = None
+            return self._make_request(endpoint)
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                return None
+            raise
+
+    def _iter_album_payloads(self, discogs_id, kind=None):
+        """
+        Yield ('master', payload) and then ('release', payload) for an album URL ID, as each arrives.
+        IDs are tried as a master first, then as a release (whose master is used if it has one).
+        Either payload is None when Discogs doesn't have it.
+        """
+        master_data = release_data = None
+        if kind != 'release':
+            master_data = self._get_or_none(f"masters/{discogs_id}")
+
+        if master_data is None and kind != 'master':
+            release_data = self._get_or_none(f"releases/{discogs_id}")
+            master_id = release_data.get('master_id') if release_data else None
+            if master_id:
+                master_data = self._get_or_none(f"masters/{master_id}")
+        yield 'master', master_data
+
+        # A master is always shown through its main release
+        main_release_id = master_data.get('main_release') if master_data else None
+        if main_release_id and (not release_data or release_data.get('id') != main_release_id):
+            release_data = self._get_or_none(f"releases/{main_release_id}") or release_data
+        yield 'release', release_data
+
+    def resolve_album_id(self, discogs_id, kind=None):
+        """Canonical (discogs_id, kind) for an album URL ID, or None if Discogs has no such album"""
+        payloads = self._iter_album_payloads(discogs_id, kind)
+        _, master_data = next(payloads)
+        if master_data:
+            return str(master_data.get('id', discogs_id)), 'master'
+        _, release_data = next(payloads)
+        if release_data:
+            return str(release_data.get('id', discogs_id)), 'release'
+        return None
+
+    def _clean_artists(self, artists):
+        cleaned_artists = []
+        for artist in artists:
+            if isinstance(artist, dict) and 'name' in artist:
+                cleaned_artist = artist.copy()
+                cleaned_artist['name'] = self._clean_artist_name(artist['name'])
+                cleaned_artists.append(cleaned_artist)
+            elif isinstance(artist, str):
+                cleaned_artists.append(self._clean_artist_name(artist))
             else:
-                # If not found as a master, try the release endpoint
-                release_data = self._make_request(f"releases/{discogs_id}")
-                master_data = None
-            
-            if not release_data and not master_data:
+                cleaned_artists.append(artist)
+        return cleaned_artists
+
+    def _album_core(self, data, canonical_id):
+        """Title, artist, year, genres and cover from a master or release payload"""
+        # Get the main artist name
+        artist_name = "Unknown Artist"
+        if 'artists' in data and data['artists']:
+            raw_artist_name = data['artists'][0].get('name', "Unknown Artist")
+            artist_name = self._clean_artist_name(raw_artist_name)
+
+        album_data = {
+            'title': data.get('title', ''),
+            'artist': artist_name,
+            'year': data.get('year') or '',
+            'genres': data.get('genres', []),
+            'styles': data.get('styles', []),
+            'cover_image': '',
+            'discogs_id': canonical_id,
+        }
+
+        # Get the cover image
+        if 'images' in data and data['images']:
+            primary_images = [img for img in data['images'] if img.get('type') == 'primary']
+            if primary_images:
+                album_data['cover_image'] = primary_images[0].get('uri', '')
+            else:
+                album_data['cover_image'] = data['images'][0].get('uri', '')
+        return album_data
+
+    def _album_tracks(self, data):
+        """Tracklist and credits, with cleaned artist names, from a release (or master) payload"""
+        # Get the tracklist with more details
+        tracklist = []
+        for track in data.get('tracklist', []):
+            if track.get('type_') != 'heading':  # Skip headings
+                tracklist.append({
+                    'position': track.get('position', ''),
+                    'title': track.get('title', ''),
+                    'duration': track.get('duration', ''),
+                    'artists': self._clean_artists(track.get('artists', [])),
+                    'extraartists': self._clean_artists(track.get('extraartists', [])),
+                })
+
+        # Get credits with cleaned artist names
+        credits = []
+        for artist in data.get('extraartists', []):
+            credits.append({
+                'name': self._clean_artist_name(artist.get('name', '')),
+                'role': artist.get('role', ''),
+                'id': artist.get('id', '')
+            })
+        return {'tracklist': tracklist, 'credits': credits}
+
+    def iter_album_details(self, discogs_id, kind=None):
+        """
+        Album details in stages, as each Discogs call completes:
+        ('album', core fields) once the master (or release) is known, then
+        ('tracks', tracklist and credits) from the main release.
+        Yields nothing if the album isn't on Discogs.
+        """
+        payloads = self._iter_album_payloads(discogs_id, kind)
+        _, master_data = next(payloads)
+        release_data = None
+        if master_data is None:
+            # No master, so the release is the album
+            _, release_data = next(payloads)
+            if release_data is None:
                 logger.error(f"Album not found on Discogs: {discogs_id}")
-                return None
-            
-            # Use release data if available, otherwise use master data
-            data = release_data or master_data
-            
-            # Get the main artist name
-            artist_name = "Unknown Artist"
-            if 'artists' in data and data['artists']:
-                raw_artist_name = data['artists'][0].get('name', "Unknown Artist")
-                artist_name = self._clean_artist_name(raw_artist_name)
-            
-            # Get the tracklist with more details
-            tracklist = []
-            if 'tracklist' in data:
-                for track in data['tracklist']:
-                    if track.get('type_') != 'heading':  # Skip headings
-                        # Clean artist names in tracklist
-                        artists = track.get('artists', [])
-                        cleaned_artists = []
-                        for artist in artists:
-                            if isinstance(artist, dict) and 'name' in artist:
-                                cleaned_name = self._clean_artist_name(artist['name'])
-                                cleaned_artist = artist.copy()
-                                cleaned_artist['name'] = cleaned_name
-                                cleaned_artists.append(cleaned_artist)
-                            elif isinstance(artist, str):
-                                cleaned_artists.append(self._clean_artist_name(artist))
-                            else:
-                                cleaned_artists.append(artist)
-                        
-                        # Clean extraartists names as well
-                        extraartists = track.get('extraartists', [])
-                        cleaned_extraartists = []
-                        for artist in extraartists:
-                            if isinstance(artist, dict) and 'name' in artist:
-                                cleaned_name = self._clean_artist_name(artist['name'])
-                                cleaned_artist = artist.copy()
-                                cleaned_artist['name'] = cleaned_name
-                                cleaned_extraartists.append(cleaned_artist)
-                            else:
-                                cleaned_extraartists.append(artist)
-                        
-                        tracklist.append({
-                            'position': track.get('position', ''),
-                            'title': track.get('title', ''),
-                            'duration': track.get('duration', ''),
-                            'artists': cleaned_artists,
-                            'extraartists': cleaned_extraartists
-                        })
-            
-            # Get credits with cleaned artist names
-            credits = []
-            if 'extraartists' in data:
-                for artist in data['extraartists']:
-                    credits.append({
-                        'name': self._clean_artist_name(artist.get('name', '')),
-                        'role': artist.get('role', ''),
-                        'id': artist.get('id', '')
-                    })
-            
-            album_data = {
-                'title': data.get('title', ''),
-                'artist': artist_name,
-                'year': data.get('year', ''),
-                'genres': data.get('genres', []),
-                'styles': data.get('styles', []),
-                'cover_image': '',
-                'discogs_id': discogs_id,
-                'tracklist': tracklist,
-                'credits': credits
-            }
-            
-            # Get the cover image
-            if 'images' in data and data['images']:
-                primary_images = [img for img in data['images'] if img.get('type') == 'primary']
-                if primary_images:
-                    album_data['cover_image'] = primary_images[0].get('uri', '')
-                else:
-                    album_data['cover_image'] = data['images'][0].get('uri', '')
-            
-            return album_data
+                return
+
+        core_data = master_data or release_data
+        # Releases reached by their own ID are reported under their master's
+        canonical_id = str(core_data.get('id', discogs_id))
+        album_data = self._album_core(core_data, canonical_id)
+        yield 'album', album_data
+
+        if master_data is not None:
+            _, release_data = next(payloads)
+        if release_data:
+            # Masters only carry the original year; fill in the main release's if they don't
+            if not album_data['year'] and release_data.get('year'):
+                yield 'album', {'year': release_data['year']}
+        tracks = self._album_tracks(release_data or master_data)
+
+        # Flag data served from the store while Discogs was unavailable
+        if getattr(master_data, 'stale', False) or getattr(release_data, 'stale', False):
+            tracks['stale'] = True
+        yield 'tracks', tracks
+
+    def get_album_details(self, discogs_id, kind=None):
+        """
+        Get detailed information about an album from Discogs.
+        Pass the kind from resolve_album_id to skip lookups on the wrong endpoint.
+        """
+        logger.info(f"Fetching album details for Discogs ID: {discogs_id}")
+        
+        try:
+            album_data = {}
+            for _, data in self.iter_album_details(discogs_id, kind):
+                album_data.update(data)
+            return album_data or None
+        except DiscogsUnavailable:
+            raise
         except Exception as e:
             logger.error(f"Error fetching album details from Discogs: {str(e)}")
-            return None 
\ No newline at end of file
+            return None
@@ -0,0 +1,200 @@
+"""
+Halfnote Music Signals
+Keeps denormalized aggregates in step with the rows they summarize
+"""
+
+from django.db.models import Count, F, FloatField, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Cast, Coalesce, Greatest, NullIf
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .genres import forget_genres
+from .models import AlbumStats, Comment, Genre, Review, ReviewLike
+from .trending import record_trending_event, withdraw_trending_event
+
+RATINGS = range(1, 11)
+
+
+def _valid_rating(rating):
+    try:
+        rating = int(rating)
+    except (TypeError, ValueError):
+        return None
+    return rating if rating in RATINGS else None
+
+
+def update_album_stats(album_id, added=None, removed=None):
+    """
+    Apply one review change to an album's stats in a single UPDATE.
+    added/removed are the ratings entering and leaving the album; the F() expressions
+    are evaluated by the database, so concurrent reviews can't overwrite each other.
+    """
+    if (added is not None and _valid_rating(added) is None) or (removed is not None and _valid_rating(removed) is None):
+        # Can't tell which bucket a malformed rating was counted in
+        rebuild_album_stats([album_id])
+        return
+    added, removed = _valid_rating(added), _valid_rating(removed)
+    if added == removed:
+        return
+
+    count_delta = (added is not None) - (removed is not None)
+    sum_delta = (added or 0) - (removed or 0)
+
+    updates = {
+        'review_count': F('review_count') + count_delta,
+        'rating_sum': F('rating_sum') + sum_delta,
+        # The right-hand side sees the row before this update, so apply the deltas here too
+        'average_rating': (
+            Cast(F('rating_sum') + sum_delta, FloatField()) / NullIf(F('review_count') + count_delta, 0)
+        ),
+    }
+    if added is not None:
+        updates[f'rating_{added}'] = F(f'rating_{added}') + 1
+    if removed is not None:
+        updates[f'rating_{removed}'] = F(f'rating_{removed}') - 1
+
+    stats = AlbumStats.objects.filter(album_id=album_id)
+    if stats.update(**updates):
+        return
+    if removed is not None:
+        # Stats were never built for this album, so there's nothing to take the rating from
+        rebuild_album_stats([album_id])
+        return
+    # First review of the album: add its empty row and count the review like any other, so
+    # concurrent first reviews each add to the row instead of racing to recount it
+    AlbumStats.objects.bulk_create([AlbumStats(album_id=album_id)], ignore_conflicts=True)
+    stats.update(**updates)
+
+
+def rebuild_album_stats(album_ids=None):
+    """Recompute stats from the review table, for the given albums or every reviewed album"""
+    reviews = Review.objects.all()
+    if album_ids is not None:
+        reviews = reviews.filter(album_id__in=album_ids)
+
+    aggregates = reviews.values('album_id').annotate(
+        review_count=Count('id'),
+        rating_sum=Sum('rating'),
+        **{f'rating_{rating}': Count('id', filter=Q(rating=rating)) for rating in RATINGS}
+    ).order_by()
+
+    rows = []
+    for row in aggregates:
+        album_id = row.pop('album_id')
+        rows.append(AlbumStats(
+            album_id=album_id,
+            average_rating=row['rating_sum'] / row['review_count'],
+            **row
+        ))
+
+    fields = ['review_count', 'rating_sum', 'average_rating'] + [f'rating_{rating}' for rating in RATINGS]
+    AlbumStats.objects.bulk_create(
+        rows, batch_size=1000, update_conflicts=True, unique_fields=['album'], update_fields=fields
+    )
+
+    # Albums whose last review is gone keep a row, emptied
+    emptied = AlbumStats.objects.filter(album__reviews__isnull=True)
+    if album_ids is not None:
+        emptied = emptied.filter(album_id__in=album_ids)
+    emptied.update(average_rating=None, **{field: 0 for field in fields if field != 'average_rating'})
+    return len(rows)
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    loaded_rating = getattr(instance, '_loaded_rating', None)
+    if created:
+        update_album_stats(instance.album_id, added=instance.rating)
+    elif loaded_rating is None:
+        # Loaded without its rating (e.g. through .only()), so the old bucket is unknown
+        rebuild_album_stats([instance.album_id])
+    else:
+        update_album_stats(instance.album_id, added=instance.rating, removed=loaded_rating)
+    instance._loaded_rating = instance.rating
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    update_album_stats(instance.album_id, removed=getattr(instance, '_loaded_rating', instance.rating))
+
+
+def adjust_review_counter(review_id, field, delta):
+    """Add delta to one of a review's counters in a single UPDATE, never going below zero"""
+    Review.objects.filter(pk=review_id).update(**{field: Greatest(F(field) + delta, 0)})
+
+
+def _rows_per_review(model):
+    counts = model.objects.filter(review=OuterRef('pk')).order_by().values('review').annotate(n=Count('id'))
+    return Coalesce(Subquery(counts.values('n')), 0)
+
+
+def reconcile_review_counters(review_ids=None):
+    """Recount likes and comments for reviews whose counters drifted; returns how many were fixed"""
+    reviews = Review.objects.all()
+    if review_ids is not None:
+        reviews = reviews.filter(pk__in=review_ids)
+
+    drifted = list(reviews.annotate(
+        actual_likes=_rows_per_review(ReviewLike),
+        actual_comments=_rows_per_review(Comment),
+    ).filter(
+        ~Q(likes_count=F('actual_likes')) | ~Q(comments_count=F('actual_comments'))
+    ).values_list('pk', flat=True))
+
+    for start in range(0, len(drifted), 1000):
+        Review.objects.filter(pk__in=drifted[start:start + 1000]).update(
+            likes_count=_rows_per_review(ReviewLike),
+            comments_count=_rows_per_review(Comment),
+        )
+    return len(drifted)
+
+
+# Cascades (a deleted user's likes and comments) send post_delete for every row too
+
+@receiver(post_save, sender=ReviewLike)
+def review_like_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        adjust_review_counter(instance.review_id, 'likes_count', 1)
+
+
+@receiver(post_delete, sender=ReviewLike)
+def review_like_deleted(sender, instance, **kwargs):
+    adjust_review_counter(instance.review_id, 'likes_count', -1)
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        adjust_review_counter(instance.review_id, 'comments_count', 1)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    adjust_review_counter(instance.review_id, 'comments_count', -1)
+
+
+# Bulk imports don't send post_save, so backdated reviews never trend
+
+@receiver(post_save, sender=Review)
+@receiver(post_save, sender=ReviewLike)
+@receiver(post_save, sender=Comment)
+def count_trending_activity(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        if sender is Review:
+            record_trending_event('review', instance.pk, instance.created_at)
+        else:
+            record_trending_event('like' if sender is ReviewLike else 'comment', instance.review_id, instance.created_at)
+
+
+@receiver(post_delete, sender=ReviewLike)
+def withdraw_trending_like(sender, instance, **kwargs):
+    withdraw_trending_event('like', instance.review_id, instance.created_at)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def genre_changed(sender, **kwargs):
+    # Other workers catch up when their registry reloads
+    forget_genres()
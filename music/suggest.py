@@ -0,0 +1,254 @@
+"""
+Halfnote Typeahead Index
+Compact, memory-mapped prefix index for album and artist autocomplete
+
+The index is a single read-only file built by the build_suggest_index command.
+Every worker memory-maps it, so the operating system shares one copy of the
+pages across processes and lookups never touch the database or Discogs.
+
+File layout (little-endian):
+    header          magic, entry count, prefix count
+    entry offsets   uint32 per entry, entries sorted by normalized key
+    prefix offsets  uint32 per prefix, prefixes sorted
+    entries         keylen (u16), key, weight (u32), payloadlen (u16), JSON payload
+    prefixes        prefixlen (u8), prefix, count (u8), entry indexes (u32 each)
+
+Short prefixes match huge ranges of keys, so the top entries for every prefix
+up to PREFIX_DEPTH characters are precomputed, as they are for any longer
+prefix matching more than SCAN_LIMIT keys ("the b..."). Other prefixes binary
+search the sorted keys and rank the whole matching range, which is never more
+than SCAN_LIMIT keys.
+"""
+
+import bisect
+import heapq
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+
+from django.conf import settings
+
+from .text_utils import normalize_text
+
+MAGIC = b'HNSUGG01'
+HEADER = struct.Struct('<8sII')
+OFFSET = struct.Struct('<I')
+PREFIX_DEPTH = 3
+PREFIX_TOP_K = 20
+SCAN_LIMIT = 256
+RELOAD_CHECK_SECONDS = 30
+
+
+def write_index(path, entries):
+    """
+    Write an index file from (key, weight, payload) tuples.
+    Keys are normalized here; the file is replaced atomically.
+    """
+    records = sorted(
+        ((normalize_text(key)[:255].encode('utf-8'), int(weight), payload) for key, weight, payload in entries),
+        key=lambda record: (record[0], -record[1])
+    )
+    records = [record for record in records if record[0]]
+
+    # Best entries for each short prefix, by weight
+    top = {}
+    for index, (key, weight, _) in enumerate(records):
+        text = key.decode('utf-8')
+        for length in range(1, min(len(text), PREFIX_DEPTH) + 1):
+            heap = top.setdefault(text[:length].encode('utf-8'), [])
+            if len(heap) < PREFIX_TOP_K:
+                heapq.heappush(heap, (weight, -index))
+            else:
+                heapq.heappushpop(heap, (weight, -index))
+
+    # ...and for each longer prefix too common to rank by scanning its range
+    texts = [key.decode('utf-8') for key, _, _ in records]
+    for prefix, start, end in _wide_prefixes(texts, PREFIX_DEPTH):
+        if len(prefix.encode('utf-8')) > 255:
+            continue
+        top[prefix.encode('utf-8')] = heapq.nlargest(
+            PREFIX_TOP_K, ((records[index][1], -index) for index in range(start, end))
+        )
+
+    entry_blobs = []
+    for key, weight, payload in records:
+        data = json.dumps(payload, separators=(',', ':')).encode('utf-8')[:65535]
+        entry_blobs.append(
+            struct.pack('<H', len(key)) + key + struct.pack('<IH', min(weight, 0xFFFFFFFF), len(data)) + data
+        )
+
+    prefix_blobs = []
+    for prefix in sorted(top):
+        ranked = [-index for _, index in sorted(top[prefix], reverse=True)]
+        prefix_blobs.append(
+            struct.pack('<B', len(prefix)) + prefix + struct.pack('<B', len(ranked))
+            + b''.join(OFFSET.pack(index) for index in ranked)
+        )
+
+    position = HEADER.size + OFFSET.size * (len(entry_blobs) + len(prefix_blobs))
+    entry_offsets = []
+    for blob in entry_blobs:
+        entry_offsets.append(position)
+        position += len(blob)
+    prefix_offsets = []
+    for blob in prefix_blobs:
+        prefix_offsets.append(position)
+        position += len(blob)
+
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(entry_blobs), len(prefix_blobs)))
+        f.write(b''.join(OFFSET.pack(offset) for offset in entry_offsets))
+        f.write(b''.join(OFFSET.pack(offset) for offset in prefix_offsets))
+        for blob in entry_blobs:
+            f.write(blob)
+        for blob in prefix_blobs:
+            f.write(blob)
+    # Readers keep their mapping of the old file until they notice the new one
+    os.replace(tmp_path, path)
+    return len(entry_blobs)
+
+
+def _wide_prefixes(texts, depth):
+    """(prefix, start, end) for every prefix longer than depth matching more than SCAN_LIMIT of the sorted texts"""
+    ranges = [(0, len(texts), 0)]
+    while ranges:
+        start, end, length = ranges.pop()
+        index = start
+        while index < end:
+            if len(texts[index]) <= length:
+                index += 1
+                continue
+            prefix = texts[index][:length + 1]
+            group_end = bisect.bisect_left(texts, prefix + '\U0010ffff', index, end)
+            if group_end - index > SCAN_LIMIT:
+                if length + 1 > depth:
+                    yield prefix, index, group_end
+                # Only ranges this wide can hold longer wide prefixes
+                ranges.append((index, group_end, length + 1))
+            index = group_end
+
+
+class SuggestIndex:
+    """Read-only view over a memory-mapped index file"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            stat = os.fstat(f.fileno())
+        self.identity = (stat.st_ino, stat.st_mtime_ns)
+
+        magic, self.entry_count, self.prefix_count = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not a suggest index')
+        self.entry_table = HEADER.size
+        self.prefix_table = self.entry_table + OFFSET.size * self.entry_count
+
+    def _entry_offset(self, index):
+        return OFFSET.unpack_from(self.mm, self.entry_table + OFFSET.size * index)[0]
+
+    def _key(self, index):
+        offset = self._entry_offset(index)
+        length = struct.unpack_from('<H', self.mm, offset)[0]
+        return self.mm[offset + 2:offset + 2 + length]
+
+    def _weight(self, index):
+        offset = self._entry_offset(index)
+        key_length = struct.unpack_from('<H', self.mm, offset)[0]
+        return struct.unpack_from('<I', self.mm, offset + 2 + key_length)[0]
+
+    def _payload(self, index):
+        offset = self._entry_offset(index)
+        key_length = struct.unpack_from('<H', self.mm, offset)[0]
+        offset += 2 + key_length + 4
+        length = struct.unpack_from('<H', self.mm, offset)[0]
+        return json.loads(self.mm[offset + 2:offset + 2 + length])
+
+    def _prefix_entries(self, prefix):
+        """Precomputed entry indexes for a short prefix"""
+        lo, hi = 0, self.prefix_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = OFFSET.unpack_from(self.mm, self.prefix_table + OFFSET.size * mid)[0]
+            length = self.mm[offset]
+            candidate = self.mm[offset + 1:offset + 1 + length]
+            if candidate < prefix:
+                lo = mid + 1
+            elif candidate > prefix:
+                hi = mid
+            else:
+                offset += 1 + length
+                count = self.mm[offset]
+                return struct.unpack_from(f'<{count}I', self.mm, offset + 1)
+        return ()
+
+    def _scan_entries(self, prefix):
+        """Entry indexes whose key starts with prefix, for prefixes without precomputed entries"""
+        lo, hi = 0, self.entry_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < prefix:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        # Wider ranges have precomputed entries; the bound only matters for indexes built before those were
+        matches = []
+        for index in range(lo, min(lo + SCAN_LIMIT, self.entry_count)):
+            if not self._key(index).startswith(prefix):
+                break
+            matches.append(index)
+        return matches
+
+    def lookup(self, query, limit=10):
+        prefix = normalize_text(query).encode('utf-8')
+        if not prefix:
+            return []
+
+        candidates = self._prefix_entries(prefix)
+        if not candidates and len(prefix.decode('utf-8')) > PREFIX_DEPTH:
+            candidates = sorted(self._scan_entries(prefix), key=self._weight, reverse=True)
+
+        # An album is indexed under several keys, so keep only its best match
+        suggestions = []
+        seen = set()
+        for index in candidates:
+            payload = self._payload(index)
+            identity = (payload.get('type'), payload.get('discogs_id') or payload.get('name'))
+            if identity in seen:
+                continue
+            seen.add(identity)
+            suggestions.append(payload)
+            if len(suggestions) >= limit:
+                break
+        return suggestions
+
+
+_index = None
+_index_checked_at = 0.0
+_index_lock = threading.Lock()
+
+
+def get_suggest_index():
+    """This worker's mapping of the index file, reopened when the file is rebuilt"""
+    global _index, _index_checked_at
+
+    now = time.monotonic()
+    if _index is not None and now - _index_checked_at < RELOAD_CHECK_SECONDS:
+        return _index
+
+    with _index_lock:
+        _index_checked_at = now
+        path = settings.SUGGEST_INDEX_PATH
+        try:
+            stat = os.stat(path)
+        except OSError:
+            _index = None
+            return None
+
+        if _index is None or _index.identity != (stat.st_ino, stat.st_mtime_ns):
+            _index = SuggestIndex(path)
+        return _index
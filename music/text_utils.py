@@ -0,0 +1,36 @@
+"""
+Halfnote Text Utils
+Normalization helpers shared by lookups, cache keys and indexes
+"""
+
+import unicodedata
+
+
+def normalize_text(value):
+    """Case-, accent- and whitespace-insensitive form of a name or query"""
+    value = unicodedata.normalize('NFKD', value or '')
+    value = ''.join(ch for ch in value if not unicodedata.combining(ch))
+    return ' '.join(value.casefold().split())
+
+
+# Dash variants people paste in "Artist – Title" queries
+DASH_VARIANTS = str.maketrans({
+    '‐': '-', '‑': '-', '‒': '-', '–': '-',
+    '—': '-', '―': '-', '−': '-',
+})
+
+
+def normalize_search_query(query):
+    """
+    Canonical form of a search query, so equivalent queries share a cache entry.
+    "Artist - Title" queries keep the separator with both sides normalized.
+    """
+    query = normalize_text((query or '').translate(DASH_VARIANTS)).strip(' "\'')
+
+    if ' - ' in query:
+        artist, title = (part.strip(' "\'') for part in query.split(' - ', 1))
+        if artist and title:
+            return f'{artist} - {title}'
+        query = artist or title
+
+    return query
@@ -0,0 +1,311 @@
+"""
+Halfnote Trending Albums
+Time-decayed album charts, updated as reviews, likes and comments happen
+
+An event adds weight * 2 ** ((t - base) / half_life) to its album's score
+instead of decaying every score as time passes. All scores in a chart share
+the base, so ranking by the stored score is ranking by the decayed score, and
+serving a page is a range read over an already sorted chart.
+
+To keep the exponents small, each window's timeline is cut into generations
+one window long, each with its own base and its own chart. Events are written
+to the current generation and the next one, so when the next generation takes
+over it already holds the last window of activity and anything older drops
+out. Charts exist for every window, overall and per review genre. An unlike
+takes its like's weight back out of the charts still holding it, so liking
+a review over and over counts once.
+
+With Redis each chart is a sorted set that expires on its own; otherwise rows
+in TrendingScore are incremented in place and old generations are pruned by
+the rebuild_trending_scores command.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+from functools import reduce
+from operator import or_
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.utils import timezone
+
+from .cache_utils import get_redis_client
+from .models import Comment, Review, ReviewLike, TrendingScore
+from .pagination import clean_keyset_values, decode_cursor, encode_cursor, keyset_filter
+
+logger = logging.getLogger(__name__)
+
+WINDOWS = {
+    '24h': timedelta(hours=24),
+    '7d': timedelta(days=7),
+    '30d': timedelta(days=30),
+}
+# Activity from one window ago counts 1/16 as much as activity now
+HALF_LIVES_PER_WINDOW = 4
+EVENT_WEIGHTS = {'review': 3.0, 'comment': 2.0, 'like': 1.0}
+GLOBAL_SCOPE = 'all'
+RANKING = ['-score', '-album_id']
+
+
+def genre_scope(genre_id):
+    return f'genre_{genre_id}'
+
+
+def _generation(window, when):
+    return int(when.timestamp() // WINDOWS[window].total_seconds())
+
+
+def _growth(window, generation, when):
+    """How much an event at when weighs in a generation's chart, per unit of weight"""
+    length = WINDOWS[window].total_seconds()
+    return 2 ** ((when.timestamp() - generation * length) / (length / HALF_LIVES_PER_WINDOW))
+
+
+def _chart_key(window, scope, generation):
+    # make_key applies the cache prefix so charts sit alongside the rest of the cache
+    return cache.make_key(f'trending_{window}_{scope}_{generation}')
+
+
+def _chart_ttl(window):
+    # A generation is written for two windows and read until it's replaced
+    return int(WINDOWS[window].total_seconds() * 2) + 3600
+
+
+def _increments(genre_ids, when, weight, min_generations=None):
+    """{(window, scope, generation): amount} for one event"""
+    scopes = [GLOBAL_SCOPE] + [genre_scope(genre_id) for genre_id in genre_ids]
+    increments = {}
+    for window in WINDOWS:
+        generation = _generation(window, when)
+        for target in (generation, generation + 1):
+            if min_generations and target < min_generations[window]:
+                continue
+            amount = weight * _growth(window, target, when)
+            for scope in scopes:
+                increments[(window, scope, target)] = amount
+    return increments
+
+
+def _write_increments(album_id, increments, existing_only=False):
+    """Add increments to the album's scores; existing_only leaves charts the album isn't in alone"""
+    redis = get_redis_client()
+    if redis is not None:
+        pipe = redis.pipeline()
+        for (window, scope, generation), amount in increments.items():
+            key = _chart_key(window, scope, generation)
+            if existing_only:
+                pipe.zadd(key, {str(album_id): amount}, xx=True, incr=True)
+            else:
+                pipe.zincrby(key, amount, str(album_id))
+                pipe.expire(key, _chart_ttl(window))
+        pipe.execute()
+        return
+
+    if not existing_only:
+        TrendingScore.objects.bulk_create([
+            TrendingScore(window=window, scope=scope, generation=generation, album_id=album_id)
+            for window, scope, generation in increments
+        ], ignore_conflicts=True)
+
+    # Every scope gets the same amount in a given chart generation, so one UPDATE covers them all
+    amounts = {(window, generation): amount for (window, _, generation), amount in increments.items()}
+    TrendingScore.objects.filter(
+        album_id=album_id,
+        scope__in={scope for _, scope, _ in increments},
+    ).filter(
+        reduce(or_, (Q(window=window, generation=generation) for window, generation in amounts))
+    ).update(score=F('score') + Case(
+        *[When(window=window, generation=generation, then=Value(amount)) for (window, generation), amount in amounts.items()],
+        default=Value(0.0),
+        output_field=FloatField(),
+    ))
+
+
+def _record_event(kind, review_id, when, withdraw=False):
+    try:
+        rows = list(Review.objects.filter(pk=review_id).values_list('album_id', 'user_genres'))
+        if not rows:
+            return
+        genre_ids = [genre_id for _, genre_id in rows if genre_id is not None]
+        if not withdraw:
+            _write_increments(rows[0][0], _increments(genre_ids, when, EVENT_WEIGHTS[kind]))
+            return
+        # Generations older than these are no longer served, so there's nothing to take back
+        now = timezone.now()
+        live = {window: _generation(window, now) - 1 for window in WINDOWS}
+        increments = _increments(genre_ids, when, -EVENT_WEIGHTS[kind], live)
+        if increments:
+            _write_increments(rows[0][0], increments, existing_only=True)
+    except Exception as e:
+        logger.warning(f"Could not record trending {kind} for review {review_id}: {e}")
+
+
+def record_trending_event(kind, review_id, when=None):
+    """
+    Count a new review, like or comment towards its album's charts once the
+    transaction commits, so the review's genres are in place; never fails the caller.
+    """
+    when = when or timezone.now()
+    transaction.on_commit(lambda: _record_event(kind, review_id, when))
+
+
+def withdraw_trending_event(kind, review_id, when):
+    """
+    Take an event recorded at when back out of its album's charts once the
+    transaction commits, e.g. when a like is removed; never fails the caller.
+    """
+    transaction.on_commit(lambda: _record_event(kind, review_id, when, withdraw=True))
+
+
+def _redis_page(redis, key, after, count):
+    if after is None:
+        ranked = redis.zrevrange(key, 0, count - 1, withscores=True)
+    else:
+        score, last_album_id = after
+        pipe = redis.pipeline()
+        # Albums tied with the previous page's last one, which Redis orders by member
+        pipe.zrangebyscore(key, score, score)
+        pipe.zrevrangebyscore(key, f'({score!r}', '-inf', start=0, num=count, withscores=True)
+        tied, lower = pipe.execute()
+        tied = sorted((member.decode('utf-8') for member in tied), reverse=True)
+        ranked = [(member, score) for member in tied if member < last_album_id] + lower
+    return [
+        (member.decode('utf-8') if isinstance(member, bytes) else member, float(score))
+        for member, score in ranked[:count]
+    ]
+
+
+def _db_page(window, scope, generation, after, count):
+    rows = TrendingScore.objects.filter(window=window, scope=scope, generation=generation)
+    if after is not None:
+        rows = rows.filter(keyset_filter(RANKING, after))
+    return [
+        (str(album_id), score)
+        for album_id, score in rows.order_by(*RANKING).values_list('album_id', 'score')[:count]
+    ]
+
+
+def trending_page(window='7d', genre_id=None, cursor=None, page_size=20):
+    """
+    One page of a chart as ([(album_id, score)], next_cursor), where score is the
+    decayed score as of now. A cursor stays on the chart generation it started
+    on, so paging isn't disturbed when a new generation takes over.
+    Raises ValueError for an unknown window or a cursor from another chart or generation.
+    """
+    if window not in WINDOWS:
+        raise ValueError(f"Unknown window, use one of: {', '.join(WINDOWS)}")
+    scope = genre_scope(genre_id) if genre_id else GLOBAL_SCOPE
+    now = timezone.now()
+
+    if cursor:
+        position = decode_cursor(cursor)
+        generation = position.get('generation')
+        after = position.get('after')
+        if (
+            position.get('window') != window or position.get('scope') != scope
+            # Only the current generation and the one it replaced are kept
+            or not isinstance(generation, int) or not 0 <= _generation(window, now) - generation <= 1
+        ):
+            raise ValueError('Invalid cursor')
+        score, album_id = clean_keyset_values(TrendingScore, RANKING, after)
+        after = [score, str(album_id)]
+    else:
+        generation = _generation(window, now)
+        after = None
+
+    redis = get_redis_client()
+    if redis is not None:
+        ranked = _redis_page(redis, _chart_key(window, scope, generation), after, page_size + 1)
+    else:
+        ranked = _db_page(window, scope, generation, after, page_size + 1)
+
+    next_cursor = None
+    if len(ranked) > page_size:
+        ranked = ranked[:page_size]
+        last_album_id, last_score = ranked[-1]
+        next_cursor = encode_cursor({
+            'window': window, 'scope': scope, 'generation': generation, 'after': [last_score, last_album_id],
+        })
+
+    growth = _growth(window, generation, now)
+    return [(album_id, score / growth) for album_id, score in ranked], next_cursor
+
+
+def _events_since(since):
+    """(kind, review_id, when) for every review, like and comment since a time"""
+    for review_id, when in Review.objects.filter(created_at__gte=since).values_list('id', 'created_at').iterator():
+        yield 'review', review_id, when
+    for review_id, when in ReviewLike.objects.filter(created_at__gte=since).values_list('review_id', 'created_at').iterator():
+        yield 'like', review_id, when
+    for review_id, when in Comment.objects.filter(created_at__gte=since).values_list('review_id', 'created_at').iterator():
+        yield 'comment', review_id, when
+
+
+def rebuild_trending_scores():
+    """
+    Recompute the current and next generation of every chart from the review,
+    like and comment tables, replacing what's stored. Returns the number of charts written.
+    """
+    now = timezone.now()
+    current = {window: _generation(window, now) for window in WINDOWS}
+    # The current generation holds activity since the previous one began
+    since = min(
+        datetime.fromtimestamp((current[window] - 1) * length.total_seconds(), tz=dt_timezone.utc)
+        for window, length in WINDOWS.items()
+    )
+
+    events = list(_events_since(since))
+    review_ids = list({review_id for _, review_id, _ in events})
+    albums = {}
+    genres = defaultdict(list)
+    for start in range(0, len(review_ids), 1000):
+        for review_id, album_id, genre_id in Review.objects.filter(
+            pk__in=review_ids[start:start + 1000]
+        ).values_list('id', 'album_id', 'user_genres'):
+            albums[review_id] = album_id
+            if genre_id is not None:
+                genres[review_id].append(genre_id)
+
+    charts = defaultdict(lambda: defaultdict(float))
+    for kind, review_id, when in events:
+        if review_id not in albums:
+            continue
+        for chart, amount in _increments(genres[review_id], when, EVENT_WEIGHTS[kind], current).items():
+            charts[chart][str(albums[review_id])] += amount
+
+    redis = get_redis_client()
+    if redis is not None:
+        pipe = redis.pipeline()
+        for window, generation in {(window, generation) for window in WINDOWS for generation in (current[window], current[window] + 1)}:
+            for key in redis.scan_iter(match=_chart_key(window, '*', generation)):
+                pipe.delete(key)
+        for (window, scope, generation), scores in charts.items():
+            key = _chart_key(window, scope, generation)
+            pipe.zadd(key, scores)
+            pipe.expire(key, _chart_ttl(window))
+        pipe.execute()
+        return len(charts)
+
+    with transaction.atomic():
+        TrendingScore.objects.filter(
+            reduce(or_, (Q(window=window, generation__gte=current[window]) for window in WINDOWS))
+        ).delete()
+        TrendingScore.objects.bulk_create([
+            TrendingScore(window=window, scope=scope, generation=generation, album_id=album_id, score=score)
+            for (window, scope, generation), scores in charts.items()
+            for album_id, score in scores.items()
+        ], batch_size=1000)
+    prune_trending_scores()
+    return len(charts)
+
+
+def prune_trending_scores():
+    """Delete stored generations that no longer serve any chart (Redis expires its own)"""
+    now = timezone.now()
+    # Cursors may still be reading the generation just replaced
+    deleted, _ = TrendingScore.objects.filter(
+        reduce(or_, (Q(window=window, generation__lt=_generation(window, now) - 1) for window in WINDOWS))
+    ).delete()
+    return deleted
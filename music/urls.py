@@ -9,13 +9,17 @@ from . import views
 urlpatterns = [
     # Search and discovery
     path('search/', views.search, name='search'),
+    path('search/suggest/', views.search_suggest, name='search-suggest'),
     path('genres/', views.genres, name='genres'),
+    path('trending/', views.trending, name='trending'),
     
     # Albums and reviews
     path('albums/<str:discogs_id>/', views.album_detail, name='album-detail'),
     path('albums/<str:discogs_id>/review/', views.create_review, name='create-review'),
+    path('albums/<str:discogs_id>/reviews/', views.album_reviews, name='album-reviews'),
     
     # Review management
+    path('reviews/import/', views.import_reviews, name='import-reviews'),
     path('reviews/<int:review_id>/', views.review_detail, name='review-detail'),
     path('reviews/<int:review_id>/like/', views.toggle_review_like, name='toggle-review-like'),
     path('reviews/<int:review_id>/likes/', views.review_likes, name='review-likes'),
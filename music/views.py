@@ -4,234 +4,884 @@ Optimized views for music search, reviews, and social features with performance
 """
 
 import re
+import json
 import logging
+import threading
+import zlib
 import requests
+from concurrent.futures import ThreadPoolExecutor, wait
+from django.db import connections, transaction
 from django.conf import settings
-from django.db.models import Avg
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db.models import Count, F, FloatField, Q
+from django.db.models.functions import Cast, Greatest, Ln
 from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_vary_headers
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 
-from .models import Album, Review, Genre, Activity, ReviewLike, Comment, List, ListItem, ListLike
+from .models import COVER_CARD, Album, Review, Genre, Activity, ReviewLike, Comment, List, ListItem, ListLike
 from .serializers import (
     AlbumSerializer, ReviewSerializer, AlbumSearchResultSerializer, 
     ActivitySerializer, CommentSerializer, GenreSerializer, 
     ListSerializer, ListSummarySerializer, ListItemSerializer
 )
 from accounts.serializers import UserSerializer
-from .services import ExternalMusicService
+from .services import (
+    ExternalMusicService, DiscogsUnavailable, get_discogs_client, get_artist_photo, get_known_album_id,
+    get_known_artist_photos, resolve_album_id
+)
+from .cache_utils import (
+    cache_key_for_artist_photo, cache_key_for_search_results, flight_lock_key, single_flight, stale_cache_key,
+)
+from .artist_photos import queue_artist_photos
+from .covers import schedule_cover_variants
+from .genres import add_review_genres, set_review_genres
+from .likes import like_count, like_review, unlike_review
+from .pagination import clean_keyset_values, decode_cursor, encode_cursor, get_page_size, keyset_filter, keyset_values
+from .personalization import (
+    liked_review_ids, personalize_activities, personalize_list, personalize_review, personalize_reviews,
+)
+from .query_log import record_search_query
+from .rating_import import SCALES, detect_format, import_ratings
+from .suggest import get_suggest_index
+from .text_utils import normalize_search_query
+from .trending import WINDOWS as TRENDING_WINDOWS, trending_page
 
 logger = logging.getLogger(__name__)
 
+DISCOGS_UNAVAILABLE_ERROR = 'Music catalog is temporarily unavailable, please try again shortly'
+SEARCH_CACHE_TIMEOUT = 900
+ALBUM_CACHE_TIMEOUT = 300
+# How long one request may fetch an album from Discogs before others stop waiting for it
+ALBUM_LOCK_TIMEOUT = 15
+
+# Discogs calls an uncached album page can cost: master, release, artist search and artist
+ALBUM_PREFETCH_DISCOGS_CALLS = 4
+
+# Bounded pool shared by every request in this worker for artist photo lookups
+_photo_executor = ThreadPoolExecutor(
+    max_workers=settings.ARTIST_PHOTO_WORKERS,
+    thread_name_prefix='artist-photo',
+)
+_photo_lookups = {}
+_photo_lookups_lock = threading.Lock()
+
+# Separate small pool for warming album pages, so it never delays photo lookups
+_prefetch_executor = ThreadPoolExecutor(
+    max_workers=settings.ALBUM_PREFETCH_WORKERS,
+    thread_name_prefix='album-prefetch',
+)
+_prefetch_pending = set()
+_prefetch_lock = threading.Lock()
+
 
 # ============================================================================
 # SEARCH VIEWS
 # ============================================================================
 
-def search_discogs(query):
-    """Search Discogs API for albums"""
-    response = requests.get(
-        f"{settings.DISCOGS_API_URL}/database/search",
-        params={
-            "q": query,
-            "type": "master",
-            "per_page": 25,
-            "key": settings.DISCOGS_CONSUMER_KEY,
-            "secret": settings.DISCOGS_CONSUMER_SECRET
-        },
-        headers={'User-Agent': 'HalfnoteApp/1.0'},
-        timeout=(2, 10)
-    )
-
-    if not response.ok:
-        logger.error(f"Discogs API error: {response.status_code}")
-        return []
+def search_discogs(query, page=1, per_page=25):
+    """Search Discogs API for albums; returns one page of results and whether more follow"""
+    params = {"type": "master", "per_page": per_page, "page": page}
+    if ' - ' in query:
+        # Canonical "artist - title" queries map onto Discogs' field filters
+        params["artist"], params["release_title"] = query.split(' - ', 1)
+    else:
+        params["q"] = query
+    
+    try:
+        data = get_discogs_client().get("database/search", params=params)
+    except requests.HTTPError as e:
+        logger.error(f"Discogs API error: {e.response.status_code}")
+        return [], False
 
-    return response.json().get('results', [])
+    pagination = data.get('pagination', {})
+    return data.get('results', []), pagination.get('page', page) < pagination.get('pages', 0)
 
 
-def get_artist_photo(artist_name):
-    """Fetch artist photo from Discogs API"""
+def _lookup_artist_photo(artist_name):
+    """Pool task: fetch an artist photo and cache it for later requests"""
     try:
-        response = requests.get(
-            f"{settings.DISCOGS_API_URL}/database/search",
-            params={
-                "q": artist_name,
-                "type": "artist",
-                "per_page": 1,
-                "key": settings.DISCOGS_CONSUMER_KEY,
-                "secret": settings.DISCOGS_CONSUMER_SECRET
-            },
-            headers={'User-Agent': 'HalfnoteApp/1.0'},
-            timeout=(2, 5)
-        )
-        if not response.ok:
-            return None
+        photo_url = get_artist_photo(artist_name)
+        # An empty string remembers "no photo" so cached searches don't look again
+        cache.set(cache_key_for_artist_photo(artist_name), photo_url or '', 86400)
+        return photo_url
+    finally:
+        # Pool threads live outside the request cycle, so release any DB connection used by the cache
+        connections.close_all()
+        with _photo_lookups_lock:
+            _photo_lookups.pop(artist_name, None)
 
-        results = response.json().get('results', [])
-        if not results:
-            return None
-            
-        # Details of first artist result
-        artist_id = results[0].get('id')
-        if not artist_id:
-            return None
 
-        detail_response = requests.get(
-            f"{settings.DISCOGS_API_URL}/artists/{artist_id}",
-            params={
-                "key": settings.DISCOGS_CONSUMER_KEY,
-                "secret": settings.DISCOGS_CONSUMER_SECRET
-            },
-            headers={'User-Agent': 'HalfnoteApp/1.0'},
-            timeout=(2, 5)
-        )
-        
-        if detail_response.ok:
-            artist_data = detail_response.json()
-            images = artist_data.get('images', [])
-            if images:
-                return images[0].get('uri')
-                
-    except Exception as e:
-        logger.error(f"Error fetching artist photo for {artist_name}: {e}")
-        
-    return None
+def _submit_photo_lookup(artist_name):
+    """Start (or join) the in-flight lookup for an artist"""
+    with _photo_lookups_lock:
+        future = _photo_lookups.get(artist_name)
+        if future is None:
+            future = _photo_executor.submit(_lookup_artist_photo, artist_name)
+            _photo_lookups[artist_name] = future
+        return future
+
+
+def enrich_artist_photos(results, limit=10, timeout=None):
+    """
+    Fill in artist_photo_url for the first `limit` results.
+
+    Photos already known from the cache or the Artist table are applied
+    straight away; the rest are fetched concurrently and whatever hasn't
+    arrived by the deadline stays None. Late lookups keep running and land in
+    the cache, so a later request picks them up.
+    """
+    if timeout is None:
+        timeout = settings.ARTIST_PHOTO_DEADLINE
+
+    artists = []
+    for result in results[:limit]:
+        artist = result.get('artist')
+        if not result.get('artist_photo_url') and artist and artist != 'Various Artists' and artist not in artists:
+            artists.append(artist)
+    if not artists:
+        return results
+
+    photos = {}
+    cached = cache.get_many([cache_key_for_artist_photo(artist) for artist in artists])
+    for artist in artists:
+        photo_url = cached.get(cache_key_for_artist_photo(artist))
+        if photo_url is not None:
+            photos[artist] = photo_url or None
+
+    unresolved = [artist for artist in artists if artist not in photos]
+    if unresolved:
+        photos.update(get_known_artist_photos(unresolved))
+
+    futures = {
+        artist: _submit_photo_lookup(artist)
+        for artist in unresolved if artist not in photos
+    }
+
+    if futures:
+        done, _ = wait(futures.values(), timeout=timeout)
+        for artist, future in futures.items():
+            if future in done and not future.exception():
+                photos[artist] = future.result()
+
+    for result in results[:limit]:
+        if not result.get('artist_photo_url'):
+            result['artist_photo_url'] = photos.get(result.get('artist'))
+    return results
+
+
+def format_discogs_result(result):
+    """Shape a raw Discogs search hit like our search results"""
+    title = result.get('title', '')
+    artist = 'Various Artists'
+    album_title = title
+    
+    # Parse artist and title from Discogs format
+    if ' - ' in title:
+        parts = title.split(' - ', 1)
+        if len(parts) == 2 and len(parts[0].strip()) < 100:
+            # Clean up disambiguation numbers
+            clean_artist = re.sub(r'\s*\(\d+\)$', '', parts[0].strip())
+            artist = clean_artist or parts[0].strip()
+            album_title = parts[1].strip()
+    
+    return {
+        'id': result.get('id'),
+        'title': album_title,
+        'artist': artist,
+        'year': result.get('year'),
+        'genre': result.get('genre', []),
+        'style': result.get('style', []),
+        'cover_image': result.get('cover_image', ''),
+        'artist_photo_url': None,
+        'thumb': result.get('thumb', ''),
+    }
+
+
+def format_local_result(album):
+    """Shape an imported Album like a Discogs search result"""
+    return {
+        'id': int(album.discogs_id) if album.discogs_id.isdigit() else album.discogs_id,
+        'title': album.title,
+        'artist': album.artist,
+        'year': album.year,
+        'genre': album.discogs_genres,
+        'style': album.discogs_styles,
+        'cover_image': album.cover_url or '',
+        'artist_photo_url': album.artist_photo_url,
+        'thumb': album.cover_url_for(COVER_CARD) or '',
+    }
+
+
+def local_search_match(query):
+    """Catalog filter and similarity expression for a normalized query"""
+    if ' - ' in query:
+        artist, title = (part.strip() for part in query.split(' - ', 1))
+        match = Q(artist__trigram_word_similar=artist) & Q(title__trigram_word_similar=title)
+        similarity = (TrigramWordSimilarity(artist, 'artist') + TrigramWordSimilarity(title, 'title')) / 2
+    else:
+        match = Q(title__trigram_word_similar=query) | Q(artist__trigram_word_similar=query)
+        similarity = Greatest(TrigramWordSimilarity(query, 'title'), TrigramWordSimilarity(query, 'artist'))
+    return match, similarity
+
+
+def search_local_albums(query, limit=10, offset=0):
+    """
+    Search the imported catalog using the trigram indexes on title and artist.
+    Hits are ranked by text match, boosted by how much the album has been reviewed.
+    """
+    match, similarity = local_search_match(query)
+    
+    albums = Album.objects.filter(match).only(
+        'discogs_id', 'title', 'artist', 'year', 'discogs_genres', 'discogs_styles', 'cover_url', 'cover_variants',
+        'artist_photo_url'
+    ).annotate(
+        similarity=similarity,
+        review_total=Count('reviews'),
+    ).annotate(
+        rank=F('similarity') + settings.LOCAL_SEARCH_POPULARITY_WEIGHT * Ln(Cast('review_total', FloatField()) + 1.0)
+    ).order_by('-rank', 'id')[offset:offset + limit]
+    
+    return [format_local_result(album) for album in albums]
+
+
+def exclude_local_matches(query, discogs_results):
+    """Drop Discogs hits that the catalog pages for this query already return"""
+    ids = [str(result.get('id')) for result in discogs_results]
+    match, _ = local_search_match(query)
+    local_ids = set(Album.objects.filter(match, discogs_id__in=ids).values_list('discogs_id', flat=True))
+    return [result for result in discogs_results if str(result.get('id')) not in local_ids]
+
+
+def merge_search_results(local_results, discogs_results):
+    """Local hits first, then Discogs hits that aren't already in the catalog"""
+    seen = {str(result['id']) for result in local_results}
+    merged = list(local_results)
+    for result in discogs_results:
+        if str(result.get('id')) not in seen:
+            seen.add(str(result.get('id')))
+            merged.append(result)
+    return merged
+
+
+def parse_search_cursor(cursor):
+    """Position of a search page: {'local': offset} in the catalog or {'discogs': page}"""
+    if not cursor:
+        return {'local': 0}
+    position = decode_cursor(cursor)
+    if 'local' in position and isinstance(position['local'], int) and position['local'] >= 0:
+        return {'local': position['local']}
+    if 'discogs' in position and isinstance(position['discogs'], int) and position['discogs'] >= 1:
+        return {'discogs': position['discogs']}
+    raise ValueError('Invalid cursor')
+
+
+def build_search_page(query, position, page_size):
+    """
+    One page of results with artist photos filled in, plus the cursor for the next page.
+    Catalog matches are paged first. Discogs pages follow once they run out, or top up
+    the first page when the catalog has too few matches. If Discogs is unavailable for
+    a top-up, the catalog matches are returned alone and the page is marked degraded.
+    """
+    results = []
+    next_position = None
+    degraded = False
+    fetch_discogs = 'discogs' in position
+    
+    if 'local' in position:
+        offset = position['local']
+        local_results = search_local_albums(query, limit=page_size + 1, offset=offset)
+        results = local_results[:page_size]
+        if len(local_results) > page_size:
+            next_position = {'local': offset + page_size}
+        elif offset == 0 and len(results) >= settings.LOCAL_SEARCH_MIN_RESULTS:
+            # Enough catalog matches: only go to Discogs if the user asks for more
+            next_position = {'discogs': 1}
+        else:
+            fetch_discogs = True
+    
+    if fetch_discogs:
+        discogs_page = position.get('discogs', 1)
+        try:
+            discogs_results, has_more = search_discogs(query, page=discogs_page, per_page=page_size)
+        except (DiscogsUnavailable, requests.RequestException):
+            if not results:
+                raise
+            # Show what the catalog has; the next page tries Discogs again
+            degraded = True
+            next_position = {'discogs': discogs_page}
+        else:
+            discogs_results = exclude_local_matches(query, [format_discogs_result(result) for result in discogs_results])
+            results = merge_search_results(results, discogs_results)
+            next_position = {'discogs': discogs_page + 1} if has_more else None
+    
+    page = {
+        # Fetch artist photos for first 10 results only (to avoid too many API calls)
+        'results': enrich_artist_photos(results, limit=10),
+        'next_cursor': encode_cursor(next_position) if next_position else None,
+    }
+    if degraded:
+        page['degraded'] = True
+    return page
+
+
+def search_page_cache_key(query, position, page_size):
+    return cache_key_for_search_results(query, page_size, encode_cursor(position))
+
+
+def refresh_search_cache(query):
+    """Rebuild and cache the first page for a normalized query, e.g. when prewarming popular searches"""
+    position = {'local': 0}
+    cache_key = search_page_cache_key(query, position, settings.SEARCH_PAGE_SIZE)
+    page = build_search_page(query, position, settings.SEARCH_PAGE_SIZE)
+    if not page.get('degraded'):
+        cache.set(cache_key, page, SEARCH_CACHE_TIMEOUT)
+        cache.set(stale_cache_key(cache_key), page, 86400)
+    return page
 
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def search(request):
-    """Search for albums using Discogs API"""
-    query = request.GET.get('q')
+    """Search for albums in the local catalog, falling back to Discogs, one page at a time"""
+    # Equivalent spellings of a query ("Björk", " bjork ") share one cache entry
+    query = normalize_search_query(request.GET.get('q'))
     if not query:
         return Response({'error': 'Query parameter required'}, status=400)
     
-    # Check cache first
-    cache_key = f'search_{query}'
-    cached_results = cache.get(cache_key)
-    if cached_results:
-        return Response({'results': cached_results, 'cached': True})
+    try:
+        position = parse_search_cursor(request.GET.get('cursor'))
+        page_size = get_page_size(request, settings.SEARCH_PAGE_SIZE, settings.SEARCH_MAX_PAGE_SIZE)
+    except ValueError:
+        return Response({'error': 'Invalid cursor or page_size'}, status=400)
+    
+    first_page = not request.GET.get('cursor')
+    if first_page:
+        record_search_query(query)
+    
+    # Check cache first; every page is cached on its own
+    cache_key = search_page_cache_key(query, position, page_size)
+    cached_page = cache.get(cache_key)
+    if cached_page:
+        # Pick up photos that missed the deadline when this entry was cached
+        enrich_artist_photos(cached_page['results'], timeout=0)
+        if first_page:
+            prefetch_album_details(cached_page['results'])
+        return Response({**cached_page, 'cached': True})
+    
+    degraded = {}
+    
+    def build_page():
+        page = build_search_page(query, position, page_size)
+        if page.get('degraded'):
+            # Not cached, so the full results come back as soon as Discogs does
+            degraded['page'] = page
+            return None
+        return page
     
     try:
-        results = search_discogs(query)
-        processed_results = []
+        # Concurrent misses for the same page share one upstream fetch (cached for 15 minutes)
+        page, stale = single_flight(cache_key, build_page, timeout=SEARCH_CACHE_TIMEOUT)
         
-        for i, result in enumerate(results):
-            title = result.get('title', '')
-            artist = 'Various Artists'
-            album_title = title
-            
-            # Parse artist and title from Discogs format
-            if ' - ' in title:
-                parts = title.split(' - ', 1)
-                if len(parts) == 2 and len(parts[0].strip()) < 100:
-                    # Clean up disambiguation numbers
-                    clean_artist = re.sub(r'\s*\(\d+\)$', '', parts[0].strip())
-                    artist = clean_artist or parts[0].strip()
-                    album_title = parts[1].strip()
-            
-            # Fetch artist photo for first 10 results only (to avoid too many API calls)
-            artist_photo_url = None
-            if i < 10 and artist != 'Various Artists':
-                artist_photo_url = get_artist_photo(artist)
-            
-            processed_results.append({
-                'id': result.get('id'),
-                'title': album_title,
-                'artist': artist,
-                'year': result.get('year'),
-                'genre': result.get('genre', []),
-                'style': result.get('style', []),
-                'cover_image': result.get('cover_image', ''),
-                'artist_photo_url': artist_photo_url,
-                'thumb': result.get('thumb', ''),
-            })
-        
-        # Cache for 15 minutes
-        cache.set(cache_key, processed_results, 900)
-        
-        return Response({'results': processed_results, 'cached': False})
+        if page is None:
+            # Discogs is down: the last full results beat catalog matches alone
+            stale_page = cache.get(stale_cache_key(cache_key))
+            if stale_page is not None:
+                return Response({**stale_page, 'cached': True, 'stale': True})
+            return Response({**degraded['page'], 'cached': False})
+        
+        if first_page and not stale:
+            prefetch_album_details(page['results'])
+        
+        response_data = {**page, 'cached': False}
+        if stale:
+            response_data['stale'] = True
+        return Response(response_data)
         
+    except (DiscogsUnavailable, requests.RequestException):
+        # Degraded mode: last known results, or fail fast
+        stale_page = cache.get(stale_cache_key(cache_key))
+        if stale_page is not None:
+            return Response({**stale_page, 'cached': True, 'stale': True})
+        return Response({'error': DISCOGS_UNAVAILABLE_ERROR}, status=503)
     except Exception as e:
         logger.error(f"Search failed: {e}")
         return Response({'error': 'Search failed'}, status=500)
 
 
+@api_view(['GET'])
+@authentication_classes([])  # Skip the JWT user lookup: suggestions never touch the database
+@permission_classes([AllowAny])
+def search_suggest(request):
+    """Typeahead suggestions for albums and artists from the memory-mapped index"""
+    query = request.GET.get('q', '')
+    try:
+        limit = max(1, min(int(request.GET.get('limit', 10)), 20))
+    except ValueError:
+        limit = 10
+    
+    index = get_suggest_index()
+    if index is None:
+        return Response({'suggestions': []})
+    
+    return Response({'suggestions': index.lookup(query, limit)})
+
+
 # ============================================================================
 # ALBUM VIEWS
 # ============================================================================
 
-@api_view(['GET'])
-@permission_classes([AllowAny])
-def album_detail(request, discogs_id):
-    """Get album details with reviews"""
-    # Check cache
-    cache_key = f'album_{discogs_id}'
-    cached_data = cache.get(cache_key)
-    if cached_data:
-        return Response({**cached_data, 'cached': True})
+EMPTY_ALBUM_STATS = {'review_count': 0, 'average_rating': None, 'rating_histogram': [0] * 10}
+
+
+def album_stats_fields(album):
+    """Review count, average and rating histogram from the album's AlbumStats row"""
+    stats = getattr(album, 'stats', None)
+    if stats is None:
+        return dict(EMPTY_ALBUM_STATS)
+    return {
+        'review_count': stats.review_count,
+        'average_rating': stats.average_rating,
+        'rating_histogram': stats.histogram,
+    }
+
+
+# Keyset ordering per album review sort; the last column is unique
+ALBUM_REVIEW_SORTS = {
+    'newest': ['-created_at', '-id'],
+    'most_liked': ['-likes_count', '-created_at', '-id'],
+    'highest': ['-rating', '-created_at', '-id'],
+    'lowest': ['rating', '-created_at', '-id'],
+    'following': ['-created_at', '-id'],
+}
+
+
+def album_review_phases(album, sort, user):
+    """
+    Querysets a sort walks through in turn. Followed-users-first is two newest-first
+    passes, people the viewer follows and then everyone else.
+    """
+    reviews = Review.objects.filter(album=album).select_related('user', 'album').prefetch_related('user_genres')
+    if sort == 'following' and user is not None and user.is_authenticated:
+        following = user.following.values('id')
+        return [reviews.filter(user__in=following), reviews.exclude(user__in=following)]
+    return [reviews]
+
+
+def album_reviews_page(album, request, sort='newest', cursor=None, page_size=None):
+    """
+    One page of an album's reviews: {'reviews', 'sort', 'next_cursor'}.
+    Raises ValueError for an unknown sort or a cursor that isn't from this sort.
+    """
+    if sort not in ALBUM_REVIEW_SORTS:
+        raise ValueError(f'Unknown sort: {sort}')
+    ordering = ALBUM_REVIEW_SORTS[sort]
+    page_size = page_size or settings.ALBUM_REVIEWS_PAGE_SIZE
+    user = getattr(request, 'user', None)
+    phases = album_review_phases(album, sort, user)
+    
+    phase, after = 0, None
+    if cursor:
+        position = decode_cursor(cursor)
+        phase, after = position.get('phase', 0), position.get('after')
+        if position.get('sort') != sort or not isinstance(phase, int) or not 0 <= phase < len(phases):
+            raise ValueError('Invalid cursor')
+        if after is not None:
+            after = clean_keyset_values(Review, ordering, after)
+    
+    # Fetch one extra row to know whether another page follows
+    reviews = []
+    next_position = None
+    while phase < len(phases):
+        queryset = phases[phase].order_by(*ordering)
+        if after is not None:
+            queryset = queryset.filter(keyset_filter(ordering, after))
+        wanted = page_size - len(reviews)
+        rows = list(queryset[:wanted + 1])
+        reviews.extend(rows[:wanted])
+        if len(reviews) >= page_size:
+            # A later phase may still have rows even when this one is used up
+            if len(rows) > wanted or phase + 1 < len(phases):
+                next_position = {'sort': sort, 'phase': phase, 'after': keyset_values(reviews[-1], ordering)}
+            break
+        phase, after = phase + 1, None
+    
+    context = {'request': request, 'liked_review_ids': liked_review_ids(user, [review.id for review in reviews])}
+    return {
+        'reviews': ReviewSerializer(reviews, many=True, context=context).data,
+        'sort': sort,
+        'next_cursor': encode_cursor(next_position) if next_position else None,
+    }
+
+
+def local_album_payload(album):
+    """Album details with the first page of reviews for an album in the database (loaded with select_related('stats'))"""
+    # Shared by every viewer; personalize_album_payload adds their flags
+    reviews_page = album_reviews_page(album, None)
     
+    return {
+        'album': AlbumSerializer(album).data,
+        'reviews': reviews_page['reviews'],
+        'reviews_next_cursor': reviews_page['next_cursor'],
+        **album_stats_fields(album),
+        'exists_in_db': True,
+        'cached': False
+    }
+
+
+def fill_album_artist_photo(album):
+    """
+    Fill a missing artist photo for an album in the database from photos already known,
+    or queue the Discogs lookup for the backfill worker. Never calls Discogs itself.
+    """
+    if not album.artist_photo_url and album.artist != 'Various Artists':
+        known = get_known_artist_photos([album.artist])
+        if album.artist not in known:
+            queue_artist_photos([album.artist])
+        elif known[album.artist]:
+            album.artist_photo_url = known[album.artist]
+            Album.objects.filter(pk=album.pk).update(artist_photo_url=album.artist_photo_url)
+    return album.artist_photo_url
+
+
+def build_album_payload(discogs_id, kind=''):
+    """Album details with reviews for a canonical ID, from the database or Discogs; None if not found"""
     # Check if album exists in database
-    album = Album.objects.filter(discogs_id=discogs_id).first()
+    album = Album.objects.select_related('stats').filter(discogs_id=discogs_id).first()
     
     if album:
-        # Check if album has artist photo, if not fetch it
-        if not album.artist_photo_url and album.artist != 'Various Artists':
-            artist_photo_url = get_artist_photo(album.artist)
-            if artist_photo_url:
-                album.artist_photo_url = artist_photo_url
-                album.save()
-        
-        # Get reviews for existing album
-        reviews = Review.objects.filter(album=album).select_related('user').order_by('-created_at')
-        
-        response_data = {
-            'album': AlbumSerializer(album).data,
-            'reviews': ReviewSerializer(reviews, many=True, context={'request': request}).data,
-            'review_count': reviews.count(),
-            'average_rating': reviews.aggregate(Avg('rating'))['rating__avg'],
-            'exists_in_db': True,
-            'cached': False
-        }
-    else:
-        # Fetch from Discogs
-        service = ExternalMusicService()
-        album_data = service.get_album_details(discogs_id)
+        # Use a known artist photo, or queue the lookup
+        fill_album_artist_photo(album)
+        schedule_cover_variants(album)
+        return local_album_payload(album)
+    
+    # Fetch from Discogs
+    service = ExternalMusicService()
+    album_data = service.get_album_details(discogs_id, kind or None)
+    
+    if not album_data:
+        return None
+    
+    # Fetch artist photo for new albums too
+    if album_data.get('artist') and album_data.get('artist') != 'Various Artists':
+        artist_photo_url = get_artist_photo(album_data['artist'])
+        if artist_photo_url:
+            album_data['artist_photo_url'] = artist_photo_url
+    
+    return {
+        'album': album_data,
+        'reviews': [],
+        **EMPTY_ALBUM_STATS,
+        'exists_in_db': False,
+        'cached': False
+    }
+
+
+def load_album_payload(discogs_id):
+    """
+    Album page for an album URL ID, resolving it to the canonical ID first; None if not found.
+    A page already cached or being built under the canonical ID is shared.
+    """
+    try:
+        resolved = resolve_album_id(discogs_id)
+    except DiscogsUnavailable:
+        resolved = (discogs_id, '')
+    if resolved is None:
+        return None
+    canonical_id, kind = resolved
+    if canonical_id == discogs_id:
+        return build_album_payload(canonical_id, kind)
+    payload, _ = single_flight(
+        f'album_{canonical_id}', lambda: build_album_payload(canonical_id, kind),
+        timeout=ALBUM_CACHE_TIMEOUT, lock_timeout=ALBUM_LOCK_TIMEOUT,
+    )
+    return payload
+
+
+def _ndjson_line(event, data):
+    return json.dumps({'event': event, 'data': data}, cls=DjangoJSONEncoder) + '\n'
+
+
+def _gzip_lines(lines):
+    """Gzip a stream of lines, flushing after each one so it reaches the client without waiting for the next"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for line in lines:
+        yield compressor.compress(line.encode('utf-8')) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+def personalize_album_payload(payload, user):
+    """A cached album page with the viewer's likes filled in"""
+    return {**payload, 'reviews': personalize_reviews(payload.get('reviews') or [], user)}
+
+
+def _album_payload_events(payload, user):
+    """A complete album page as 'reviews' and 'album' events"""
+    payload = personalize_album_payload(payload, user)
+    yield 'reviews', {key: value for key, value in payload.items() if key not in ('album', 'cached')}
+    yield 'album', payload['album']
+
+
+def iter_album_events(discogs_id, request):
+    """
+    Album page stages for the NDJSON mode of album_detail, as (event, data) pairs.
+    'reviews' carries the reviews and aggregates; 'album', 'tracks' and 'artist_photo'
+    each carry album fields to merge, sent as soon as the database, cache or the
+    Discogs call behind them answers. 'done' ends a successful stream.
+    Cached and catalog albums arrive whole, without an 'artist_photo' event: a
+    missing photo is queued (see fill_album_artist_photo) and shows on a later load.
+    Albums fetched from Discogs take the same lock as album_detail, so only one
+    request streams each album from Discogs; the others wait for its page.
+    """
+    canonical_id = get_known_album_id(discogs_id)
+    cached_data = cache.get(f'album_{canonical_id}')
+    if cached_data:
+        yield from _album_payload_events(cached_data, request.user)
+        yield 'done', {'cached': True}
+        return
+    
+    album = Album.objects.select_related('stats').filter(discogs_id=canonical_id).first()
+    if album is None:
+        # Nothing local to show yet except the (empty) reviews; the client can render the page shell
+        yield 'reviews', {'reviews': [], **EMPTY_ALBUM_STATS, 'exists_in_db': False}
         
+        cache_key = f'album_{canonical_id}'
+        lock_key = flight_lock_key(cache_key)
+        if not cache.add(lock_key, 1, ALBUM_LOCK_TIMEOUT):
+            # Another request is fetching this album: wait for its page rather than call Discogs too
+            payload, _ = single_flight(
+                cache_key, lambda: load_album_payload(canonical_id),
+                timeout=ALBUM_CACHE_TIMEOUT, lock_timeout=ALBUM_LOCK_TIMEOUT,
+            )
+            if payload is None:
+                yield 'error', {'error': 'Album not found', 'status': 404}
+                return
+            yield from _album_payload_events(payload, request.user)
+            yield 'done', {'cached': True}
+            return
+        try:
+            yield from _iter_uncached_album_events(discogs_id, canonical_id, request)
+        finally:
+            cache.delete(lock_key)
+        return
+    
+    # Only known photos are used here, so this never waits on Discogs
+    fill_album_artist_photo(album)
+    payload = local_album_payload(album)
+    yield from _album_payload_events(payload, request.user)
+    schedule_cover_variants(album)
+    _cache_album_payload(canonical_id, payload)
+    yield 'done', {'cached': False}
+
+
+def _cache_album_payload(canonical_id, payload):
+    # Cached exactly as the regular mode would have cached it
+    cache.set(f'album_{canonical_id}', payload, ALBUM_CACHE_TIMEOUT)
+    cache.set(stale_cache_key(f'album_{canonical_id}'), payload, 86400)
+
+
+def _iter_uncached_album_events(discogs_id, canonical_id, request):
+    """Stages of an album neither cached nor in the catalog under its known ID; run by the lock holder"""
+    resolved = resolve_album_id(discogs_id)
+    if resolved is None:
+        yield 'error', {'error': 'Album not found', 'status': 404}
+        return
+    album = None
+    if resolved[0] != canonical_id:
+        canonical_id = resolved[0]
+        cached_data = cache.get(f'album_{canonical_id}')
+        if cached_data:
+            yield from _album_payload_events(cached_data, request.user)
+            yield 'done', {'cached': True}
+            return
+        album = Album.objects.select_related('stats').filter(discogs_id=canonical_id).first()
+    kind = resolved[1]
+    
+    if album:
+        # Only known photos are used here, so this never waits on Discogs
+        fill_album_artist_photo(album)
+        payload = local_album_payload(album)
+        yield from _album_payload_events(payload, request.user)
+        schedule_cover_variants(album)
+    else:
+        album_data = {}
+        for stage, data in ExternalMusicService().iter_album_details(canonical_id, kind or None):
+            album_data.update(data)
+            yield stage, data
         if not album_data:
-            return Response({'error': 'Album not found'}, status=404)
+            yield 'error', {'error': 'Album not found', 'status': 404}
+            return
         
-        # Fetch artist photo for new albums too
-        if album_data.get('artist') and album_data.get('artist') != 'Various Artists':
+        if album_data.get('artist') and album_data['artist'] != 'Various Artists':
             artist_photo_url = get_artist_photo(album_data['artist'])
             if artist_photo_url:
                 album_data['artist_photo_url'] = artist_photo_url
+            yield 'artist_photo', {'artist_photo_url': artist_photo_url}
         
-        response_data = {
+        payload = {
             'album': album_data,
             'reviews': [],
-            'review_count': 0,
-            'average_rating': None,
+            **EMPTY_ALBUM_STATS,
             'exists_in_db': False,
             'cached': False
         }
-        
-    # Cache for 5 minutes
-    cache.set(cache_key, response_data, 300)
+    
+    _cache_album_payload(canonical_id, payload)
+    yield 'done', {'cached': False}
+
+
+def stream_album_detail(discogs_id, request):
+    """NDJSON lines for iter_album_events, turning upstream failures into a final 'error' line"""
+    try:
+        for event, data in iter_album_events(discogs_id, request):
+            yield _ndjson_line(event, data)
+    except (DiscogsUnavailable, requests.RequestException):
+        # Degraded mode: last known payload (which replaces anything sent so far), or fail
+        stale_data = cache.get(stale_cache_key(f'album_{get_known_album_id(discogs_id)}'))
+        if stale_data is not None:
+            for event, data in _album_payload_events(stale_data, request.user):
+                yield _ndjson_line(event, data)
+            yield _ndjson_line('done', {'cached': True, 'stale': True})
+        else:
+            yield _ndjson_line('error', {'error': DISCOGS_UNAVAILABLE_ERROR, 'status': 503})
+    except Exception as e:
+        logger.error(f"Album stream failed for {discogs_id}: {e}")
+        yield _ndjson_line('error', {'error': 'Failed to load album', 'status': 500})
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def album_detail(request, discogs_id):
+    """Get album details with reviews (?stream=1 for progressive NDJSON)"""
+    if request.GET.get('stream') in ('1', 'true'):
+        lines = stream_album_detail(discogs_id, request)
+        # GZipMiddleware would hold back every line until the stream ends, so compress here,
+        # flushing per line; the Content-Encoding header makes the middleware leave it alone
+        gzipped = re.search(r'\bgzip\b', request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        response = StreamingHttpResponse(
+            _gzip_lines(lines) if gzipped else lines, content_type='application/x-ndjson'
+        )
+        if gzipped:
+            response['Content-Encoding'] = 'gzip'
+        patch_vary_headers(response, ('Accept-Encoding',))
+        # Let each line through proxies as soon as it's written
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+    
+    # Master and release IDs for the same album share one cache entry under the canonical ID
+    known_id = get_known_album_id(discogs_id)
+    cache_key = f'album_{known_id}'
+    cached_data = cache.get(cache_key)
+    if cached_data:
+        return Response({**personalize_album_payload(cached_data, request.user), 'cached': True})
+    
+    # Concurrent misses share one fetch, including a prefetch still in progress; cache for 5 minutes.
+    # IDs not resolved yet are resolved inside it, so they cost Discogs one lookup however many ask
+    try:
+        response_data, stale = single_flight(
+            cache_key, lambda: load_album_payload(known_id),
+            timeout=ALBUM_CACHE_TIMEOUT, lock_timeout=ALBUM_LOCK_TIMEOUT,
+        )
+    except (DiscogsUnavailable, requests.RequestException):
+        # Degraded mode: last known payload, or fail fast
+        stale_data = cache.get(stale_cache_key(cache_key))
+        if stale_data is not None:
+            return Response({**personalize_album_payload(stale_data, request.user), 'cached': True, 'stale': True})
+        return Response({'error': DISCOGS_UNAVAILABLE_ERROR}, status=503)
+    
+    if response_data is None:
+        return Response({'error': 'Album not found'}, status=404)
+    
+    response_data = personalize_album_payload(response_data, request.user)
+    if stale:
+        return Response({**response_data, 'stale': True})
     return Response(response_data)
 
 
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def album_reviews(request, discogs_id):
+    """Keyset-paginated reviews of an album (?sort=newest|most_liked|highest|lowest|following)"""
+    sort = request.GET.get('sort', 'newest')
+    if sort not in ALBUM_REVIEW_SORTS:
+        return Response({'error': f"Invalid sort, use one of: {', '.join(ALBUM_REVIEW_SORTS)}"}, status=400)
+    
+    album = Album.objects.filter(discogs_id=get_known_album_id(discogs_id)).first()
+    if not album:
+        # Reviews always belong to an album in the database
+        return Response({'reviews': [], 'sort': sort, 'next_cursor': None})
+    
+    try:
+        page_size = get_page_size(request, settings.ALBUM_REVIEWS_PAGE_SIZE, settings.ALBUM_REVIEWS_MAX_PAGE_SIZE)
+        page = album_reviews_page(album, request, sort, request.GET.get('cursor'), page_size)
+    except ValueError:
+        return Response({'error': 'Invalid cursor or page_size'}, status=400)
+    return Response(page)
+
+
+def _prefetch_album(discogs_id):
+    """Pool task: build and cache an album page nobody has asked for yet"""
+    try:
+        single_flight(
+            f'album_{discogs_id}', lambda: build_album_payload(discogs_id), timeout=ALBUM_CACHE_TIMEOUT
+        )
+    except Exception as e:
+        # Speculative work: the real request will fetch it (or report the error) itself
+        logger.info(f"Album prefetch for {discogs_id} skipped: {e}")
+    finally:
+        with _prefetch_lock:
+            _prefetch_pending.discard(discogs_id)
+        connections.close_all()
+
+
+def prefetch_album_details(results):
+    """
+    Warm the album pages for the top search hits in the background, since the next
+    request is usually a click on one of them. Only spare Discogs budget is used.
+    """
+    top_results = results[:settings.ALBUM_PREFETCH_TOP_K]
+    if not top_results:
+        return
+    
+    client = get_discogs_client()
+    if not client.breaker.is_closed():
+        return
+    
+    cache_keys = {f"album_{result.get('id')}": str(result.get('id')) for result in top_results if result.get('id')}
+    cached = cache.get_many(list(cache_keys))
+    
+    with _prefetch_lock:
+        budget = client.limiter.available // ALBUM_PREFETCH_DISCOGS_CALLS - len(_prefetch_pending)
+        for cache_key, discogs_id in cache_keys.items():
+            if budget <= 0 or len(_prefetch_pending) >= settings.ALBUM_PREFETCH_MAX_PENDING:
+                break
+            if cache_key in cached or discogs_id in _prefetch_pending:
+                continue
+            _prefetch_pending.add(discogs_id)
+            _prefetch_executor.submit(_prefetch_album, discogs_id)
+            budget -= 1
+
+
 def import_album_from_discogs(discogs_id):
-    """Import album from Discogs if it doesn't exist"""
-    if Album.objects.filter(discogs_id=discogs_id).exists():
-        return Album.objects.get(discogs_id=discogs_id)
+    """Import album from Discogs under its canonical ID if it doesn't exist"""
+    resolved = resolve_album_id(discogs_id)
+    if resolved is None:
+        return None
+    discogs_id, kind = resolved
+    
+    album = Album.objects.filter(discogs_id=discogs_id).first()
+    if album:
+        return album
     
     service = ExternalMusicService()
-    album_data = service.get_album_details(discogs_id)
+    album_data = service.get_album_details(discogs_id, kind or None)
     
     if album_data:
         # Fetch artist photo
@@ -245,6 +895,7 @@ def import_album_from_discogs(discogs_id):
             cover_url=album_data.get('cover_image', ''),
             artist_photo_url=artist_photo_url,
         )
+        schedule_cover_variants(album)
         return album
     
     return None
@@ -259,7 +910,10 @@ def import_album_from_discogs(discogs_id):
 def create_review(request, discogs_id):
     """Create a new review for an album"""
     # Import or get album
-    album = import_album_from_discogs(discogs_id)
+    try:
+        album = import_album_from_discogs(discogs_id)
+    except (DiscogsUnavailable, requests.RequestException):
+        return Response({'error': DISCOGS_UNAVAILABLE_ERROR}, status=503)
     if not album:
         return Response({'error': 'Album not found'}, status=404)
     
@@ -267,35 +921,73 @@ def create_review(request, discogs_id):
     if Review.objects.filter(user=request.user, album=album).exists():
         return Response({'error': 'You have already reviewed this album'}, status=400)
     
-    # Create review
-    review = Review.objects.create(
-        user=request.user,
-        album=album,
-        rating=request.data.get('rating'),
-        content=request.data.get('content', ''),
-    )
-    
-    # Handle genres
-    genre_names = request.data.get('genres', [])
-    for genre_name in genre_names:
-        genre, _ = Genre.objects.get_or_create(name=genre_name)
-        review.user_genres.add(genre)
-    
-    # Create activity
-    Activity.objects.create(
-        user=request.user,
-        activity_type='review_created',
-        review=review
-    )
+    # Review, genres, stats and activity are written together, in a fixed number of queries
+    with transaction.atomic():
+        review = Review.objects.create(
+            user=request.user,
+            album=album,
+            rating=request.data.get('rating'),
+            content=request.data.get('content', ''),
+        )
+        
+        # Handle genres
+        add_review_genres(review, request.data.get('genres', []))
+        
+        # Create activity
+        Activity.objects.create(
+            user=request.user,
+            activity_type='review_created',
+            review=review
+        )
     
     # Clear caches
     cache.delete_many([
-        f'album_{discogs_id}',
+        f'album_{album.discogs_id}',
         f'user_reviews_{request.user.username}',
         f'activity_feed_{request.user.id}',
     ])
     
-    return Response(ReviewSerializer(review, context={'request': request}).data, status=201)
+    # Nobody has liked a review that was just written
+    context = {'request': request, 'liked_review_ids': set()}
+    return Response(ReviewSerializer(review, context=context).data, status=201)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def import_reviews(request):
+    """
+    Import ratings exported from another service (CSV, JSON or JSON Lines upload).
+    Form fields: file, format (optional, from the extension otherwise), scale
+    (5, 10 or 100, default 10) and dry_run to only report what would match.
+    """
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response({'error': 'Upload the export as "file"'}, status=400)
+    
+    try:
+        file_format = detect_format(upload.name, request.data.get('format', ''))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
+    try:
+        scale = int(request.data.get('scale', 10))
+    except (TypeError, ValueError):
+        return Response({'error': f"Scale must be one of: {', '.join(map(str, SCALES))}"}, status=400)
+    dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+    
+    try:
+        report = import_ratings(
+            request.user,
+            upload,
+            file_format=file_format,
+            scale=scale,
+            max_discogs_lookups=settings.RATING_IMPORT_MAX_DISCOGS_LOOKUPS,
+            dry_run=dry_run,
+            max_rows=settings.RATING_IMPORT_MAX_ROWS,
+        )
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
+    
+    return Response(report)
 
 
 @api_view(['GET', 'PUT', 'DELETE'])
@@ -312,17 +1004,14 @@ def review_detail(request, review_id):
         return Response({'error': 'Permission denied'}, status=403)
     
     if request.method == 'PUT':
-        # Update review
-        review.rating = request.data.get('rating', review.rating)
-        review.content = request.data.get('content', review.content)
-        review.save()
-        
-        # Update genres
-        genre_names = request.data.get('genres', [])
-        review.user_genres.clear()
-        for genre_name in genre_names:
-            genre, _ = Genre.objects.get_or_create(name=genre_name)
-            review.user_genres.add(genre)
+        with transaction.atomic():
+            # Update review
+            review.rating = request.data.get('rating', review.rating)
+            review.content = request.data.get('content', review.content)
+            review.save()
+            
+            # Update genres
+            set_review_genres(review, request.data.get('genres', []))
         
         # Clear caches
         cache.delete_many([
@@ -345,50 +1034,51 @@ def review_detail(request, review_id):
         return Response({'message': 'Review deleted'}, status=204)
 
 
-@api_view(['POST', 'DELETE'])
+def review_likes_cache_keys(review_id):
+    """Cached pages of a review's likers"""
+    return [
+        f'review_likes_{review_id}_{offset}_{limit}_{include_review}'
+        for offset in [0, 20, 40]
+        for limit in [20, 50]
+        for include_review in ['true', 'false']
+    ]
+
+
+@api_view(['PUT', 'POST', 'DELETE'])
 @permission_classes([IsAuthenticated])
 def toggle_review_like(request, review_id):
-    """Like or unlike a review with cache invalidation"""
-    review = get_object_or_404(Review.objects.select_related('user'), id=review_id)
-    
-    like, created = ReviewLike.objects.get_or_create(
-        user=request.user,
-        review=review
-    )
+    """
+    PUT likes a review and DELETE unlikes it; repeating either changes nothing.
+    POST toggles, for older clients.
+    """
+    review = get_object_or_404(Review, id=review_id)
     
-    if not created:
-        # Unlike
-        like.delete()
+    if request.method == 'PUT':
+        changed, count = like_review(request.user, review)
+        action = 'liked'
+    elif request.method == 'DELETE':
+        changed, count = unlike_review(request.user, review)
         action = 'unliked'
     else:
-        # Like and create activity
+        changed, count = like_review(request.user, review)
         action = 'liked'
-        Activity.objects.create(
-            user=request.user,
-            activity_type='review_liked',
-            review=review
-        )
-    
-    # Clear relevant caches when likes change
-    cache_keys = [
-        f'user_reviews_{review.user.username}',
-        f'activity_feed_{request.user.id}_friends',
-        f'activity_feed_{request.user.id}_you',
-        f'user_activity_{review.user.username}',
-    ]
+        if not changed:
+            changed, count = unlike_review(request.user, review)
+            action = 'unliked'
     
-    # Clear review likes cache for different pagination combinations
-    for offset in [0, 20, 40]:
-        for limit in [20, 50]:
-            for include_review in ['true', 'false']:
-                cache_keys.append(f'review_likes_{review.id}_{offset}_{limit}_{include_review}')
-    
-    cache.delete_many(cache_keys)
+    if changed:
+        # The liker's feeds show the review with their like flag, and their own activity lists the like
+        cache_keys = review_likes_cache_keys(review.id) + [
+            f'activity_feed_{request.user.id}_you',
+            f'activity_feed_{request.user.id}_friends',
+            f'user_activity_{request.user.username}',
+        ]
+        if action == 'liked':
+            # ...and a new like shows up in the review owner's incoming feed
+            cache_keys.append(f'activity_feed_{review.user_id}_incoming')
+        cache.delete_many(cache_keys)
     
-    return Response({
-        'action': action,
-        'like_count': ReviewLike.objects.filter(review=review).count()
-    })
+    return Response({'action': action, 'changed': changed, 'like_count': count})
 
 
 # ============================================================================
@@ -406,13 +1096,14 @@ def activity_feed(request):
     cached_activities = cache.get(cache_key)
     
     if cached_activities:
-        return Response(cached_activities)
+        # Likes made since the feed was cached
+        return Response(personalize_activities(cached_activities, request.user))
     
     # Base query with optimal prefetching to avoid N+1 queries
     base_query = Activity.objects.select_related(
         'user', 'target_user', 'review__user', 'review__album', 'comment__user'
     ).prefetch_related(
-        'review__user_genres', 'review__likes', 'review__comments'
+        'review__user_genres'
     )
     
     if activity_type == 'friends':
@@ -434,8 +1125,11 @@ def activity_feed(request):
     offset = int(request.GET.get('offset', 0))
     limit = min(int(request.GET.get('limit', 20)), 50)  # Cap at 50 items
     
-    paginated_activities = activities.order_by('-created_at')[offset:offset + limit]
-    serializer = ActivitySerializer(paginated_activities, many=True, context={'request': request})
+    paginated_activities = list(activities.order_by('-created_at')[offset:offset + limit])
+    liked = liked_review_ids(request.user, [activity.review_id for activity in paginated_activities if activity.review_id])
+    serializer = ActivitySerializer(
+        paginated_activities, many=True, context={'request': request, 'liked_review_ids': liked}
+    )
     
     # Cache for 2 minutes (shorter for activity feed freshness)
     cache.set(cache_key, serializer.data, 120)
@@ -473,19 +1167,21 @@ def review_comments(request, review_id):
         if not request.user.is_authenticated:
             return Response({'error': 'Authentication required'}, status=401)
         
-        comment = Comment.objects.create(
-            user=request.user,
-            review=review,
-            content=request.data.get('content', '')
-        )
-        
-        # Create activity
-        Activity.objects.create(
-            user=request.user,
-            activity_type='comment_created',
-            review=review,
-            comment=comment
-        )
+        # The comment row and the review's comments_count (updated by its signals) change together
+        with transaction.atomic():
+            comment = Comment.objects.create(
+                user=request.user,
+                review=review,
+                content=request.data.get('content', '')
+            )
+            
+            # Create activity
+            Activity.objects.create(
+                user=request.user,
+                activity_type='comment_created',
+                review=review,
+                comment=comment
+            )
         
         # Clear relevant caches
         cache.delete_many([
@@ -565,19 +1261,19 @@ def list_detail(request, list_id):
         return Response({'error': 'List not found'}, status=404)
     
     if request.method == 'GET':
-        # Cache for GET requests only
-        cache_key = f'list_detail_{list_id}_{request.user.id if request.user.is_authenticated else "anon"}'
+        # Cache for GET requests only, one copy for every viewer
+        cache_key = f'list_detail_{list_id}'
         cached_data = cache.get(cache_key)
         
         if cached_data:
-            return Response(cached_data)
+            return Response(personalize_list(cached_data, request.user))
         
-        serializer = ListSerializer(list_obj, context={'request': request})
+        serializer = ListSerializer(list_obj, context={'request': None})
         
         # Cache for 5 minutes (lists change moderately)
         cache.set(cache_key, serializer.data, 300)
         
-        return Response(serializer.data)
+        return Response(personalize_list(serializer.data, request.user))
     
     elif request.method == 'PUT':
         # Only owner can update
@@ -591,8 +1287,7 @@ def list_detail(request, list_id):
         
         # Clear relevant caches
         cache_keys = [
-            f'list_detail_{list_id}_anon',
-            f'list_detail_{list_id}_{request.user.id}',
+            f'list_detail_{list_id}',
             f'user_lists_{list_obj.user.username}',
         ]
         
@@ -683,6 +1378,49 @@ def genres(request):
     
     return Response({'genres': serializer.data})
 
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def trending(request):
+    """Trending albums from the precomputed charts (?window=24h|7d|30d, ?genre=<genre id>)"""
+    window = request.GET.get('window', '7d')
+    if window not in TRENDING_WINDOWS:
+        return Response({'error': f"Invalid window, use one of: {', '.join(TRENDING_WINDOWS)}"}, status=400)
+    genre_id = request.GET.get('genre') or None
+    if genre_id is not None and not genre_id.isdigit():
+        return Response({'error': 'Invalid genre'}, status=400)
+    
+    try:
+        page_size = get_page_size(request, settings.TRENDING_PAGE_SIZE, settings.TRENDING_MAX_PAGE_SIZE)
+        ranked, next_cursor = trending_page(window, genre_id, request.GET.get('cursor'), page_size)
+    except ValueError:
+        return Response({'error': 'Invalid cursor or page_size'}, status=400)
+    
+    # Charts hold album IDs only; one query fills in the albums
+    albums = {
+        str(album.pk): album
+        for album in Album.objects.select_related('stats').filter(pk__in=[album_id for album_id, _ in ranked])
+    }
+    results = []
+    for album_id, score in ranked:
+        album = albums.get(album_id)
+        if album is None:
+            continue
+        stats = album_stats_fields(album)
+        results.append({
+            'id': album_id,
+            'discogs_id': album.discogs_id,
+            'title': album.title,
+            'artist': album.artist,
+            'year': album.year,
+            'cover_url': album.cover_url,
+            'cover_thumb': album.cover_url_for(COVER_CARD),
+            'review_count': stats['review_count'],
+            'average_rating': stats['average_rating'],
+            'score': round(score, 3),
+        })
+    
+    return Response({'window': window, 'genre': genre_id, 'albums': results, 'next_cursor': next_cursor})
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def review_likes(request, review_id):
@@ -698,10 +1436,13 @@ def review_likes(request, review_id):
     cached_data = cache.get(cache_key)
     
     if cached_data:
+        if include_review:
+            cached_data = {**cached_data, 'review': personalize_review(cached_data['review'], request.user)}
         return Response(cached_data)
     
     likes = ReviewLike.objects.filter(review=review).select_related('user')[offset:offset + limit]
-    total_count = review.likes.count()
+    # Includes likes not flushed onto the review yet
+    total_count = like_count(review)
 
     # Format users array as expected by frontend
     users_data = []
@@ -721,11 +1462,13 @@ def review_likes(request, review_id):
     }
     
     if include_review:
-        response_data['review'] = ReviewSerializer(review, context={'request': request}).data
+        response_data['review'] = {**ReviewSerializer(review, context={'request': None}).data, 'likes_count': total_count}
     
     # Cache for 3 minutes (likes change frequently)
     cache.set(cache_key, response_data, 180)
 
+    if include_review:
+        response_data = {**response_data, 'review': personalize_review(response_data['review'], request.user)}
     return Response(response_data)
 
 
@@ -757,7 +1500,9 @@ def comment_detail(request, comment_id):
         return Response(CommentSerializer(comment, context={'request': request}).data)
     
     elif request.method == 'DELETE':
-        comment.delete()
+        # Also decrements the review's comments_count in the same transaction
+        with transaction.atomic():
+            comment.delete()
         return Response({'message': 'Comment deleted'}, status=204)
 
 